@@ -5,29 +5,41 @@ Model EmotionPoint jest historyczny — wiele wpisów per (user, location). Zbio
 średnie miejsca liczymy w dwóch trybach:
 
 A. **Stan bieżący** (bez filtra czasu) — średnia z najnowszych głosów każdego usera
-   (DISTINCT ON (user_id) ORDER BY created_at DESC). Indeks
-   ``emotions_loc_user_created_idx`` na ``(location, user, -created_at)`` powoduje, że
-   PostgreSQL wykonuje to przez Index Scan, bez sortu w pamięci.
+   (wiersze z ``is_latest``, utrzymywane przez ``emotions.stats``). Częściowy indeks
+   ``emotions_latest_loc_idx`` na ``(location, emotional_value) WHERE is_latest``
+   pozwala policzyć to Index Only Scanem, bez przeglądania historii.
 
 B. **W oknie czasu** (z filtrem ``created_after`` / ``created_before``) — mean-of-means:
    dla każdego usera w oknie liczymy jego średnią, potem uśredniamy po userach.
    Każdy user ma jedną wagę niezależnie od liczby wpisów w oknie.
 
+Wpisy ukryte przez moderację pomijamy w obu trybach: w A nie mają ``is_latest``,
+a liczniki i okno czasu idą po częściowym indeksie ``emotions_visible_loc_idx``
+(``(location, created_at) WHERE NOT is_hidden``).
+
 Obie agregacje wstrzykiwane są jako annotacja ``avg_emotional_value`` na queryset
 ``Location`` przez ``RawSQL`` — czytelne, sprawdzalne i wykorzystujące indeksy.
+
+Dla dzielnic (``district_stats``) te same dwa tryby liczymy jednym zapytaniem
+grupującym po ``map_location.district_id`` — wynik ma tyle wierszy, ile dzielnic.
+Bez okna średnia najnowszych głosów też idzie po ``is_latest``; ``DISTINCT ON``
+po historii zostaje tylko dla okna czasu.
 """
-from django.db.models import Count
+from django.db import connection
 from django.db.models.expressions import RawSQL
 
 
 _LATEST_PER_USER_AVG_SQL = """
-    SELECT AVG(sub.emotional_value)
-    FROM (
-        SELECT DISTINCT ON (e.user_id) e.user_id, e.emotional_value
-        FROM emotions_emotion_point e
-        WHERE e.location_id = "map_location"."id"
-        ORDER BY e.user_id, e.created_at DESC
-    ) sub
+    SELECT AVG(e.emotional_value)
+    FROM emotions_emotion_point e
+    WHERE e.location_id = "map_location"."id" AND e.is_latest {users}
+"""
+
+
+_COUNT_SQL = """
+    SELECT COUNT(*)
+    FROM emotions_emotion_point e
+    WHERE e.location_id = "map_location"."id" AND NOT e.is_hidden {users}
 """
 
 
@@ -37,8 +49,10 @@ _WINDOWED_MEAN_OF_MEANS_SQL = """
         SELECT e.user_id, AVG(e.emotional_value) AS user_avg
         FROM emotions_emotion_point e
         WHERE e.location_id = "map_location"."id"
+          AND NOT e.is_hidden
           AND e.created_at >= %s
           AND e.created_at <= %s
+          {users}
         GROUP BY e.user_id
     ) per_user
 """
@@ -48,32 +62,139 @@ _WINDOWED_COUNT_SQL = """
     SELECT COUNT(*)
     FROM emotions_emotion_point e
     WHERE e.location_id = "map_location"."id"
+      AND NOT e.is_hidden
       AND e.created_at >= %s
       AND e.created_at <= %s
+      {users}
 """
 
 
-def annotate_latest_per_user_avg(qs):
+# Warstwa „tylko znajomi”: publiczne wpisy z podanego zbioru userów. Przy
+# location_id = … AND user_id = ANY(…) to zakres indeksu (location, user, -created_at).
+_USERS_FILTER_SQL = "AND e.user_id = ANY(%s) AND e.privacy_status = 'public'"
+
+
+def _users_filter(user_ids):
+    """Fragment SQL i parametry zawężające do ``user_ids`` (``None`` = wszyscy)."""
+    if user_ids is None:
+        return '', []
+    return _USERS_FILTER_SQL, [sorted(user_ids)]
+
+
+def annotate_latest_per_user_avg(qs, user_ids=None):
     """
     Annotuje ``Location`` queryset polami ``avg_emotional_value`` (tryb A — latest per user)
-    oraz ``emotion_points_count`` (zliczenie wszystkich wpisów historii).
+    oraz ``emotion_points_count`` (zliczenie wszystkich nieukrytych wpisów historii).
+
+    ``user_ids`` (np. zbiór id znajomych) zawęża obie miary do publicznych wpisów tych userów.
     """
+    users_sql, params = _users_filter(user_ids)
     return qs.annotate(
-        avg_emotional_value=RawSQL(_LATEST_PER_USER_AVG_SQL, []),
-        emotion_points_count=Count('emotion_points'),
+        avg_emotional_value=RawSQL(_LATEST_PER_USER_AVG_SQL.format(users=users_sql), params),
+        emotion_points_count=RawSQL(_COUNT_SQL.format(users=users_sql), params),
     )
 
 
-def annotate_windowed_mean_of_means_avg(qs, created_after, created_before):
+def annotate_windowed_mean_of_means_avg(qs, created_after, created_before, user_ids=None):
     """
     Annotuje ``Location`` queryset polami:
     - ``avg_emotional_value`` (tryb B — mean-of-means w oknie ``[created_after, created_before]``)
     - ``emotion_points_count`` (liczba wpisów emocji wewnątrz okna)
 
     Oba parametry to obiekty ``datetime`` (wymagane razem; brak okna = używaj trybu A).
+    ``user_ids`` — jak w ``annotate_latest_per_user_avg``.
     """
-    params = [created_after, created_before]
+    users_sql, users_params = _users_filter(user_ids)
+    params = [created_after, created_before, *users_params]
     return qs.annotate(
-        avg_emotional_value=RawSQL(_WINDOWED_MEAN_OF_MEANS_SQL, params),
-        emotion_points_count=RawSQL(_WINDOWED_COUNT_SQL, params),
+        avg_emotional_value=RawSQL(_WINDOWED_MEAN_OF_MEANS_SQL.format(users=users_sql), params),
+        emotion_points_count=RawSQL(_WINDOWED_COUNT_SQL.format(users=users_sql), params),
     )
+
+
+# Tryb A bez okna: wiersze z is_latest (częściowy indeks emotions_latest_loc_idx)
+_DISTRICT_LATEST_FLAG_SQL = """
+        SELECT l.district_id, AVG(e.emotional_value) AS avg_latest
+        FROM emotions_emotion_point e
+        JOIN map_location l ON l.id = e.location_id
+        WHERE l.district_id IS NOT NULL AND e.is_latest
+        GROUP BY l.district_id
+"""
+
+
+# Tryb A w oknie: najnowszy wpis pary w oknie — remisy jak przy is_latest (emotions.stats)
+_DISTRICT_LATEST_IN_WINDOW_SQL = """
+        SELECT sub.district_id, AVG(sub.emotional_value) AS avg_latest
+        FROM (
+            SELECT DISTINCT ON (p.location_id, p.user_id) p.district_id, p.emotional_value
+            FROM points p
+            ORDER BY p.location_id, p.user_id, p.created_at DESC, p.id DESC
+        ) sub
+        GROUP BY sub.district_id
+"""
+
+
+_DISTRICT_STATS_SQL = """
+    WITH points AS (
+        SELECT e.id, l.district_id, e.location_id, e.user_id, e.emotional_value, e.created_at
+        FROM emotions_emotion_point e
+        JOIN map_location l ON l.id = e.location_id
+        WHERE l.district_id IS NOT NULL AND NOT e.is_hidden {window}
+    ),
+    latest AS ({latest}),
+    per_user AS (
+        SELECT p.district_id, p.user_id, AVG(p.emotional_value) AS user_avg, COUNT(*) AS points_count
+        FROM points p
+        GROUP BY p.district_id, p.user_id
+    ),
+    users AS (
+        SELECT u.district_id,
+               AVG(u.user_avg) AS mean_of_means,
+               SUM(u.points_count) AS points_count,
+               COUNT(*) AS voters_count
+        FROM per_user u
+        GROUP BY u.district_id
+    )
+    SELECT d.id, d.name, latest.avg_latest, users.mean_of_means,
+           COALESCE(users.points_count, 0), COALESCE(users.voters_count, 0)
+    FROM map_district d
+    LEFT JOIN latest ON latest.district_id = d.id
+    LEFT JOIN users ON users.district_id = d.id
+    ORDER BY d.name
+"""
+
+
+def district_stats(created_after=None, created_before=None):
+    """
+    Statystyki wszystkich dzielnic (także bez ocen — z ``None`` i zerami) w oknie czasu
+    (każda granica opcjonalna). Zwraca listę słowników:
+
+    - ``avg_emotional_value`` — tryb A: średnia z najnowszego głosu każdego usera
+      w każdej lokalizacji dzielnicy (jak średnia miejsca na mapie, złożona po dzielnicy),
+    - ``mean_of_means`` — tryb B: średnia usera w dzielnicy, uśredniona po userach,
+    - ``emotion_points_count`` / ``voters_count`` — liczba wpisów i różnych userów.
+    """
+    window, params = [], []
+    if created_after is not None:
+        window.append('AND e.created_at >= %s')
+        params.append(created_after)
+    if created_before is not None:
+        window.append('AND e.created_at <= %s')
+        params.append(created_before)
+
+    latest = _DISTRICT_LATEST_IN_WINDOW_SQL if window else _DISTRICT_LATEST_FLAG_SQL
+    with connection.cursor() as cursor:
+        cursor.execute(_DISTRICT_STATS_SQL.format(window=' '.join(window), latest=latest), params)
+        rows = cursor.fetchall()
+
+    return [
+        {
+            'id': pk,
+            'name': name,
+            'avg_emotional_value': float(avg_latest) if avg_latest is not None else None,
+            'mean_of_means': float(mean_of_means) if mean_of_means is not None else None,
+            'emotion_points_count': int(points_count),
+            'voters_count': voters_count,
+        }
+        for pk, name, avg_latest, mean_of_means, points_count, voters_count in rows
+    ]
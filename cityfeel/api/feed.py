@@ -0,0 +1,95 @@
+"""
+Feed aktywności znajomych (``GET /api/feed/``) ze stronicowaniem po kluczu.
+
+Strona to ``limit`` najnowszych publicznych EmotionPoint zaakceptowanych znajomych,
+starszych niż kursor ``(created_at, id)`` z poprzedniej strony. Zamiast
+``user_id IN (...) ORDER BY created_at DESC`` (bitmap scan + sort całej historii
+wszystkich znajomych) dla każdego znajomego bierzemy LATERAL-em co najwyżej
+``limit`` wierszy z indeksu ``emotions_user_created_idx`` (user, created_at) i
+scalamy je — koszt rośnie z liczbą znajomych × ``limit``, a nie z długością historii.
+Id znajomych pochodzą z cache (``auth.friends.get_friend_ids``).
+
+Kursor to base64 z ``<created_at ISO>|<id>`` — nieprzezroczysty dla klienta, stabilny
+przy nowych wpisach (nowe trafiają przed pierwszą stronę, nie przesuwają kolejnych).
+"""
+import base64
+import binascii
+
+from django.db import connection
+from django.db.models import Prefetch
+from django.utils.dateparse import parse_datetime
+
+from emotions.models import EmotionPoint, Comment
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+
+
+_FEED_IDS_SQL = """
+    SELECT e.id
+    FROM unnest(%(friends)s::bigint[]) AS f(user_id)
+    CROSS JOIN LATERAL (
+        SELECT e.id, e.created_at
+        FROM emotions_emotion_point e
+        WHERE e.user_id = f.user_id
+          AND e.privacy_status = 'public'
+          AND NOT e.is_hidden
+          {cursor}
+        ORDER BY e.created_at DESC, e.id DESC
+        LIMIT %(limit)s
+    ) e
+    ORDER BY e.created_at DESC, e.id DESC
+    LIMIT %(limit)s
+"""
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(emotion_point):
+    raw = f'{emotion_point.created_at.isoformat()}|{emotion_point.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Zwraca ``(created_at, id)`` z kursora; ``InvalidCursor`` gdy jest uszkodzony."""
+    try:
+        created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        created_at = parse_datetime(created_at)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor(cursor)
+    if created_at is None:
+        raise InvalidCursor(cursor)
+    return created_at, pk
+
+
+def friends_feed(friend_ids, limit=DEFAULT_LIMIT, cursor=None):
+    """
+    Lista co najwyżej ``limit`` EmotionPoint znajomych (z lokalizacją, autorem
+    i komentarzami), od najnowszych, starszych niż ``cursor`` (``(created_at, id)``).
+    """
+    if not friend_ids:
+        return []
+
+    params = {'friends': sorted(friend_ids), 'limit': limit}
+    cursor_sql = ''
+    if cursor is not None:
+        cursor_sql = 'AND (e.created_at, e.id) < (%(created_at)s, %(id)s)'
+        params['created_at'], params['id'] = cursor
+
+    with connection.cursor() as db_cursor:
+        db_cursor.execute(_FEED_IDS_SQL.format(cursor=cursor_sql), params)
+        ids = [row[0] for row in db_cursor.fetchall()]
+
+    points = (
+        EmotionPoint.objects
+        .select_related('user', 'location')
+        .prefetch_related(Prefetch(
+            'related_comments',
+            queryset=Comment.objects.filter(privacy_status='public', is_hidden=False).order_by('created_at'),
+        ))
+        .in_bulk(ids)
+    )
+    return [points[pk] for pk in ids if pk in points]
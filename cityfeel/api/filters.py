@@ -2,7 +2,7 @@ from django.db.models import Q
 from django_filters import rest_framework as filters
 from django.contrib.gis.geos import Point, Polygon
 from map.models import Location
-from emotions.models import EmotionPoint
+from emotions.models import EmotionPoint, Comment
 
 class NumberInFilter(filters.BaseInFilter, filters.NumberFilter):
     pass
@@ -165,3 +165,26 @@ class EmotionPointFilter(filters.FilterSet):
             return queryset.filter(location__coordinates__contained=bbox_polygon)
         except (ValueError, AttributeError):
             return queryset.none()
+
+
+class CommentSearchFilter(filters.FilterSet):
+    """
+    Filtry wyszukiwania komentarzy (GET /api/comments/search/).
+
+    Filtry:
+    - location: id lokalizacji
+    - bbox: bounding box po lokalizacji (lon_min,lat_min,lon_max,lat_max)
+    - sentiment_label: negative / neutral / positive
+    - created_after / created_before: zakres czasu (ISO 8601)
+    """
+
+    created_after = filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='gte')
+    created_before = filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='lte')
+    bbox = filters.CharFilter(method='filter_bbox')
+
+    class Meta:
+        model = Comment
+        fields = ['location', 'sentiment_label', 'created_after', 'created_before', 'bbox']
+
+    # Ta sama ścieżka location__coordinates co przy EmotionPoint.
+    filter_bbox = EmotionPointFilter.filter_bbox
@@ -0,0 +1,73 @@
+"""
+Wyszukiwanie lokalizacji i użytkowników z tolerancją literówek (``GET /api/search/?q=``).
+
+Oparte na ``pg_trgm``: indeksy GIN ``gin_trgm_ops`` na ``UPPER(map_location.name)`` i
+``UPPER(auth_user.username)`` (te same indeksy obsługują ``icontains`` na liście
+lokalizacji i w społeczności). Dopasowanie to operator ``<%`` (word similarity —
+czy zapytanie jest podobne do *fragmentu* nazwy, np. „solidarnosci” → „Plac
+Solidarności”) lub zwykłe zawieranie podciągu; oba warunki idą po indeksie. Wyniki
+sortujemy po ``word_similarity``, a potem po długości nazwy (krótsze = trafniejsze)
+i obcinamy do ``limit``.
+
+Próg podobieństwa ustawiamy ``SET LOCAL`` w transakcji zapytania
+(``CITYFEEL_SEARCH_SIMILARITY_THRESHOLD``, domyślnie 0.4 — jedna literówka
+w krótkim słowie wciąż przechodzi).
+"""
+from django.conf import settings
+from django.db import connection, transaction
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+MIN_QUERY_LENGTH = 2
+
+
+_LOCATIONS_SQL = """
+    SELECT l.id, l.name, ST_Y(l.coordinates) AS latitude, ST_X(l.coordinates) AS longitude,
+           word_similarity(UPPER(%(q)s), UPPER(l.name)) AS score
+    FROM map_location l
+    WHERE UPPER(%(q)s) <%% UPPER(l.name)
+       OR UPPER(l.name) LIKE '%%' || UPPER(%(q_like)s) || '%%'
+    ORDER BY score DESC, LENGTH(l.name), l.id
+    LIMIT %(limit)s
+"""
+
+_USERS_SQL = """
+    SELECT u.id, u.username,
+           word_similarity(UPPER(%(q)s), UPPER(u.username)) AS score
+    FROM auth_user u
+    WHERE u.is_active
+      AND (UPPER(%(q)s) <%% UPPER(u.username)
+           OR UPPER(u.username) LIKE '%%' || UPPER(%(q_like)s) || '%%')
+    ORDER BY score DESC, LENGTH(u.username), u.id
+    LIMIT %(limit)s
+"""
+
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _fetch(cursor, sql, params):
+    cursor.execute(sql, params)
+    columns = [col[0] for col in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def search(q, limit=DEFAULT_LIMIT):
+    """
+    Zwraca ``{'locations': [...], 'users': [...]}`` — po co najwyżej ``limit`` najlepszych
+    dopasowań w każdej grupie (słowniki z ``score`` 0–1).
+    """
+    q = (q or '').strip()
+    if len(q) < MIN_QUERY_LENGTH:
+        return {'locations': [], 'users': []}
+
+    threshold = float(getattr(settings, 'CITYFEEL_SEARCH_SIMILARITY_THRESHOLD', 0.4))
+    params = {'q': q, 'q_like': _escape_like(q), 'limit': max(1, min(limit, MAX_LIMIT))}
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)", [str(threshold)])
+        return {
+            'locations': _fetch(cursor, _LOCATIONS_SQL, params),
+            'users': _fetch(cursor, _USERS_SQL, params),
+        }
@@ -3,12 +3,13 @@ from django.contrib.gis.geos import Point
 from django.contrib.gis.db.models.functions import Distance
 from django.conf import settings
 from drf_spectacular.utils import extend_schema_field
-from django.db.models import Q
 
-from emotions.models import EmotionPoint, Comment, Report
+from emotions.models import EmotionPoint, Comment, Report, PhotoUpload
 from emotions import sentiment as sentiment_service
 from map.models import Location
-from auth.models import Friendship, CFUser
+from auth.models import Friendship, FriendEdge, CFUser
+
+AVATAR_LIST_SIZE = 64
 
 
 @extend_schema_field({
@@ -148,7 +149,8 @@ class LocationListSerializer(serializers.ModelSerializer):
             # Używamy bezpośredniego pola location oraz privacy_status komentarza
             return Comment.objects.filter(
                 location=obj,
-                privacy_status='public'
+                privacy_status='public',
+                is_hidden=False
             ).count()
         except Exception:
             return 0
@@ -180,7 +182,7 @@ class LocationListSerializer(serializers.ModelSerializer):
 
             comment = (
                 Comment.objects
-                .filter(location=obj)  # [FIX] Usunięto filtr privacy_status='public'
+                .filter(location=obj, is_hidden=False)  # [FIX] Usunięto filtr privacy_status='public'
                 .exclude(content__isnull=True)
                 .exclude(content__exact='')
                 .select_related('user', 'emotion_point')
@@ -357,11 +359,8 @@ class FriendshipSerializer(serializers.ModelSerializer):
             if user == friend:
                 raise serializers.ValidationError("Nie możesz wysłać zaproszenia do samego siebie.")
 
-            # Sprawdź czy relacja już istnieje (w dowolnym kierunku)
-            existing = Friendship.objects.filter(
-                (Q(user=user) & Q(friend=friend)) |
-                (Q(user=friend) & Q(friend=user))
-            ).exists()
+            # Sprawdź czy relacja już istnieje (w dowolnym kierunku) — krawędzie są symetryczne
+            existing = FriendEdge.objects.filter(user=user, other=friend).exists()
 
             if existing:
                 raise serializers.ValidationError(
@@ -381,11 +380,51 @@ class FriendUserSerializer(serializers.ModelSerializer):
     """
     friendship_id = serializers.IntegerField(read_only=True)
     friendship_since = serializers.DateTimeField(read_only=True)
+    avatar = serializers.SerializerMethodField()
 
     class Meta:
         model = CFUser
         fields = ['id', 'username', 'first_name', 'last_name', 'avatar', 'friendship_id', 'friendship_since']
 
+    @extend_schema_field({'type': 'string', 'format': 'uri', 'nullable': True})
+    def get_avatar(self, obj):
+        # Mały kwadratowy wariant (64 px) zamiast oryginału — lista znajomych
+        url = obj.get_avatar_url(AVATAR_LIST_SIZE)
+        request = self.context.get('request')
+        if url and request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+
+class FeedItemSerializer(serializers.ModelSerializer):
+    """
+    Wpis w GET /api/feed/ — publiczna ocena znajomego z lokalizacją i komentarzem.
+    """
+    user_id = serializers.IntegerField(read_only=True)
+    username = serializers.CharField(source='user.username', read_only=True)
+    avatar = serializers.SerializerMethodField()
+    location = LocationSerializer(read_only=True)
+    comment = serializers.SerializerMethodField()
+
+    class Meta:
+        model = EmotionPoint
+        fields = ['id', 'user_id', 'username', 'avatar', 'location', 'emotional_value', 'comment', 'created_at']
+        read_only_fields = fields
+
+    @extend_schema_field({'type': 'string', 'format': 'uri', 'nullable': True})
+    def get_avatar(self, obj):
+        url = obj.user.get_avatar_url(AVATAR_LIST_SIZE)
+        request = self.context.get('request')
+        if url and request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+    @extend_schema_field({'type': 'string', 'nullable': True})
+    def get_comment(self, obj):
+        # Komentarze są prefetchowane (tylko publiczne) — bez zapytania per wpis
+        comments = obj.related_comments.all()
+        return comments[0].content if comments else None
+
 
 class CommentSerializer(serializers.ModelSerializer):
     """
@@ -422,6 +461,18 @@ class CommentSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class CommentSearchResultSerializer(serializers.ModelSerializer):
+    """Komentarz w wynikach GET /api/comments/search/ (``rank`` — trafność ts_rank)."""
+    username = serializers.CharField(source='user.username', read_only=True)
+    location_name = serializers.CharField(source='location.name', read_only=True)
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Comment
+        fields = ['id', 'username', 'location', 'location_name', 'content', 'sentiment_label', 'created_at', 'rank']
+        read_only_fields = fields
+
+
 class ReportSerializer(serializers.ModelSerializer):
     class Meta:
         model = Report
@@ -430,4 +481,61 @@ class ReportSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         validated_data['reporter'] = self.context['request'].user
-        return super().create(validated_data)
\ No newline at end of file
+        return super().create(validated_data)
+
+
+class DistrictStatsSerializer(serializers.Serializer):
+    """
+    Wiersz odpowiedzi GET /api/districts/stats/ — statystyki jednej dzielnicy
+    (do kartogramu na mapie; dzielnice bez ocen mają średnie ``null``).
+    """
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    avg_emotional_value = serializers.FloatField(
+        allow_null=True,
+        help_text='Średnia z najnowszego głosu każdego użytkownika w każdej lokalizacji dzielnicy.'
+    )
+    mean_of_means = serializers.FloatField(
+        allow_null=True,
+        help_text='Średnia użytkownika w dzielnicy (w oknie czasu), uśredniona po użytkownikach.'
+    )
+    emotion_points_count = serializers.IntegerField()
+    voters_count = serializers.IntegerField()
+
+
+class LocationSearchResultSerializer(serializers.Serializer):
+    """Lokalizacja w wynikach GET /api/search/ (``score`` — podobieństwo trigramowe 0–1)."""
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    latitude = serializers.FloatField()
+    longitude = serializers.FloatField()
+    score = serializers.FloatField()
+
+
+class UserSearchResultSerializer(serializers.Serializer):
+    """Użytkownik w wynikach GET /api/search/."""
+    id = serializers.IntegerField()
+    username = serializers.CharField()
+    score = serializers.FloatField()
+
+
+class PhotoUploadSerializer(serializers.ModelSerializer):
+    """
+    Sesja uploadu zdjęcia w kawałkach (emotions.uploads).
+
+    Przy tworzeniu klient podaje rozmiar i SHA-256 całego pliku; ``offset`` mówi,
+    od którego bajtu wznowić wysyłanie.
+    """
+    sha256 = serializers.RegexField(r'^[0-9a-fA-F]{64}$', max_length=64)
+    photo_id = serializers.PrimaryKeyRelatedField(source='photo', read_only=True)
+
+    class Meta:
+        model = PhotoUpload
+        fields = [
+            'id', 'location', 'filename', 'size', 'sha256', 'caption', 'privacy_status',
+            'offset', 'status', 'photo_id', 'created_at',
+        ]
+        read_only_fields = ['id', 'offset', 'status', 'photo_id', 'created_at']
+        extra_kwargs = {
+            'size': {'min_value': 1},
+        }
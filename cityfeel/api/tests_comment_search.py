@@ -0,0 +1,76 @@
+"""
+Testy wyszukiwania pełnotekstowego komentarzy (/api/comments/search/).
+"""
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from emotions.models import Comment
+from map.models import Location
+
+User = get_user_model()
+
+
+class CommentSearchAPITestCase(TestCase):
+    url = '/api/comments/search/'
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='viewer', password='x')
+        self.other = User.objects.create_user(username='other', password='x')
+        self.park = Location.objects.create(name='Park', coordinates=Point(18.60, 54.35, srid=4326))
+        self.port = Location.objects.create(name='Port', coordinates=Point(19.50, 54.90, srid=4326))
+
+        self.turtle = Comment.objects.create(
+            user=self.other, location=self.park, content='Żółw w stawie, czysty staw, ładny staw'
+        )
+        self.port_comment = Comment.objects.create(
+            user=self.other, location=self.port, content='Brudny staw przy porcie'
+        )
+        # Etykiety ustawiamy wprost — sygnał analizy sentymentu nadpisuje je przy tworzeniu.
+        Comment.objects.filter(pk=self.turtle.pk).update(sentiment_label='positive')
+        Comment.objects.filter(pk=self.port_comment.pk).update(sentiment_label='negative')
+        Comment.objects.create(
+            user=self.other, location=self.park, content='Prywatny staw', privacy_status='private'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _ids(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [c['id'] for c in response.data['results']]
+
+    def test_ignores_diacritics_and_case(self):
+        self.assertEqual(self._ids(q='ZOLW'), [self.turtle.id])
+
+    def test_ranked_and_hides_others_private(self):
+        # „staw” występuje w pierwszym komentarzu dwa razy — wyżej w rankingu.
+        self.assertEqual(self._ids(q='staw'), [self.turtle.id, self.port_comment.id])
+
+    def test_filters(self):
+        self.assertEqual(self._ids(q='staw', location=self.port.id), [self.port_comment.id])
+        self.assertEqual(self._ids(q='staw', bbox='18.5,54.3,18.7,54.4'), [self.turtle.id])
+        self.assertEqual(self._ids(q='staw', sentiment_label='negative'), [self.port_comment.id])
+
+        future = (timezone.now() + timedelta(days=1)).isoformat()
+        self.assertEqual(self._ids(q='staw', created_after=future), [])
+
+    def test_own_private_comment_is_searchable(self):
+        mine = Comment.objects.create(
+            user=self.user, location=self.park, content='Mój ukryty wpis', privacy_status='private'
+        )
+        self.assertEqual(self._ids(q='ukryty'), [mine.id])
+
+    def test_content_update_reindexes(self):
+        self.turtle.content = 'Kaczki'
+        self.turtle.save()
+        self.assertEqual(self._ids(q='zolw'), [])
+        self.assertEqual(self._ids(q='kaczki'), [self.turtle.id])
+
+    def test_query_required(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,118 @@
+"""
+Testy endpointu GET /api/districts/stats/ — statystyki dzielnic do kartogramu.
+"""
+from datetime import datetime, timezone
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import MultiPolygon, Point, Polygon
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from emotions.models import EmotionPoint
+from map import district_index
+from map.models import District, Location
+
+User = get_user_model()
+
+
+def _square(x0, y0, x1, y1):
+    return MultiPolygon(Polygon(((x0, y0), (x1, y0), (x1, y1), (x0, y1), (x0, y0))), srid=4326)
+
+
+def _point(user, location, value, dt):
+    ep = EmotionPoint.objects.create(user=user, location=location, emotional_value=value)
+    EmotionPoint.objects.filter(pk=ep.pk).update(created_at=dt)
+    return ep
+
+
+class DistrictStatsAPITestCase(TestCase):
+    url = '/api/districts/stats/'
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(district_index.reset_index)
+
+        self.west = District.objects.create(name='Zachód', geometry=_square(18.0, 54.0, 18.5, 54.5))
+        self.east = District.objects.create(name='Wschód', geometry=_square(18.5, 54.0, 19.0, 54.5))
+        self.park = Location.objects.create(name='Park', coordinates=Point(18.2, 54.2, srid=4326))
+        self.plac = Location.objects.create(name='Plac', coordinates=Point(18.3, 54.3, srid=4326))
+        Location.objects.create(name='Morze', coordinates=Point(20.0, 55.0, srid=4326))
+
+        self.alice = User.objects.create_user(username='alice', password='x')
+        self.bob = User.objects.create_user(username='bob', password='x')
+
+        # alice w parku: 1 (styczeń) → 5 (marzec); w placu: 3 (luty)
+        _point(self.alice, self.park, 1, datetime(2026, 1, 10, tzinfo=timezone.utc))
+        _point(self.alice, self.park, 5, datetime(2026, 3, 10, tzinfo=timezone.utc))
+        _point(self.alice, self.plac, 3, datetime(2026, 2, 10, tzinfo=timezone.utc))
+        # bob w parku: 2 (luty)
+        _point(self.bob, self.park, 2, datetime(2026, 2, 15, tzinfo=timezone.utc))
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def _rows(self, query=''):
+        response = self.client.get(self.url + query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {row['name']: row for row in response.data}
+
+    def test_one_row_per_district_including_empty(self):
+        rows = self._rows()
+        self.assertEqual(list(rows), ['Wschód', 'Zachód'])
+
+        empty = rows['Wschód']
+        self.assertIsNone(empty['avg_emotional_value'])
+        self.assertIsNone(empty['mean_of_means'])
+        self.assertEqual(empty['emotion_points_count'], 0)
+        self.assertEqual(empty['voters_count'], 0)
+
+    def test_latest_per_user_and_mean_of_means(self):
+        west = self._rows()['Zachód']
+        # najnowsze per (user, lokalizacja): alice/park 5, alice/plac 3, bob/park 2 → 10/3
+        self.assertAlmostEqual(west['avg_emotional_value'], 10 / 3)
+        # alice: (1+5+3)/3 = 3, bob: 2 → 2.5
+        self.assertAlmostEqual(west['mean_of_means'], 2.5)
+        self.assertEqual(west['emotion_points_count'], 4)
+        self.assertEqual(west['voters_count'], 2)
+
+    def test_without_window_uses_latest_flag(self):
+        # Ten sam created_at — o najnowszym rozstrzyga id, jak przy is_latest
+        same_time = datetime(2026, 4, 1, tzinfo=timezone.utc)
+        _point(self.bob, self.plac, 1, same_time)
+        _point(self.bob, self.plac, 4, same_time)
+
+        west = self._rows()['Zachód']
+        # alice/park 5, alice/plac 3, bob/park 2, bob/plac 4
+        self.assertAlmostEqual(west['avg_emotional_value'], 3.5)
+        windowed = self._rows('?created_after=2026-01-01T00:00:00Z')['Zachód']
+        self.assertAlmostEqual(windowed['avg_emotional_value'], 3.5)
+
+    def test_time_window(self):
+        west = self._rows('?created_after=2026-02-01T00:00:00Z&created_before=2026-02-28T23:59:59Z')['Zachód']
+        # w lutym: alice/plac 3, bob/park 2
+        self.assertAlmostEqual(west['avg_emotional_value'], 2.5)
+        self.assertAlmostEqual(west['mean_of_means'], 2.5)
+        self.assertEqual(west['emotion_points_count'], 2)
+
+    def test_open_ended_window(self):
+        west = self._rows('?created_after=2026-03-01T00:00:00Z')['Zachód']
+        self.assertAlmostEqual(west['avg_emotional_value'], 5.0)
+        self.assertEqual(west['voters_count'], 1)
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            # force_authenticate — brak zapytania o sesję; wynik nie jest jeszcze w cache
+            self.client.get(self.url + '?created_after=2025-01-01T00:00:00Z')
+
+    def test_invalid_date_returns_400(self):
+        response = self.client.get(self.url + '?created_after=2026-13-01T00:00:00Z')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url + '?created_after=foo')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        response = self.client.get(self.url)
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
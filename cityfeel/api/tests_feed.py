@@ -0,0 +1,81 @@
+"""
+Testy feedu aktywności znajomych (/api/feed/) ze stronicowaniem po kluczu.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from auth.models import Friendship
+from emotions.models import Comment, EmotionPoint
+from map.models import Location
+
+User = get_user_model()
+
+
+class FeedAPITestCase(TestCase):
+    url = '/api/feed/'
+
+    def setUp(self):
+        cache.clear()
+        self.viewer = User.objects.create_user(username='viewer', password='x')
+        self.alice = User.objects.create_user(username='alice', password='x')
+        self.bob = User.objects.create_user(username='bob', password='x')
+        self.stranger = User.objects.create_user(username='stranger', password='x')
+        self.pending = User.objects.create_user(username='pending', password='x')
+
+        Friendship.objects.create(user=self.viewer, friend=self.alice, status=Friendship.ACCEPTED)
+        Friendship.objects.create(user=self.bob, friend=self.viewer, status=Friendship.ACCEPTED)
+        Friendship.objects.create(user=self.viewer, friend=self.pending)
+
+        self.park = Location.objects.create(name='Park', coordinates=Point(18.6, 54.35, srid=4326))
+
+        self.expected = []
+        for i in range(3):
+            for user in (self.alice, self.bob):
+                ep = EmotionPoint.objects.create(user=user, location=self.park, emotional_value=i + 1)
+                self.expected.insert(0, ep.id)
+        for user in (self.stranger, self.pending):
+            EmotionPoint.objects.create(user=user, location=self.park, emotional_value=3)
+        EmotionPoint.objects.create(user=self.alice, location=self.park, emotional_value=1, privacy_status='private')
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.viewer)
+
+    def test_friends_public_points_newest_first(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in response.data['results']], self.expected)
+        self.assertIsNone(response.data['next'])
+        self.assertEqual(response.data['results'][0]['location']['name'], 'Park')
+
+    def test_keyset_pages(self):
+        seen = []
+        url = f'{self.url}?limit=4'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual(seen, self.expected)
+
+    def test_includes_public_comment(self):
+        latest = EmotionPoint.objects.create(user=self.alice, location=self.park, emotional_value=5)
+        Comment.objects.create(
+            user=self.alice, location=self.park, emotion_point=latest, content='Pięknie'
+        )
+
+        response = self.client.get(self.url, {'limit': 1})
+        self.assertEqual(response.data['results'][0]['comment'], 'Pięknie')
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'nie-kursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_no_friends(self):
+        self.client.force_authenticate(self.stranger)
+        self.assertEqual(self.client.get(self.url).data, {'next': None, 'results': []})
@@ -0,0 +1,75 @@
+"""
+Testy warstwy „tylko znajomi” (?friends_only=1) na /api/locations/ i w histogramie.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from auth.models import Friendship
+from emotions.models import EmotionPoint
+from map.models import Location
+
+User = get_user_model()
+
+
+class FriendsOnlyLayerTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.viewer = User.objects.create_user(username='viewer', password='x')
+        self.friend = User.objects.create_user(username='friend', password='x')
+        self.stranger = User.objects.create_user(username='stranger', password='x')
+        Friendship.objects.create(user=self.viewer, friend=self.friend, status=Friendship.ACCEPTED)
+
+        self.park = Location.objects.create(name='Park', coordinates=Point(18.60, 54.35, srid=4326))
+        self.port = Location.objects.create(name='Port', coordinates=Point(18.70, 54.40, srid=4326))
+
+        EmotionPoint.objects.create(user=self.friend, location=self.park, emotional_value=2)
+        EmotionPoint.objects.create(user=self.friend, location=self.park, emotional_value=4)
+        EmotionPoint.objects.create(user=self.stranger, location=self.park, emotional_value=1)
+        EmotionPoint.objects.create(user=self.stranger, location=self.port, emotional_value=5)
+        EmotionPoint.objects.create(user=self.friend, location=self.port, emotional_value=1, privacy_status='private')
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.viewer)
+
+    def _locations(self, query=''):
+        response = self.client.get('/api/locations/' + query)
+        self.assertEqual(response.status_code, 200)
+        return {loc['name']: loc for loc in response.data}
+
+    def test_global_layer_unchanged(self):
+        locations = self._locations()
+        self.assertEqual(set(locations), {'Park', 'Port'})
+        self.assertAlmostEqual(float(locations['Park']['avg_emotional_value']), 2.5)
+
+    def test_friends_only_aggregates_friends_public_votes(self):
+        locations = self._locations('?friends_only=1')
+
+        self.assertEqual(set(locations), {'Park'})
+        self.assertAlmostEqual(float(locations['Park']['avg_emotional_value']), 4.0)
+        self.assertEqual(locations['Park']['emotion_points_count'], 2)
+
+    def test_friends_only_with_time_window(self):
+        locations = self._locations(
+            '?friends_only=1&created_after=2000-01-01T00:00:00Z&created_before=2100-01-01T00:00:00Z'
+        )
+        self.assertAlmostEqual(float(locations['Park']['avg_emotional_value']), 3.0)
+
+    def test_histogram_friends_only(self):
+        url = '/api/emotion-points/histogram/'
+        total = sum(b['count'] for b in self.client.get(url).data)
+        friends = sum(b['count'] for b in self.client.get(url, {'friends_only': 1}).data)
+
+        self.assertEqual(total, 5)
+        self.assertEqual(friends, 2)
+
+    def test_histogram_cache_follows_friend_set(self):
+        url = '/api/emotion-points/histogram/'
+        self.client.get(url, {'friends_only': 1})
+
+        Friendship.objects.create(user=self.stranger, friend=self.viewer, status=Friendship.ACCEPTED)
+        friends = sum(b['count'] for b in self.client.get(url, {'friends_only': 1}).data)
+        self.assertEqual(friends, 4)
@@ -0,0 +1,170 @@
+"""
+Testy wznawialnego uploadu zdjęć w kawałkach (/api/photo-uploads/).
+"""
+import hashlib
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from emotions.models import Photo, PhotoUpload
+from emotions import uploads
+from map.models import Location
+
+User = get_user_model()
+
+
+def _jpeg_bytes():
+    buffer = io.BytesIO()
+    Image.effect_noise((300, 200), 64).convert('RGB').save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+
+class PhotoUploadAPITestCase(TestCase):
+    url = '/api/photo-uploads/'
+
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, ignore_errors=True)
+        settings_override = override_settings(
+            MEDIA_ROOT=f'{tmp}/media',
+            CITYFEEL_UPLOAD_TEMP_DIR=f'{tmp}/uploads',
+            CITYFEEL_PHOTO_DERIVATIVES_ASYNC=False,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(username='alice', password='x')
+        self.location = Location.objects.create(name='Plac', coordinates=Point(18.6, 54.35, srid=4326))
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.data = _jpeg_bytes()
+
+    def _start(self, data=None, sha256=None):
+        data = self.data if data is None else data
+        response = self.client.post(self.url, {
+            'location': self.location.pk,
+            'filename': 'foto.jpg',
+            'size': len(data),
+            'sha256': sha256 or hashlib.sha256(data).hexdigest(),
+            'caption': 'Widok',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['offset'], 0)
+        return response.data['id']
+
+    def _chunk(self, upload_id, offset, data):
+        return self.client.generic(
+            'PUT', f'{self.url}{upload_id}/chunk/', data,
+            content_type='application/offset+octet-stream',
+            HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def _upload_all(self, upload_id, chunk_size=4096):
+        for offset in range(0, len(self.data), chunk_size):
+            response = self._chunk(upload_id, offset, self.data[offset:offset + chunk_size])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_chunked_upload_attaches_photo(self):
+        upload_id = self._start()
+        self._upload_all(upload_id)
+
+        response = self.client.post(f'{self.url}{upload_id}/complete/')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        photo = Photo.objects.get(pk=response.data['photo_id'])
+        self.assertEqual(photo.user, self.user)
+        self.assertEqual(photo.caption, 'Widok')
+        with photo.image.open('rb') as f:
+            self.assertEqual(f.read(), self.data)
+
+        # Ponowne "complete" nie tworzy drugiego zdjęcia
+        again = self.client.post(f'{self.url}{upload_id}/complete/')
+        self.assertEqual(again.data['photo_id'], photo.pk)
+        self.assertEqual(Photo.objects.count(), 1)
+
+    def test_resume_from_reported_offset(self):
+        upload_id = self._start()
+        self._chunk(upload_id, 0, self.data[:5000])
+
+        # Powtórzony kawałek z nieaktualnym offsetem — 409 z bieżącym offsetem
+        conflict = self._chunk(upload_id, 0, self.data[:5000])
+        self.assertEqual(conflict.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(conflict['Upload-Offset'], '5000')
+
+        offset = self.client.get(f'{self.url}{upload_id}/').data['offset']
+        self.assertEqual(offset, 5000)
+        self._chunk(upload_id, offset, self.data[offset:])
+
+        response = self.client.post(f'{self.url}{upload_id}/complete/')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_checksum_mismatch_resets_upload(self):
+        upload_id = self._start(sha256='0' * 64)
+        self._upload_all(upload_id)
+
+        response = self.client.post(f'{self.url}{upload_id}/complete/')
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(PhotoUpload.objects.get(pk=upload_id).offset, 0)
+        self.assertFalse(Photo.objects.exists())
+
+    def test_incomplete_upload_cannot_be_completed(self):
+        upload_id = self._start()
+        self._chunk(upload_id, 0, self.data[:100])
+
+        response = self.client.post(f'{self.url}{upload_id}/complete/')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_chunk_past_declared_size_rejected(self):
+        upload_id = self._start()
+        response = self._chunk(upload_id, 0, self.data + b'extra')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_non_image_rejected(self):
+        self.data = b'not an image' * 100
+        upload_id = self._start()
+        self._upload_all(upload_id)
+
+        response = self.client.post(f'{self.url}{upload_id}/complete/')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_chunk_size_limit_read_from_settings(self):
+        upload_id = self._start()
+        with override_settings(CITYFEEL_UPLOAD_MAX_CHUNK_SIZE=1024):
+            response = self._chunk(upload_id, 0, self.data[:2048])
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.assertEqual(PhotoUpload.objects.get(pk=upload_id).offset, 0)
+
+    def test_cleanup_keeps_completed_uploads(self):
+        pending_id = self._start()
+        completed_id = self._start()
+        self._upload_all(completed_id)
+        self.client.post(f'{self.url}{completed_id}/complete/')
+
+        self.assertEqual(uploads.cleanup_stale_uploads(timedelta(0)), 1)
+        self.assertFalse(PhotoUpload.objects.filter(pk=pending_id).exists())
+        self.assertEqual(PhotoUpload.objects.get(pk=completed_id).status, PhotoUpload.STATUS_COMPLETED)
+
+    def test_too_large_file_rejected_upfront(self):
+        response = self.client.post(self.url, {
+            'location': self.location.pk,
+            'filename': 'big.jpg',
+            'size': uploads.MAX_UPLOAD_SIZE + 1,
+            'sha256': '0' * 64,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+    def test_other_users_upload_not_found(self):
+        upload_id = self._start()
+        other = User.objects.create_user(username='bob', password='x')
+        self.client.force_authenticate(other)
+
+        response = self._chunk(upload_id, 0, self.data[:10])
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,50 @@
+"""
+Testy wyszukiwarki z tolerancją literówek (/api/search/).
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from map.models import Location
+
+User = get_user_model()
+
+
+class SearchAPITestCase(TestCase):
+    url = '/api/search/'
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='viewer', password='x')
+        User.objects.create_user(username='katarzyna', password='x')
+        User.objects.create_user(username='nieaktywny_kat', password='x', is_active=False)
+        for i, name in enumerate(['Plac Solidarności', 'Park Oliwski', 'Dworzec Główny', 'Park Reagana']):
+            Location.objects.create(name=name, coordinates=Point(18.6 + i / 100, 54.35, srid=4326))
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_tolerates_typos(self):
+        response = self.client.get(self.url, {'q': 'oliwsky'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['locations'][0]['name'], 'Park Oliwski')
+
+    def test_substring_match_and_inactive_users_hidden(self):
+        response = self.client.get(self.url, {'q': 'kat'})
+
+        self.assertEqual([u['username'] for u in response.data['users']], ['katarzyna'])
+
+    def test_limit(self):
+        response = self.client.get(self.url, {'q': 'park', 'limit': 1})
+
+        self.assertEqual(len(response.data['locations']), 1)
+        self.assertIn(response.data['locations'][0]['name'], {'Park Oliwski', 'Park Reagana'})
+
+    def test_too_short_query(self):
+        self.assertEqual(self.client.get(self.url, {'q': 'p'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_requires_authentication(self):
+        response = APIClient().get(self.url, {'q': 'park'})
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
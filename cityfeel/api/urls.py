@@ -10,9 +10,13 @@ app_name = 'api'
 router = routers.SimpleRouter()
 router.register('emotion-points', views.EmotionPointViewSet, basename='emotion_points')
 router.register('locations', views.LocationViewSet, basename='locations')
+router.register('districts', views.DistrictViewSet, basename='districts')
+router.register('search', views.SearchViewSet, basename='search')
+router.register('feed', views.FeedViewSet, basename='feed')
 router.register('friendship', views.FriendshipViewSet, basename='friendship')
 router.register('comments', views.CommentViewSet, basename='comments')
 router.register('reports', views.ReportViewSet, basename='reports')
+router.register('photo-uploads', views.PhotoUploadViewSet, basename='photo_uploads')
 
 urlpatterns = [
     path('schema/', SpectacularAPIView.as_view(), name='schema'),
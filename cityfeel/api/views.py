@@ -11,6 +11,7 @@ from django.core.cache import cache
 from django.contrib.gis.geos import Point
 from django.contrib.gis.measure import D
 from django.contrib.gis.db.models.functions import Distance
+from urllib.parse import urlencode
 
 BUCKET_TRUNC = {
     'hour': TruncHour,
@@ -20,26 +21,45 @@ BUCKET_TRUNC = {
 }
 DEFAULT_BUCKET = 'day'
 
-from emotions.models import EmotionPoint, Comment, Report
+from emotions.models import EmotionPoint, Comment, Report, PhotoUpload
+from emotions import uploads
+from emotions.search import search_comments
 from map.models import Location
-from auth.models import Friendship, CFUser
+from auth.models import Friendship, FriendEdge, CFUser
+from auth.friends import get_friend_ids
 from .serializers import (
     EmotionPointSerializer,
     LocationListSerializer,
     FriendshipSerializer,
     FriendUserSerializer,
     CommentSerializer,
-    ReportSerializer
+    CommentSearchResultSerializer,
+    ReportSerializer,
+    DistrictStatsSerializer,
+    PhotoUploadSerializer,
+    LocationSearchResultSerializer,
+    UserSearchResultSerializer,
+    FeedItemSerializer,
 )
-from .filters import LocationFilter, EmotionPointFilter
+from .filters import LocationFilter, EmotionPointFilter, CommentSearchFilter
+from . import search
+from . import feed
 from .aggregation import (
     annotate_latest_per_user_avg,
     annotate_windowed_mean_of_means_avg,
+    district_stats,
 )
 
 
+def _friend_ids_param(request):
+    """Zbiór id znajomych przy ``?friends_only=1``, inaczej ``None`` (wszyscy użytkownicy)."""
+    if request.query_params.get('friends_only') in ('1', 'true'):
+        return get_friend_ids(request.user.pk)
+    return None
+
+
 class EmotionPointViewSet(ModelViewSet):
-    queryset = EmotionPoint.objects.filter(privacy_status='public').order_by('-created_at')
+    queryset = EmotionPoint.objects.filter(privacy_status='public', is_hidden=False).order_by('-created_at')
     serializer_class = EmotionPointSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
@@ -49,6 +69,9 @@ class EmotionPointViewSet(ModelViewSet):
     def histogram(self, request):
         query_string = request.META.get('QUERY_STRING', '')
         cache_key = f"hist_data_{hash(query_string)}"
+        if _friend_ids_param(request) is not None:
+            # Wynik zależy od zbioru znajomych — klucz zmienia się razem z nim
+            cache_key += f"_friends_{request.user.pk}_{hash(get_friend_ids(request.user.pk))}"
 
         cached_response = cache.get(cache_key)
         if cached_response:
@@ -59,7 +82,10 @@ class EmotionPointViewSet(ModelViewSet):
         if trunc is None:
             return Response({'detail': f"Niepoprawny bucket."}, status=status.HTTP_400_BAD_REQUEST)
 
-        base_qs = EmotionPoint.objects.all()
+        base_qs = EmotionPoint.objects.filter(is_hidden=False)
+        friend_ids = _friend_ids_param(request)
+        if friend_ids is not None:
+            base_qs = base_qs.filter(user_id__in=friend_ids, privacy_status='public')
         filtered = self.filterset_class(request.query_params, queryset=base_qs).qs
 
         buckets = (
@@ -109,10 +135,21 @@ class LocationViewSet(ReadOnlyModelViewSet):
         ca = parse_datetime(request.query_params.get('created_after', '') or '') if request else None
         cb = parse_datetime(request.query_params.get('created_before', '') or '') if request else None
 
+        # 3. Warstwa „tylko znajomi”: miejsca i statystyki z publicznych wpisów znajomych
+        # (zbiór id z cache — bez JOIN-a z auth_friendship w zapytaniu)
+        friend_ids = _friend_ids_param(request)
+        friends_filter = Q()
+        visible = Q(emotion_points__is_hidden=False)
+        if friend_ids is not None:
+            friends_filter = Q(emotion_points__user_id__in=friend_ids, emotion_points__privacy_status='public')
+
         if ca and cb:
             # Włączony filtr czasu:
             # Wyszukujemy miejsca aktywne TYLKO w tym oknie czasowym
-            time_filter = Q(emotion_points__created_at__gte=ca) & Q(emotion_points__created_at__lte=cb)
+            time_filter = (
+                Q(emotion_points__created_at__gte=ca) & Q(emotion_points__created_at__lte=cb)
+                & friends_filter & visible
+            )
 
             fast_ids = list(
                 base.filter(time_filter)  # Odrzucamy miejsca "z przyszłości" i martwe w tym czasie
@@ -122,19 +159,21 @@ class LocationViewSet(ReadOnlyModelViewSet):
             )
         else:
             # Domyślnie (Brak filtra): 100 najświeższych punktów z całego życia aplikacji
+            # (Max po filtrze na emotion_points liczy się z tego samego JOIN-a — tylko wpisy znajomych)
             fast_ids = list(
-                base.annotate(last_activity=Max('emotion_points__created_at'))
+                base.filter(friends_filter)
+                .annotate(last_activity=Max('emotion_points__created_at', filter=visible))
                 .order_by(F('last_activity').desc(nulls_last=True))
                 .values_list('id', flat=True)[:100]
             )
 
-        # 3. Zasilamy znalezioną historyczną setkę dokładnymi statystykami
+        # 4. Zasilamy znalezioną historyczną setkę dokładnymi statystykami
         qs = Location.objects.filter(id__in=fast_ids)
 
         if ca and cb:
-            qs = annotate_windowed_mean_of_means_avg(qs, ca, cb)
+            qs = annotate_windowed_mean_of_means_avg(qs, ca, cb, user_ids=friend_ids)
         else:
-            qs = annotate_latest_per_user_avg(qs)
+            qs = annotate_latest_per_user_avg(qs, user_ids=friend_ids)
 
         return qs
 
@@ -184,7 +223,7 @@ class LocationViewSet(ReadOnlyModelViewSet):
         if trunc is None:
             return Response({'detail': f"Niepoprawny bucket."}, status=status.HTTP_400_BAD_REQUEST)
 
-        qs = EmotionPoint.objects.filter(location_id=pk)
+        qs = EmotionPoint.objects.filter(location_id=pk, is_hidden=False)
 
         ca = parse_datetime(request.query_params.get('created_after', '') or '')
         cb = parse_datetime(request.query_params.get('created_before', '') or '')
@@ -211,14 +250,115 @@ class LocationViewSet(ReadOnlyModelViewSet):
         ])
 
 
+class DistrictViewSet(GenericViewSet):
+    """
+    Statystyki dzielnic dla kartogramu miasta.
+
+    GET /api/districts/stats/?created_after=…&created_before=… — jeden wiersz na dzielnicę
+    (obie granice okna opcjonalne, ISO 8601). Liczone jednym zapytaniem grupującym po
+    przypisanej dzielnicy lokalizacji (``api.aggregation.district_stats``).
+    """
+    serializer_class = DistrictStatsSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = None
+
+    @action(detail=False, methods=['get'], url_path='stats')
+    def stats(self, request):
+        bounds = {}
+        for param in ('created_after', 'created_before'):
+            raw = request.query_params.get(param, '')
+            try:
+                # parse_datetime zwraca None dla złego formatu, a ValueError dla złej daty
+                bounds[param] = parse_datetime(raw) if raw else None
+            except ValueError:
+                bounds[param] = None
+            if raw and bounds[param] is None:
+                return Response({'detail': f'Niepoprawna data: {param}.'}, status=status.HTTP_400_BAD_REQUEST)
+        ca, cb = bounds['created_after'], bounds['created_before']
+
+        cache_key = f"district_stats_{ca.isoformat() if ca else ''}_{cb.isoformat() if cb else ''}"
+        response_data = cache.get(cache_key)
+        if response_data is None:
+            response_data = self.get_serializer(district_stats(ca, cb), many=True).data
+            cache.set(cache_key, response_data, 300)
+
+        return Response(response_data)
+
+
+class SearchViewSet(GenericViewSet):
+    """
+    Wyszukiwarka z tolerancją literówek (``api.search``, pg_trgm).
+
+    GET /api/search/?q=…&limit=… — ``{"locations": [...], "users": [...]}``, w każdej
+    grupie najlepsze dopasowania malejąco po podobieństwie (``limit`` domyślnie 10, max 50).
+    """
+    permission_classes = [IsAuthenticated]
+    pagination_class = None
+
+    def list(self, request):
+        q = request.query_params.get('q', '').strip()
+        if len(q) < search.MIN_QUERY_LENGTH:
+            return Response(
+                {'detail': f'Parametr q musi mieć co najmniej {search.MIN_QUERY_LENGTH} znaki.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            limit = int(request.query_params.get('limit', search.DEFAULT_LIMIT))
+        except ValueError:
+            return Response({'detail': 'Niepoprawny limit.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = search.search(q, limit=limit)
+        return Response({
+            'locations': LocationSearchResultSerializer(results['locations'], many=True).data,
+            'users': UserSearchResultSerializer(results['users'], many=True).data,
+        })
+
+
+class FeedViewSet(GenericViewSet):
+    """
+    Aktywność znajomych (``api.feed``).
+
+    GET /api/feed/?limit=…&cursor=… — ``{"next": url|null, "results": [...]}``: publiczne
+    oceny zaakceptowanych znajomych od najnowszych. ``next`` prowadzi do kolejnej strony
+    (kursor po ``(created_at, id)``), ``null`` na ostatniej.
+    """
+    serializer_class = FeedItemSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = None
+
+    def list(self, request):
+        try:
+            limit = int(request.query_params.get('limit', feed.DEFAULT_LIMIT))
+        except ValueError:
+            return Response({'detail': 'Niepoprawny limit.'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, feed.MAX_LIMIT))
+
+        cursor = request.query_params.get('cursor')
+        try:
+            cursor = feed.decode_cursor(cursor) if cursor else None
+        except feed.InvalidCursor:
+            return Response({'detail': 'Niepoprawny kursor.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        items = feed.friends_feed(get_friend_ids(request.user.pk), limit=limit, cursor=cursor)
+
+        next_url = None
+        if len(items) == limit:
+            query = urlencode({'limit': limit, 'cursor': feed.encode_cursor(items[-1])})
+            next_url = request.build_absolute_uri(f"{request.path}?{query}")
+        return Response({
+            'next': next_url,
+            'results': self.get_serializer(items, many=True).data,
+        })
+
+
 class FriendshipViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.DestroyModelMixin,
                         mixins.UpdateModelMixin, GenericViewSet):
     serializer_class = FriendshipSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        user = self.request.user
-        return Friendship.objects.filter(Q(user=user) | Q(friend=user))
+        # Relacje, w których user jest którąkolwiek stroną — po krawędziach (user_id = …)
+        return Friendship.objects.filter(edges__user=self.request.user)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -232,15 +372,12 @@ class FriendshipViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixi
 
     @action(detail=False, methods=['get'], url_path='friends')
     def friends_list(self, request):
-        user = request.user
-        friendships = Friendship.objects.filter(
-            (Q(user=user) | Q(friend=user)) & Q(status=Friendship.ACCEPTED)).select_related('user', 'friend')
+        edges = FriendEdge.objects.filter(user=request.user, status=Friendship.ACCEPTED).select_related('other')
         friends_data = []
-        for f in friendships:
-            is_sender = f.user == user
-            friend_user = f.friend if is_sender else f.user
-            friend_user.friendship_id = f.id
-            friend_user.friendship_since = f.created_at
+        for edge in edges:
+            friend_user = edge.other
+            friend_user.friendship_id = edge.friendship_id
+            friend_user.friendship_since = edge.created_at
             friends_data.append(friend_user)
 
         serializer = FriendUserSerializer(friends_data, many=True, context={'request': request})
@@ -251,6 +388,7 @@ class CommentViewSet(mixins.CreateModelMixin, GenericViewSet):
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticated]
     queryset = Comment.objects.all()
+    filterset_class = CommentSearchFilter  # używany tylko przez akcję search
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -259,8 +397,83 @@ class CommentViewSet(mixins.CreateModelMixin, GenericViewSet):
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
+    @action(detail=False, methods=['get'], url_path='search', serializer_class=CommentSearchResultSerializer)
+    def search(self, request):
+        """
+        GET /api/comments/search/?q=…&location=…&bbox=…&sentiment_label=…&created_after=…&created_before=…
+
+        Wyszukiwanie pełnotekstowe (``emotions.search``) wśród komentarzy publicznych
+        i własnych, od najtrafniejszych; wyniki stronicowane.
+        """
+        q = request.query_params.get('q', '').strip()
+        if not q:
+            return Response({'detail': 'Parametr q jest wymagany.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.filter_queryset(
+            Comment.objects
+            .filter(Q(privacy_status='public') | Q(user=request.user), is_hidden=False)
+            .select_related('user', 'location')
+        )
+        page = self.paginate_queryset(search_comments(queryset, q))
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
 
 class ReportViewSet(mixins.CreateModelMixin, GenericViewSet):
     serializer_class = ReportSerializer
     permission_classes = [IsAuthenticated]
-    queryset = Report.objects.all()
\ No newline at end of file
+    queryset = Report.objects.all()
+
+
+class PhotoUploadViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, GenericViewSet):
+    """
+    Wznawialny upload zdjęć w kawałkach — przebieg opisany w emotions.uploads.
+
+    Kawałek (PUT .../chunk/) to surowe bajty z nagłówkiem ``Upload-Offset``; ciało żądania
+    nie przechodzi przez parsery DRF, tylko jest strumieniowane do pliku tymczasowego.
+    """
+    serializer_class = PhotoUploadSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return PhotoUpload.objects.filter(user=self.request.user)
+
+    def _error(self, error):
+        data = {'detail': str(error)}
+        headers = {}
+        if error.offset is not None:
+            data['offset'] = error.offset
+            headers['Upload-Offset'] = str(error.offset)
+        return Response(data, status=error.status, headers=headers)
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            upload = uploads.start_upload(user=request.user, **serializer.validated_data)
+        except uploads.UploadError as e:
+            return self._error(e)
+        return Response(self.get_serializer(upload).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['put'], url_path='chunk')
+    def chunk(self, request, pk=None):
+        upload = self.get_object()
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return Response({'detail': 'Brak lub niepoprawny nagłówek Upload-Offset.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            upload = uploads.write_chunk(upload.pk, offset, request.stream, length)
+        except uploads.UploadError as e:
+            return self._error(e)
+        return Response(self.get_serializer(upload).data, headers={'Upload-Offset': str(upload.offset)})
+
+    @action(detail=True, methods=['post'], url_path='complete')
+    def complete(self, request, pk=None):
+        upload = self.get_object()
+        try:
+            upload = uploads.complete_upload(upload.pk)
+        except uploads.UploadError as e:
+            return self._error(e)
+        return Response(self.get_serializer(upload).data, status=status.HTTP_201_CREATED)
@@ -5,3 +5,6 @@ class AuthConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'auth'
     label = 'cf_auth'  # Unique label to avoid conflict with django.contrib.auth
+
+    def ready(self):
+        import auth.signals  # noqa: F401
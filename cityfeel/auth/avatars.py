@@ -0,0 +1,90 @@
+"""
+Kwadratowe warianty awatarów (32/64/256 px) generowane w tle po zmianie awatara.
+
+Listy (społeczność, znajomi, API znajomych) pokazują awatary 50–60 px, a profil
+150 px — zamiast oryginału (do 5 MB) serwujemy wariant o najbliższym większym
+rozmiarze (``CFUser.get_avatar_url(size)``). Obraz przycinamy do kwadratu ze środka,
+stosujemy orientację z EXIF i zapisujemy jako JPEG bez metadanych.
+
+Warianty leżą obok oryginału w storage adresowanym treścią (emotions.storage),
+a ich nazwy zawierają odcisk parametrów (``emotions.photos.variant_version``), więc
+ich URL-e też są niezmienne. Kolejkowanie: ``emotions.photos.submit_after_commit``.
+Awatary sprzed wdrożenia: ``python manage.py build_avatar_variants``.
+"""
+import io
+import logging
+
+from PIL import Image, ImageOps
+
+from emotions.photos import (
+    delete_files, derivative_path, derivative_storage, prepare_image, save_derivative, submit_after_commit,
+    unshared_paths, variant_version,
+)
+
+logger = logging.getLogger(__name__)
+
+AVATAR_SIZES = (32, 64, 256)
+JPEG_OPTIONS = {'quality': 85, 'optimize': True}
+
+
+def render_avatar_variants(fp):
+    """Zwraca ``{rozmiar: bajty JPEG}`` dla wszystkich AVATAR_SIZES."""
+    with Image.open(fp) as source:
+        source.draft('RGB', (max(AVATAR_SIZES), max(AVATAR_SIZES)))
+        image = prepare_image(source)
+
+    rendered = {}
+    for size in sorted(AVATAR_SIZES, reverse=True):
+        image = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG', **JPEG_OPTIONS)
+        rendered[size] = buffer.getvalue()
+    return rendered
+
+
+def build_avatar_variants(user):
+    """Generuje warianty awatara i zapisuje je w ``CFUser.avatar_variants`` (bez sygnałów)."""
+    from .models import CFUser
+
+    version = variant_version(AVATAR_SIZES, JPEG_OPTIONS)
+    paths = {size: derivative_path(user.avatar.name, f'{version}.{size}.jpg') for size in AVATAR_SIZES}
+    if all(derivative_storage.exists(path) for path in paths.values()):
+        # Te same warianty ma już inny użytkownik z identycznym awatarem
+        variants = {str(size): path for size, path in paths.items()}
+    else:
+        with user.avatar.open('rb') as fp:
+            rendered = render_avatar_variants(fp)
+        variants = {str(size): save_derivative(paths[size], data) for size, data in rendered.items()}
+
+    # Awatar mógł się zmienić w trakcie przetwarzania — wtedy wynik jest nieaktualny
+    updated = CFUser.objects.filter(pk=user.pk, avatar=user.avatar.name).update(avatar_variants=variants)
+    if updated:
+        stale = set((user.avatar_variants or {}).values()) - set(variants.values())
+        if stale:
+            others = CFUser.objects.filter(avatar=user.avatar.name).exclude(pk=user.pk)
+            delete_files(unshared_paths(stale, others.values_list('avatar_variants', flat=True)))
+        user.avatar_variants = variants
+    return variants
+
+
+def process_avatar(user_id):
+    from .models import CFUser
+
+    user = CFUser.objects.filter(pk=user_id).first()
+    if user is None or not user.avatar:
+        return None
+    try:
+        return build_avatar_variants(user)
+    except Exception:
+        logger.exception("Nie udało się wygenerować wariantów awatara użytkownika %s", user_id)
+        return None
+
+
+def schedule(user_id):
+    submit_after_commit(process_avatar, user_id)
+
+
+def delete_variant_files(variants):
+    paths = list((variants or {}).values())
+    if paths:
+        delete_files(paths)
@@ -0,0 +1,65 @@
+"""
+Szybkie sprawdzanie znajomości: symetryczne krawędzie (``FriendEdge``) i zbiór id
+znajomych w cache.
+
+- ``sync_edges(friendship)`` — zapisuje obie krawędzie relacji (UPSERT po (user, other));
+  wołane z sygnału po każdym zapisie ``Friendship``. Usunięcie relacji kasuje krawędzie
+  kaskadą (FK ``friendship``).
+- ``get_friend_ids(user_id)`` — ``frozenset`` id zaakceptowanych znajomych, z cache
+  (read-through, jedno zapytanie po indeksie (user, status, other) przy braku wpisu).
+  Sygnały zapisu/usunięcia relacji unieważniają wpisy obu stron.
+- ``are_friends(a, b)`` — test przynależności do zbioru, bez zapytania przy ciepłym cache.
+"""
+from django.core.cache import cache
+
+from .models import Friendship, FriendEdge
+
+
+FRIEND_IDS_CACHE_TIMEOUT = 60 * 60
+
+
+def _cache_key(user_id):
+    return f'friend_ids_v1_{user_id}'
+
+
+def sync_edges(friendship):
+    """Tworzy/aktualizuje obie krawędzie relacji i unieważnia zbiory znajomych obu stron."""
+    common = {
+        'friendship_id': friendship.pk,
+        'status': friendship.status,
+        'created_at': friendship.created_at,
+    }
+    FriendEdge.objects.bulk_create(
+        [
+            FriendEdge(user_id=friendship.user_id, other_id=friendship.friend_id,
+                       direction=FriendEdge.SENT, **common),
+            FriendEdge(user_id=friendship.friend_id, other_id=friendship.user_id,
+                       direction=FriendEdge.RECEIVED, **common),
+        ],
+        update_conflicts=True,
+        unique_fields=['user', 'other'],
+        update_fields=['friendship', 'status', 'direction', 'created_at'],
+    )
+    invalidate_friend_ids(friendship.user_id, friendship.friend_id)
+
+
+def get_friend_ids(user_id):
+    """Zbiór id zaakceptowanych znajomych użytkownika (z cache)."""
+    key = _cache_key(user_id)
+    friend_ids = cache.get(key)
+    if friend_ids is None:
+        friend_ids = frozenset(
+            FriendEdge.objects
+            .filter(user_id=user_id, status=Friendship.ACCEPTED)
+            .values_list('other_id', flat=True)
+        )
+        cache.set(key, friend_ids, FRIEND_IDS_CACHE_TIMEOUT)
+    return friend_ids
+
+
+def are_friends(user_id, other_id):
+    return other_id in get_friend_ids(user_id)
+
+
+def invalidate_friend_ids(*user_ids):
+    cache.delete_many([_cache_key(pk) for pk in user_ids])
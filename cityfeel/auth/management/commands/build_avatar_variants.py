@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from auth import avatars
+from auth.models import CFUser
+
+
+class Command(BaseCommand):
+    help = "Generuje kwadratowe warianty awatarów (32/64/256 px) dla użytkowników, którzy ich nie mają"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help="Generuj ponownie także dla awatarów, które mają już warianty",
+        )
+
+    def handle(self, *args, **options):
+        qs = CFUser.objects.exclude(avatar='').exclude(avatar__isnull=True).order_by('pk')
+        if not options['all']:
+            qs = qs.filter(avatar_variants={})
+
+        done = failed = 0
+        for user_id in qs.values_list('pk', flat=True).iterator():
+            if avatars.process_avatar(user_id) is None:
+                failed += 1
+            else:
+                done += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Gotowe. Warianty awatarów: {done}, błędy: {failed}."))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from auth import suggestions
+
+
+class Command(BaseCommand):
+    help = "Przelicza propozycje znajomych (użytkownicy oceniający te same miejsca)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=suggestions.DEFAULT_TOP_K,
+            help=f"Ile propozycji zapisać na użytkownika (domyślnie {suggestions.DEFAULT_TOP_K})",
+        )
+
+    def handle(self, *args, **options):
+        count = suggestions.rebuild_suggestions(top_k=options['top_k'])
+        self.stdout.write(self.style.SUCCESS(f"Gotowe. Zapisano {count} propozycji znajomych."))
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:05
+
+import auth.models
+import emotions.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cf_auth', '0003_friendship'),
+        # Storage awatarów liczy referencje w emotions_stored_file
+        ('emotions', '0016_stored_file'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='cfuser',
+            name='avatar',
+            field=models.ImageField(blank=True, help_text='Zdjęcie profilowe użytkownika', max_length=500, null=True, storage=emotions.storage.get_content_hash_storage, upload_to=auth.models.user_avatar_upload_path),
+        ),
+    ]
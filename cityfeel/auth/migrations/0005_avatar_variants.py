@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cf_auth', '0004_avatar_content_hash_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cfuser',
+            name='avatar_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Warianty awatara generowane w tle'),
+        ),
+    ]
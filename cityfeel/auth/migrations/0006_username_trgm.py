@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:00
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        # Rozszerzenie pg_trgm tworzy migracja map
+        ('map', '0004_location_name_trgm'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('cf_auth', '0005_avatar_variants'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cfuser',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('username'), name='gin_trgm_ops'), name='user_username_trgm_idx'),
+        ),
+    ]
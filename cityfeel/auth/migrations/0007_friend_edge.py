@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Dwie krawędzie (po jednej na stronę) dla istniejących znajomości.
+BACKFILL_SQL = """
+    INSERT INTO auth_friend_edge (user_id, other_id, friendship_id, status, direction, created_at)
+    SELECT f.user_id, f.friend_id, f.id, f.status, 'sent', f.created_at FROM auth_friendship f
+    UNION ALL
+    SELECT f.friend_id, f.user_id, f.id, f.status, 'received', f.created_at FROM auth_friendship f
+    ON CONFLICT (user_id, other_id) DO NOTHING
+"""
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cf_auth', '0006_username_trgm'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FriendEdge',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Oczekujące'), ('accepted', 'Zaakceptowane')], help_text='Status relacji (kopia z Friendship)', max_length=10)),
+                ('direction', models.CharField(choices=[('sent', 'Wysłane'), ('received', 'Otrzymane')], help_text='Czy użytkownik wysłał, czy otrzymał zaproszenie', max_length=10)),
+                ('created_at', models.DateTimeField(help_text='Data utworzenia relacji (kopia z Friendship)')),
+                ('friendship', models.ForeignKey(help_text='Relacja źródłowa', on_delete=django.db.models.deletion.CASCADE, related_name='edges', to='cf_auth.friendship')),
+                ('other', models.ForeignKey(help_text='Druga strona relacji', on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(help_text='Użytkownik, z którego perspektywy opisana jest relacja', on_delete=django.db.models.deletion.CASCADE, related_name='friend_edges', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Krawędź znajomości',
+                'verbose_name_plural': 'Krawędzie znajomości',
+                'db_table': 'auth_friend_edge',
+                'indexes': [models.Index(fields=['user', 'status', 'other'], name='friend_edge_user_status_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'other'), name='unique_friend_edge')],
+            },
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
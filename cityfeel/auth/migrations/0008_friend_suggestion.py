@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cf_auth', '0007_friend_edge'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FriendSuggestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(help_text='Podobieństwo kosinusowe zbiorów ocenionych lokalizacji (0–1)')),
+                ('common_locations', models.PositiveIntegerField(help_text='Liczba lokalizacji ocenionych przez obu użytkowników')),
+                ('computed_at', models.DateTimeField(help_text='Kiedy propozycja została policzona')),
+                ('candidate', models.ForeignKey(help_text='Proponowany znajomy', on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(help_text='Użytkownik, któremu proponujemy znajomego', on_delete=django.db.models.deletion.CASCADE, related_name='friend_suggestions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Propozycja znajomego',
+                'verbose_name_plural': 'Propozycje znajomych',
+                'db_table': 'auth_friend_suggestion',
+                'ordering': ['user', '-score'],
+                'indexes': [models.Index(fields=['user', '-score'], name='friend_suggestion_score_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'candidate'), name='unique_friend_suggestion')],
+            },
+        ),
+    ]
@@ -1,12 +1,18 @@
 from django.contrib.auth.models import AbstractUser
+from django.core.files.storage import default_storage
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db.models import Q, F
+from django.db.models.functions import Upper
+
+from emotions.storage import get_content_hash_storage
 
 
 def user_avatar_upload_path(instance, filename):
     """
     Generate upload path for user avatars.
-    Files uploaded to: MEDIA_ROOT/avatars/
+    Files uploaded to: MEDIA_ROOT/avatars/ — the storage renames them to the content hash
+    (emotions.storage), so the URL changes whenever the avatar does.
     """
     import os
     ext = os.path.splitext(filename)[1].lower()
@@ -21,27 +27,67 @@ class CFUser(AbstractUser):
     """
     avatar = models.ImageField(
         upload_to=user_avatar_upload_path,
+        storage=get_content_hash_storage,
         blank=True,
         null=True,
         help_text="Zdjęcie profilowe użytkownika",
         max_length=500
     )
 
+    # Kwadratowe warianty awatara {"32": "...", "64": "...", "256": "..."} — patrz auth.avatars
+    avatar_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text="Warianty awatara generowane w tle"
+    )
+
     description = models.TextField(blank=True, null=True, max_length=500)
 
     class Meta:
         verbose_name = "Użytkownik"
         verbose_name_plural = "Użytkownicy"
         db_table = "auth_user"
+        indexes = [
+            # Trigramy na UPPER(username): wyszukiwarka społeczności (icontains) i api.search
+            GinIndex(OpClass(Upper('username'), name='gin_trgm_ops'), name='user_username_trgm_idx'),
+        ]
 
     def __str__(self):
         return self.username
 
-    def get_avatar_url(self):
-        """Return avatar URL or None if not set."""
-        if self.avatar:
-            return self.avatar.url
-        return None
+    def save(self, *args, **kwargs):
+        # A replaced avatar resets its variants (auth.signals) — write both columns together
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'avatar' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'avatar_variants'}
+        super().save(*args, **kwargs)
+
+    def get_avatar_url(self, size=None):
+        """
+        Return avatar URL or None if not set.
+
+        With ``size`` (px) returns the smallest square variant that is at least that big
+        (or the largest one); falls back to the original until variants are generated.
+        """
+        if not self.avatar:
+            return None
+        variants = self.avatar_variants or {}
+        if size is not None and variants:
+            sizes = sorted(int(s) for s in variants)
+            best = next((s for s in sizes if s >= size), sizes[-1])
+            return default_storage.url(variants[str(best)])
+        return self.avatar.url
+
+    @property
+    def avatar_small_url(self):
+        """Avatar for lists (50–60 px in templates)."""
+        return self.get_avatar_url(64)
+
+    @property
+    def avatar_large_url(self):
+        """Avatar for the profile page (150 px)."""
+        return self.get_avatar_url(256)
 
 
 class Friendship(models.Model):
@@ -98,4 +144,115 @@ class Friendship(models.Model):
         ]
 
     def __str__(self):
-        return f"{self.user} -> {self.friend} ({self.status})"
\ No newline at end of file
+        return f"{self.user} -> {self.friend} ({self.status})"
+
+
+class FriendEdge(models.Model):
+    """
+    Symetryczna lista sąsiedztwa znajomości: każda ``Friendship`` ma tu dwa wiersze,
+    po jednym dla każdej strony (``user`` → ``other``), ze statusem i kierunkiem
+    zaproszenia. Utrzymywana sygnałami (``auth.friends.sync_edges``).
+
+    Zapytania „moje relacje” to wtedy range scan po ``user_id`` zamiast
+    ``Q(user=…) | Q(friend=…)`` na ``auth_friendship``, a kierunek nie wymaga
+    rozstrzygania w Pythonie.
+    """
+    SENT = 'sent'
+    RECEIVED = 'received'
+
+    DIRECTION_CHOICES = [
+        (SENT, 'Wysłane'),
+        (RECEIVED, 'Otrzymane'),
+    ]
+
+    user = models.ForeignKey(
+        CFUser,
+        on_delete=models.CASCADE,
+        related_name='friend_edges',
+        help_text="Użytkownik, z którego perspektywy opisana jest relacja"
+    )
+    other = models.ForeignKey(
+        CFUser,
+        on_delete=models.CASCADE,
+        related_name='+',
+        help_text="Druga strona relacji"
+    )
+    friendship = models.ForeignKey(
+        Friendship,
+        on_delete=models.CASCADE,
+        related_name='edges',
+        help_text="Relacja źródłowa"
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=Friendship.STATUS_CHOICES,
+        help_text="Status relacji (kopia z Friendship)"
+    )
+    direction = models.CharField(
+        max_length=10,
+        choices=DIRECTION_CHOICES,
+        help_text="Czy użytkownik wysłał, czy otrzymał zaproszenie"
+    )
+    created_at = models.DateTimeField(
+        help_text="Data utworzenia relacji (kopia z Friendship)"
+    )
+
+    class Meta:
+        verbose_name = "Krawędź znajomości"
+        verbose_name_plural = "Krawędzie znajomości"
+        db_table = "auth_friend_edge"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'other'], name='unique_friend_edge'),
+        ]
+        indexes = [
+            # Lista znajomych / zbiór id znajomych: WHERE user_id = … AND status = 'accepted'
+            models.Index(fields=['user', 'status', 'other'], name='friend_edge_user_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} -> {self.other} ({self.status}, {self.direction})"
+
+
+class FriendSuggestion(models.Model):
+    """
+    Propozycja znajomego: użytkownik oceniający te same miejsca co ``user``.
+
+    Liczone wsadowo (``auth.suggestions.rebuild_suggestions`` / komenda
+    ``build_friend_suggestions``) — strona społeczności tylko czyta top-K wiersze.
+    """
+    user = models.ForeignKey(
+        CFUser,
+        on_delete=models.CASCADE,
+        related_name='friend_suggestions',
+        help_text="Użytkownik, któremu proponujemy znajomego"
+    )
+    candidate = models.ForeignKey(
+        CFUser,
+        on_delete=models.CASCADE,
+        related_name='+',
+        help_text="Proponowany znajomy"
+    )
+    score = models.FloatField(
+        help_text="Podobieństwo kosinusowe zbiorów ocenionych lokalizacji (0–1)"
+    )
+    common_locations = models.PositiveIntegerField(
+        help_text="Liczba lokalizacji ocenionych przez obu użytkowników"
+    )
+    computed_at = models.DateTimeField(
+        help_text="Kiedy propozycja została policzona"
+    )
+
+    class Meta:
+        verbose_name = "Propozycja znajomego"
+        verbose_name_plural = "Propozycje znajomych"
+        db_table = "auth_friend_suggestion"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'candidate'], name='unique_friend_suggestion'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-score'], name='friend_suggestion_score_idx'),
+        ]
+        ordering = ['user', '-score']
+
+    def __str__(self):
+        return f"{self.user} -> {self.candidate} ({self.score:.2f})"
@@ -0,0 +1,65 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from emotions.storage import content_hash_storage, retain_new_files, track_new_files
+
+from . import avatars
+from . import friends
+from .models import CFUser, Friendship
+
+
+def _release_avatar(name, variants):
+    # Plik i warianty mogą być współdzielone (deduplikacja) — usuwamy je z ostatnią referencją
+    if content_hash_storage.release(name) and variants:
+        transaction.on_commit(lambda: avatars.delete_variant_files(variants))
+
+
+@receiver(pre_save, sender=CFUser)
+def release_replaced_avatar(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Awatary są w storage adresowanym treścią — stary plik zwalniamy (licznik referencji),
+    # nowy dostanie nową nazwę, więc URL awatara zmienia się razem z treścią.
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and 'avatar' not in update_fields:
+        return  # np. last_login przy logowaniu — bez dodatkowego zapytania
+    old = CFUser.objects.filter(pk=instance.pk).values('avatar', 'avatar_variants').first()
+    if old and old['avatar'] and old['avatar'] != instance.avatar.name:
+        _release_avatar(old['avatar'], old['avatar_variants'])
+        instance.avatar_variants = {}
+
+
+@receiver(pre_save, sender=CFUser)
+def track_new_avatar_file(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        track_new_files(instance, ['avatar'], update_fields)
+
+
+@receiver(post_save, sender=CFUser)
+def retain_new_avatar_file(sender, instance, **kwargs):
+    retain_new_files(instance)
+
+
+@receiver(post_save, sender=CFUser)
+def schedule_avatar_variants(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'avatar' not in update_fields):
+        return
+    if instance.avatar and not instance.avatar_variants:
+        avatars.schedule(instance.pk)
+
+
+@receiver(post_delete, sender=CFUser)
+def release_avatar_on_delete(sender, instance, **kwargs):
+    if instance.avatar:
+        _release_avatar(instance.avatar.name, instance.avatar_variants)
+
+
+@receiver(post_save, sender=Friendship)
+def sync_friend_edges(sender, instance, **kwargs):
+    friends.sync_edges(instance)
+
+
+@receiver(post_delete, sender=Friendship)
+def invalidate_friend_ids_on_delete(sender, instance, **kwargs):
+    # Krawędzie znikają kaskadą razem z relacją; zostaje cache obu stron.
+    friends.invalidate_friend_ids(instance.user_id, instance.friend_id)
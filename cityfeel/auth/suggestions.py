@@ -0,0 +1,106 @@
+"""
+Propozycje znajomych z „wspólnie ocenianych miejsc”.
+
+Każdy użytkownik to wektor 0/1 nad lokalizacjami (ocenił / nie ocenił — wiersze
+``is_latest`` z publicznym statusem, więc prywatne oceny niczego nie zdradzają).
+Podobieństwo pary to cosinus tych wektorów::
+
+    wspólne(a, b) / sqrt(|a| * |b|)
+
+Iloczyn skalarny rzadkich wektorów to w SQL self-join po ``location_id`` zgrupowany po
+parze użytkowników — baza liczy go bez wyciągania macierzy do Pythona. Lokalizacje
+z więcej niż ``CITYFEEL_SUGGESTIONS_MAX_VOTERS`` głosującymi pomijamy (każda wnosi
+kwadratową liczbę par, a „wszyscy byli na Długim Targu” nic nie mówi o guście).
+
+Wynik — top-K kandydatów per użytkownik, bez osób, z którymi już jest relacja — trafia
+do ``auth_friend_suggestion`` w jednej transakcji (DELETE + INSERT), więc czytelnicy
+widzą stary albo nowy komplet.
+"""
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import FriendEdge, FriendSuggestion
+
+DEFAULT_TOP_K = 10
+SHOWN_SUGGESTIONS = 5
+
+
+_REBUILD_SQL = """
+    WITH popular AS (
+        SELECT e.location_id
+        FROM emotions_emotion_point e
+        WHERE e.is_latest AND e.privacy_status = 'public'
+        GROUP BY e.location_id
+        HAVING COUNT(*) > %(max_voters)s
+    ),
+    visits AS (
+        SELECT e.user_id, e.location_id
+        FROM emotions_emotion_point e
+        JOIN auth_user u ON u.id = e.user_id AND u.is_active
+        WHERE e.is_latest AND e.privacy_status = 'public'
+          AND e.location_id NOT IN (SELECT location_id FROM popular)
+    ),
+    degree AS (
+        SELECT v.user_id, COUNT(*) AS n
+        FROM visits v
+        GROUP BY v.user_id
+    ),
+    pairs AS (
+        SELECT a.user_id, b.user_id AS candidate_id, COUNT(*) AS common
+        FROM visits a
+        JOIN visits b ON b.location_id = a.location_id AND b.user_id <> a.user_id
+        GROUP BY a.user_id, b.user_id
+        HAVING COUNT(*) >= %(min_common)s
+    ),
+    scored AS (
+        SELECT p.user_id, p.candidate_id, p.common,
+               p.common / SQRT(da.n * db.n) AS score
+        FROM pairs p
+        JOIN degree da ON da.user_id = p.user_id
+        JOIN degree db ON db.user_id = p.candidate_id
+        WHERE NOT EXISTS (
+            SELECT 1 FROM auth_friend_edge fe
+            WHERE fe.user_id = p.user_id AND fe.other_id = p.candidate_id
+        )
+    ),
+    ranked AS (
+        SELECT s.*,
+               ROW_NUMBER() OVER (
+                   PARTITION BY s.user_id ORDER BY s.score DESC, s.common DESC, s.candidate_id
+               ) AS rank
+        FROM scored s
+    )
+    INSERT INTO auth_friend_suggestion (user_id, candidate_id, score, common_locations, computed_at)
+    SELECT r.user_id, r.candidate_id, r.score, r.common, NOW()
+    FROM ranked r
+    WHERE r.rank <= %(top_k)s
+"""
+
+
+def rebuild_suggestions(top_k=DEFAULT_TOP_K, min_common=None, max_voters=None):
+    """Przelicza wszystkie propozycje. Zwraca liczbę zapisanych wierszy."""
+    params = {
+        'top_k': top_k,
+        'min_common': min_common if min_common is not None else getattr(
+            settings, 'CITYFEEL_SUGGESTIONS_MIN_COMMON', 2),
+        'max_voters': max_voters if max_voters is not None else getattr(
+            settings, 'CITYFEEL_SUGGESTIONS_MAX_VOTERS', 500),
+    }
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute('DELETE FROM auth_friend_suggestion')
+        cursor.execute(_REBUILD_SQL, params)
+        return cursor.rowcount
+
+
+def suggestions_for(user, limit=SHOWN_SUGGESTIONS):
+    """
+    Najlepsze propozycje dla ``user`` (z ``candidate``), bez osób, z którymi relacja
+    powstała już po ostatnim przeliczeniu.
+    """
+    return (
+        FriendSuggestion.objects
+        .filter(user=user)
+        .exclude(candidate_id__in=FriendEdge.objects.filter(user=user).values('other_id'))
+        .select_related('candidate')
+        .order_by('-score')[:limit]
+    )
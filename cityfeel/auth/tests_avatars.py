@@ -0,0 +1,108 @@
+"""
+Testy kwadratowych wariantów awatarów (auth.avatars) i ich użycia w API znajomych.
+"""
+import io
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from auth import avatars
+from auth.models import Friendship
+
+User = get_user_model()
+
+
+def _png(size=(400, 200), color='red'):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color=color).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class RenderAvatarVariantsTestCase(SimpleTestCase):
+
+    def test_square_variants(self):
+        rendered = avatars.render_avatar_variants(io.BytesIO(_png()))
+
+        self.assertEqual(set(rendered), {32, 64, 256})
+        for size, data in rendered.items():
+            image = Image.open(io.BytesIO(data))
+            self.assertEqual(image.size, (size, size))
+            self.assertEqual(image.format, 'JPEG')
+
+
+class AvatarVariantsTestCase(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root, CITYFEEL_PHOTO_DERIVATIVES_ASYNC=False)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(username='alice', password='x')
+
+    def _set_avatar(self, color='red'):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.avatar = SimpleUploadedFile('me.png', _png(color=color), 'image/png')
+            self.user.save()
+        self.user.refresh_from_db()
+
+    def test_variants_built_on_upload(self):
+        self._set_avatar()
+
+        self.assertEqual(set(self.user.avatar_variants), {'32', '64', '256'})
+        self.assertTrue(self.user.get_avatar_url(64).endswith('.64.jpg'))
+        self.assertTrue(self.user.get_avatar_url(50).endswith('.64.jpg'))
+        self.assertTrue(self.user.get_avatar_url(1000).endswith('.256.jpg'))
+        self.assertEqual(self.user.get_avatar_url(), self.user.avatar.url)
+
+    def test_falls_back_to_original_before_variants(self):
+        self.user.avatar = SimpleUploadedFile('me.png', _png(), 'image/png')
+        self.user.save()  # bez wykonania on_commit — wariantów jeszcze nie ma
+
+        self.assertEqual(self.user.avatar_small_url, self.user.avatar.url)
+        self.assertIsNone(User(username='bez').get_avatar_url(64))
+
+    def test_replacing_avatar_resets_variants(self):
+        self._set_avatar()
+        first = dict(self.user.avatar_variants)
+
+        self._set_avatar(color='blue')
+        self.assertEqual(set(self.user.avatar_variants), {'32', '64', '256'})
+        self.assertNotEqual(self.user.avatar_variants['64'], first['64'])
+
+    def test_replacing_avatar_with_update_fields_resets_variants(self):
+        self._set_avatar()
+
+        self.user.avatar = SimpleUploadedFile('me.png', _png(color='blue'), 'image/png')
+        self.user.save(update_fields=['avatar'])  # bez on_commit — nowe warianty jeszcze nie powstały
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.avatar_variants, {})
+        self.assertEqual(self.user.avatar_small_url, self.user.avatar.url)
+
+    def test_backfill_command(self):
+        self.user.avatar = SimpleUploadedFile('me.png', _png(), 'image/png')
+        self.user.save()
+
+        call_command('build_avatar_variants', stdout=io.StringIO())
+
+        self.user.refresh_from_db()
+        self.assertEqual(len(self.user.avatar_variants), 3)
+
+    def test_friends_api_returns_small_variant(self):
+        self._set_avatar()
+        viewer = User.objects.create_user(username='bob', password='x')
+        Friendship.objects.create(user=viewer, friend=self.user, status=Friendship.ACCEPTED)
+
+        client = APIClient()
+        client.force_authenticate(viewer)
+        response = client.get('/api/friends/')
+
+        self.assertTrue(response.data[0]['avatar'].endswith('.64.jpg'))
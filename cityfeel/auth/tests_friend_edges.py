@@ -0,0 +1,83 @@
+"""
+Testy symetrycznych krawędzi znajomości (FriendEdge) i zbioru id znajomych w cache (auth.friends).
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from auth import friends
+from auth.models import Friendship, FriendEdge
+
+User = get_user_model()
+
+
+class FriendEdgeSyncTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username='alice', password='testpass123')
+        self.bob = User.objects.create_user(username='bob', password='testpass123')
+        self.carol = User.objects.create_user(username='carol', password='testpass123')
+
+    def _edges(self):
+        return set(FriendEdge.objects.values_list('user__username', 'other__username', 'status', 'direction'))
+
+    def test_edges_follow_friendship(self):
+        friendship = Friendship.objects.create(user=self.alice, friend=self.bob)
+        self.assertEqual(self._edges(), {
+            ('alice', 'bob', 'pending', 'sent'),
+            ('bob', 'alice', 'pending', 'received'),
+        })
+
+        friendship.status = Friendship.ACCEPTED
+        friendship.save()
+        self.assertEqual({e[2] for e in self._edges()}, {'accepted'})
+
+        friendship.delete()
+        self.assertFalse(FriendEdge.objects.exists())
+
+    def test_friend_ids_cached_and_invalidated(self):
+        friendship = Friendship.objects.create(user=self.alice, friend=self.bob, status=Friendship.ACCEPTED)
+        Friendship.objects.create(user=self.carol, friend=self.alice)  # oczekujące — nie liczy się
+
+        self.assertEqual(friends.get_friend_ids(self.alice.pk), {self.bob.pk})
+        with self.assertNumQueries(0):
+            self.assertTrue(friends.are_friends(self.alice.pk, self.bob.pk))
+            self.assertFalse(friends.are_friends(self.alice.pk, self.carol.pk))
+        self.assertTrue(friends.are_friends(self.bob.pk, self.alice.pk))
+
+        friendship.delete()
+        self.assertEqual(friends.get_friend_ids(self.alice.pk), frozenset())
+        self.assertEqual(friends.get_friend_ids(self.bob.pk), frozenset())
+
+
+class FriendEdgeViewsTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username='alice', password='testpass123')
+        self.bob = User.objects.create_user(username='bob', password='testpass123')
+        self.carol = User.objects.create_user(username='carol', password='testpass123')
+        self.accepted = Friendship.objects.create(user=self.bob, friend=self.alice, status=Friendship.ACCEPTED)
+        Friendship.objects.create(user=self.alice, friend=self.carol)
+        self.client.login(username='alice', password='testpass123')
+
+    def test_community_statuses_from_edges(self):
+        response = self.client.get(reverse('cf_auth:community'))
+        users = {u.username: u for u in response.context['users_list']}
+
+        self.assertEqual(users['bob'].friendship_status, Friendship.ACCEPTED)
+        self.assertEqual(users['bob'].friendship_direction, FriendEdge.RECEIVED)
+        self.assertEqual(users['bob'].friendship_id, self.accepted.pk)
+        self.assertEqual(users['carol'].friendship_direction, FriendEdge.SENT)
+
+    def test_my_friends_lists_other_side(self):
+        response = self.client.get(reverse('cf_auth:my_friends'))
+        self.assertEqual([u.username for u in response.context['friends_list']], ['bob'])
+
+    def test_duplicate_request_in_reverse_direction_rejected(self):
+        self.client.logout()
+        self.client.login(username='carol', password='testpass123')
+        response = self.client.post('/api/friendship/', {'friend_id': self.alice.pk}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
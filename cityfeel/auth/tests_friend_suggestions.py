@@ -0,0 +1,77 @@
+"""
+Testy propozycji znajomych ze wspólnie ocenianych miejsc (auth.suggestions).
+"""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from auth import suggestions
+from auth.models import Friendship, FriendSuggestion
+from emotions.models import EmotionPoint
+from map.models import Location
+
+User = get_user_model()
+
+
+class FriendSuggestionsTestCase(TestCase):
+
+    def setUp(self):
+        self.alice, self.bob, self.carol, self.dave = [
+            User.objects.create_user(username=name, password='testpass123')
+            for name in ('alice', 'bob', 'carol', 'dave')
+        ]
+        self.locations = [
+            Location.objects.create(name=f'L{i}', coordinates=Point(18.6 + i / 100, 54.35, srid=4326))
+            for i in range(4)
+        ]
+        L = self.locations
+        self._rate(self.alice, L[0], L[1], L[2])
+        self._rate(self.bob, L[0], L[1], L[2])      # 3 wspólne z alice
+        self._rate(self.carol, L[0], L[1], L[3])    # 2 wspólne z alice
+        self._rate(self.dave, L[3])                 # 0 wspólnych
+        EmotionPoint.objects.create(user=self.dave, location=L[0], emotional_value=3, privacy_status='private')
+
+    def _rate(self, user, *locations):
+        for location in locations:
+            EmotionPoint.objects.create(user=user, location=location, emotional_value=4)
+
+    def _candidates(self, user):
+        return list(
+            FriendSuggestion.objects.filter(user=user).order_by('-score').values_list('candidate__username', flat=True)
+        )
+
+    def test_ranked_by_similarity(self):
+        suggestions.rebuild_suggestions(min_common=1)
+
+        self.assertEqual(self._candidates(self.alice), ['bob', 'carol'])
+        top = FriendSuggestion.objects.get(user=self.alice, candidate=self.bob)
+        self.assertEqual(top.common_locations, 3)
+        self.assertAlmostEqual(top.score, 1.0)
+        # Prywatna ocena dave'a w L0 nie czyni go podobnym do alice
+        self.assertNotIn('alice', self._candidates(self.dave))
+
+    def test_skips_existing_relations_and_limits(self):
+        Friendship.objects.create(user=self.alice, friend=self.bob)
+
+        suggestions.rebuild_suggestions(top_k=1, min_common=1)
+
+        self.assertEqual(self._candidates(self.alice), ['carol'])
+        self.assertEqual(FriendSuggestion.objects.filter(user=self.carol).count(), 1)
+
+    def test_popular_locations_ignored(self):
+        suggestions.rebuild_suggestions(min_common=1, max_voters=2)
+        # L0 i L1 mają po 3 głosujących — zostaje tylko L2 (alice, bob) i L3 (carol, dave)
+        self.assertEqual(self._candidates(self.alice), ['bob'])
+
+    def test_command_and_community_view(self):
+        call_command('build_friend_suggestions', stdout=StringIO())
+        Friendship.objects.create(user=self.carol, friend=self.alice)  # po przeliczeniu
+
+        self.client.login(username='alice', password='testpass123')
+        response = self.client.get(reverse('cf_auth:community'))
+
+        self.assertEqual([s.candidate.username for s in response.context['friend_suggestions']], ['bob'])
@@ -4,11 +4,17 @@ from django.shortcuts import redirect
 from django.views.generic import CreateView, DetailView, UpdateView, ListView, TemplateView
 from django.urls import reverse_lazy
 from django.contrib import messages
-from django.db.models import Count, Q, Prefetch
+from django.db.models import F
+from django.db.models.functions import Coalesce
 
 from .forms import UserRegistrationForm, UserProfileEditForm
-from .models import CFUser, Friendship
-from emotions.models import EmotionPoint
+from .models import CFUser, Friendship, FriendEdge
+from .suggestions import suggestions_for
+from emotions import stats
+from emotions.models import EmotionPoint, UserStats
+from emotions.prefetch import prefetch_top_n
+
+RECENT_PUBLIC_EMOTIONS = 3
 
 
 class RegisterView(CreateView):
@@ -50,30 +56,23 @@ class UserProfileView(LoginRequiredMixin, DetailView):
         context = super().get_context_data(**kwargs)
         profile_user = self.object
 
-        # Model EmotionPoint jest historyczny — wiele wpisów per (user, location).
-        # Profil pokazuje "obecny stan ocen": najnowszą emocję per lokalizacja
-        # (DISTINCT ON (location_id) ORDER BY created_at DESC).
-        latest_per_location_ids = list(
-            profile_user.emotion_points
-            .order_by('location_id', '-created_at')
-            .distinct('location_id')
-            .values_list('id', flat=True)
-        )
-
-        emotion_stats = EmotionPoint.objects.filter(id__in=latest_per_location_ids).aggregate(
-            total_count=Count('id'),
-            public_count=Count('id', filter=Q(privacy_status='public')),
-            private_count=Count('id', filter=Q(privacy_status='private')),
-        )
+        # Liczniki "obecnego stanu ocen" (najnowsza emocja per lokalizacja) utrzymuje
+        # UserStats (emotions.stats) — bez agregowania całej historii przy każdym wejściu.
+        user_stats = UserStats.objects.filter(user=profile_user).first()
+        if user_stats is None:
+            # Np. użytkownik z bulk_create przed rebuild_aggregates
+            stats.refresh_user_stats(profile_user.pk)
+            user_stats = UserStats.objects.get(user=profile_user)
 
-        context['total_emotions'] = emotion_stats['total_count']
-        context['public_emotions'] = emotion_stats['public_count']
-        context['private_emotions'] = emotion_stats['private_count']
+        context['total_emotions'] = user_stats.locations_count
+        context['public_emotions'] = user_stats.public_count
+        context['private_emotions'] = user_stats.private_count
 
-        # 10 najnowszych unikalnych lokalizacji (publicznych) w obecnym stanie ocen usera.
+        # 10 najnowszych unikalnych lokalizacji (publicznych) w obecnym stanie ocen usera
+        # — częściowy indeks emotions_latest_user_idx (user, -created_at) WHERE is_latest.
         context['recent_emotions'] = (
-            EmotionPoint.objects
-            .filter(id__in=latest_per_location_ids, privacy_status='public')
+            profile_user.emotion_points
+            .filter(is_latest=True, privacy_status='public')
             .select_related('location')
             .order_by('-created_at')[:10]
         )
@@ -121,19 +120,11 @@ class CommunityView(LoginRequiredMixin, ListView):
     def get_queryset(self):
         current_user = self.request.user
 
-        # Pobieramy tylko publiczne emocje do wyświetlenia w "ostatnich aktywnościach"
-        public_emotions_qs = EmotionPoint.objects.filter(
-            privacy_status='public'
-        ).select_related('location').order_by('-created_at')
-
         # Wykluczamy zalogowanego użytkownika z listy
         queryset = CFUser.objects.exclude(id=current_user.id).annotate(
-            # Po przejściu na model historyczny zliczamy unikalne lokalizacje (a nie wpisy),
-            # żeby user "lubiący ten sam plac 5×" nie wyglądał na bardziej aktywnego.
-            emotions_count=Count('emotion_points__location', distinct=True)
-        ).prefetch_related(
-            # Pobieramy 3 ostatnie publiczne emocje dla każdego usera
-            Prefetch('emotion_points', queryset=public_emotions_qs, to_attr='recent_public_emotions')
+            # Unikalne lokalizacje (a nie wpisy), żeby user "lubiący ten sam plac 5×" nie wyglądał
+            # na bardziej aktywnego — licznik z UserStats zamiast COUNT(DISTINCT) po historii.
+            emotions_count=Coalesce(F('stats__locations_count'), 0)
         ).order_by('-date_joined')
 
         # Wyszukiwarka po username
@@ -148,42 +139,38 @@ class CommunityView(LoginRequiredMixin, ListView):
         users_list = context['users_list']
         current_user = self.request.user
 
-        # Pobierz wszystkie relacje, gdzie userem jest current_user
-        # Tworzymy mapę {other_user_id: friendship_object}
-        friendships_map = {}
-
-        # Pobierz relacje gdzie current_user jest senderem lub receiverem
-        friendships = Friendship.objects.filter(
-            Q(user=current_user) | Q(friend=current_user)
+        # 3 ostatnie publiczne emocje każdego usera ze strony — LIMIT per user,
+        # zamiast całej historii (emotions.prefetch)
+        prefetch_top_n(
+            users_list,
+            EmotionPoint.objects.filter(privacy_status='public', is_hidden=False)
+            .select_related('location').order_by('-created_at'),
+            fk_name='user',
+            n=RECENT_PUBLIC_EMOTIONS,
+            to_attr='recent_public_emotions',
         )
 
-        for f in friendships:
-            if f.user == current_user:
-                other_id = f.friend.id
-                direction = 'sent'  # current_user wysłał zaproszenie
-            else:
-                other_id = f.user.id
-                direction = 'received'  # current_user otrzymał zaproszenie
-
-            friendships_map[other_id] = {
-                'obj': f,
-                'status': f.status,
-                'direction': direction,
-                'id': f.id,
-                'created_at': f.created_at
-            }
+        # Relacje current_usera tylko z użytkownikami tej strony — krawędzie z perspektywy
+        # current_usera mają już kierunek ('sent' / 'received'), mapa {other_user_id: edge}
+        edges_map = {
+            edge.other_id: edge
+            for edge in FriendEdge.objects.filter(user=current_user, other__in=[u.id for u in users_list])
+        }
 
         # Wstrzyknij status znajomości do obiektów użytkowników na liście
         for user in users_list:
-            if user.id in friendships_map:
-                data = friendships_map[user.id]
-                user.friendship_status = data['status']  # 'pending' or 'accepted'
-                user.friendship_direction = data['direction']  # 'sent' or 'received'
-                user.friendship_id = data['id']
-                user.friendship_created_at = data['created_at']
+            edge = edges_map.get(user.id)
+            if edge is not None:
+                user.friendship_status = edge.status  # 'pending' or 'accepted'
+                user.friendship_direction = edge.direction  # 'sent' or 'received'
+                user.friendship_id = edge.friendship_id
+                user.friendship_created_at = edge.created_at
             else:
                 user.friendship_status = None
 
+        # Propozycje znajomych liczone wsadowo (auth.suggestions) — tu tylko odczyt top-K
+        context['friend_suggestions'] = suggestions_for(current_user)
+
         return context
 
 
@@ -206,18 +193,17 @@ class MyFriendsView(LoginRequiredMixin, TemplateView):
         context['pending_requests'] = pending_requests
 
         # 2. Lista znajomych (Zaakceptowane)
-        accepted_friendships = Friendship.objects.filter(
-            (Q(user=user) | Q(friend=user)) & Q(status=Friendship.ACCEPTED)
-        ).select_related('user', 'friend').order_by('created_at')
+        accepted_edges = FriendEdge.objects.filter(
+            user=user, status=Friendship.ACCEPTED
+        ).select_related('other').order_by('created_at')
 
         friends_list = []
-        for f in accepted_friendships:
-            # Ustal, kto jest tym 'drugim'
-            friend_user = f.friend if f.user == user else f.user
+        for edge in accepted_edges:
+            friend_user = edge.other
 
             # Dodajmy ID relacji, żeby można było ją usunąć
-            friend_user.friendship_id = f.id
-            friend_user.friendship_since = f.created_at
+            friend_user.friendship_id = edge.friendship_id
+            friend_user.friendship_since = edge.created_at
             friends_list.append(friend_user)
 
         context['friends_list'] = friends_list
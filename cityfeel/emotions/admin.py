@@ -3,19 +3,41 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.utils import timezone
+from . import moderation
+from .changelist import CreatedDrilldownFilter, EstimatedCountPaginator, RelatedSearchMixin, TopLocationFilter
 from .models import EmotionPoint, Comment, Photo, Report
+from .search import comment_search_query
+
+
+class HideableAdminMixin:
+    """Akcje ukrywania/przywracania treści przez moderację (emotions.moderation.set_hidden)."""
+
+    actions = ['hide_selected', 'unhide_selected']
+
+    def hide_selected(self, request, queryset):
+        count = moderation.set_hidden(queryset, hidden=True)
+        self.message_user(request, f"Ukryto obiektów: {count}.")
+    hide_selected.short_description = "Ukryj zaznaczone (moderacja)"
+
+    def unhide_selected(self, request, queryset):
+        count = moderation.set_hidden(queryset, hidden=False)
+        self.message_user(request, f"Przywrócono obiektów: {count}.")
+    unhide_selected.short_description = "Przywróć zaznaczone"
 
 
 @admin.register(EmotionPoint)
-class EmotionPointAdmin(admin.ModelAdmin):
+class EmotionPointAdmin(HideableAdminMixin, RelatedSearchMixin, admin.ModelAdmin):
     """Admin interface for EmotionPoint."""
 
-    list_display = ['user', 'location', 'emotional_value', 'privacy_status', 'created_at']
-    list_filter = ['privacy_status', 'emotional_value', 'created_at']
+    list_display = ['user', 'location', 'emotional_value', 'privacy_status', 'is_hidden', 'created_at']
+    list_filter = ['privacy_status', 'is_hidden', 'emotional_value', CreatedDrilldownFilter, TopLocationFilter]
+    # Wyszukiwanie po id z indeksów trigramowych (RelatedSearchMixin), a nie icontains na JOIN-ie
     search_fields = ['user__username', 'location__name']
     readonly_fields = ['created_at', 'updated_at']
     autocomplete_fields = ['user', 'location']
-    date_hierarchy = 'created_at'
+    # Tabela z milionami wierszy — szacowana liczba wyników (emotions.changelist)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     fieldsets = (
         ('Emotion Data', {
@@ -37,14 +59,18 @@ class EmotionPointAdmin(admin.ModelAdmin):
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(HideableAdminMixin, RelatedSearchMixin, admin.ModelAdmin):
     """Admin interface for Comment."""
-    list_display = ['user', 'location', 'created_at', 'short_content', 'sentiment_badge', 'mismatch_warning']
-    list_filter = ['created_at', 'sentiment_label', 'location']
-    search_fields = ['user__username', 'content', 'location__name']
+    list_display = ['user', 'location', 'created_at', 'short_content', 'sentiment_badge', 'mismatch_warning', 'is_hidden']
+    list_filter = [CreatedDrilldownFilter, 'sentiment_label', 'is_hidden', TopLocationFilter]
+    # Użytkownik i lokalizacja — po id z indeksów trigramowych (RelatedSearchMixin),
+    # treść — pełnotekstowo (indeks GIN), a nie icontains po całej tabeli;
+    # patrz get_search_results.
+    search_fields = ['user__username', 'location__name']
     readonly_fields = ['created_at', 'sentiment_score', 'sentiment_label']
     autocomplete_fields = ['user', 'location']
-    date_hierarchy = 'created_at'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     fieldsets = (
         ('Komentarz', {
@@ -59,6 +85,12 @@ class CommentAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_search_results(self, request, queryset, search_term):
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term.strip():
+            results |= queryset.filter(search_vector=comment_search_query(search_term))
+        return results, may_have_duplicates
+
     def short_content(self, obj):
         return obj.content[:50] + '...' if len(obj.content) > 50 else obj.content
     short_content.short_description = "Treść"
@@ -97,11 +129,11 @@ class CommentAdmin(admin.ModelAdmin):
 
 
 @admin.register(Photo)
-class PhotoAdmin(admin.ModelAdmin):
+class PhotoAdmin(HideableAdminMixin, admin.ModelAdmin):
     """Admin interface for Photo."""
     # [ZMIANA] Dodano user do widoków
-    list_display = ['location', 'user', 'created_at', 'caption', 'image_preview']
-    list_filter = ['created_at', 'location', 'user']
+    list_display = ['location', 'user', 'created_at', 'caption', 'image_preview', 'is_hidden']
+    list_filter = ['created_at', 'is_hidden', TopLocationFilter, 'user']
     search_fields = ['location__name', 'caption', 'user__username']
     readonly_fields = ['created_at', 'image_preview']
     autocomplete_fields = ['location', 'user']
@@ -122,7 +154,7 @@ class PhotoAdmin(admin.ModelAdmin):
     def image_preview(self, obj):
         """Wyświetla podgląd zdjęcia."""
         if obj.image:
-            return format_html('<img src="{}" width="150" />', obj.image.url)
+            return format_html('<img src="{}" width="150" />', obj.thumbnail_url)
         return "Brak zdjęcia"
 
     image_preview.short_description = 'Podgląd'
@@ -135,7 +167,7 @@ class ReportAdmin(admin.ModelAdmin):
     search_fields = ('reporter__username', 'description')
     readonly_fields = ('created_at', 'resolved_at', 'resolved_by')
     
-    actions = ['mark_as_resolved', 'mark_as_dismissed']
+    actions = ['mark_as_resolved', 'mark_as_dismissed', 'hide_and_resolve', 'unhide_content']
 
     def target_info(self, obj):
         if obj.location:
@@ -163,4 +195,19 @@ class ReportAdmin(admin.ModelAdmin):
             resolved_at=timezone.now()
         )
         self.message_user(request, "Wybrane zgłoszenia zostały odrzucone.")
-    mark_as_dismissed.short_description = "Oznacz jako Odrzucone"
\ No newline at end of file
+    mark_as_dismissed.short_description = "Oznacz jako Odrzucone"
+
+    def hide_and_resolve(self, request, queryset):
+        count = moderation.set_reported_hidden(queryset, hidden=True)
+        queryset.update(
+            status='resolved',
+            resolved_by=request.user,
+            resolved_at=timezone.now()
+        )
+        self.message_user(request, f"Ukryto zgłoszone treści ({count}), zgłoszenia oznaczono jako Rozwiązane.")
+    hide_and_resolve.short_description = "Ukryj zgłoszoną treść i oznacz jako Rozwiązane"
+
+    def unhide_content(self, request, queryset):
+        count = moderation.set_reported_hidden(queryset, hidden=False)
+        self.message_user(request, f"Przywrócono zgłoszone treści ({count}).")
+    unhide_content.short_description = "Przywróć zgłoszoną treść"
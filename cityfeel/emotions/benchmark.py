@@ -0,0 +1,224 @@
+"""
+Benchmark API i dashboardu na zbiorach różnej wielkości (``manage.py benchmark_api``).
+
+Dla każdej skali (``workload.SCALES``) komenda czyści osobną bazę benchmarkową, ładuje
+zbiór jak ``load_dataset --profile realistic`` (stałe ziarno) i odpytuje endpointy
+klientem testowym Django — w tym samym procesie, więc oprócz czasu znamy też liczbę
+zapytań SQL (``CaptureQueriesContext``). Scenariusze:
+
+- ``/api/locations/`` — bbox ulicy / dzielnicy / całego miasta, bez okna i z oknami
+  7, 30 i 365 dni (tryb „stan bieżący” i tryb okna czasowego),
+- ``/api/emotion-points/histogram/`` — kubełki hour/day/week/month w oknach,
+- ``/api/locations/<id>/emotion-timeline/`` — popularne i losowe miejsca,
+- ``/api/locations/nearby/`` — promień 50 m i 500 m,
+- ``/emotions/dashboard/`` — tydzień z najnowszymi danymi.
+
+Parametry każdego powtórzenia losujemy z ziarna (środki bbox i miejsca to współrzędne
+istniejących lokalizacji), więc dwa przebiegi na tym samym zbiorze odpytują to samo.
+Domyślnie przed każdym żądaniem czyścimy cache aplikacji (histogram i dashboard są
+cachowane) — mierzymy koszt zapytań, nie trafienie w cache.
+
+Wynik to słownik gotowy do zapisu w JSON; ``compare`` zestawia go z zapisanym wcześniej
+wynikiem bazowym (stosunek p50/p95 dla tych samych par skala × scenariusz).
+"""
+import json
+import math
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Max
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from map.models import Location
+
+from .models import EmotionPoint, LocationStats
+
+# Połowa boku bbox w stopniach szerokości (długość skalowana cos(lat))
+BBOX_SIZES = {'street': 0.0025, 'district': 0.012, 'city': 0.12}
+WINDOWS = {'all': None, '7d': 7, '30d': 30, '365d': 365}
+HISTOGRAM_CASES = [('hour', '7d'), ('day', '30d'), ('day', '365d'), ('week', '365d'), ('month', 'all')]
+TIMELINE_CASES = [('day', '30d'), ('week', '365d'), ('month', 'all')]
+NEARBY_RADII = [50, 500]
+
+
+def percentile(values, p):
+    """Percentyl metodą najbliższej rangi (bez interpolacji) dla niepustej listy."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _rows(response):
+    """Liczba zwróconych wierszy: długość listy w JSON (lub ``results``); HTML — None."""
+    if not response.get('Content-Type', '').startswith('application/json'):
+        return None
+    data = response.json()
+    if isinstance(data, dict):
+        data = data.get('results', [])
+    return len(data) if isinstance(data, list) else None
+
+
+class Sampler:
+    """Losowe, ale powtarzalne parametry scenariuszy dla bieżącego zbioru danych."""
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.coordinates = list(
+            Location.objects.order_by('pk').values_list('coordinates', flat=True)[:10_000]
+        )
+        self.popular_ids = list(
+            LocationStats.objects.order_by('-emotion_points_count').values_list('location_id', flat=True)[:50]
+        )
+        self.location_ids = list(Location.objects.order_by('pk').values_list('pk', flat=True)[:10_000])
+        self.latest = EmotionPoint.objects.aggregate(latest=Max('created_at'))['latest'] or timezone.now()
+
+    def point(self):
+        point = self.rng.choice(self.coordinates)
+        return point.x, point.y
+
+    def bbox(self, size):
+        lon, lat = self.point()
+        half_lat = BBOX_SIZES[size]
+        half_lon = half_lat / math.cos(math.radians(lat))
+        return f"{lon - half_lon:.6f},{lat - half_lat:.6f},{lon + half_lon:.6f},{lat + half_lat:.6f}"
+
+    def window(self, name):
+        days = WINDOWS[name]
+        if days is None:
+            return {}
+        return {
+            'created_after': (self.latest - timedelta(days=days)).isoformat(),
+            'created_before': self.latest.isoformat(),
+        }
+
+    def nearby(self, radius):
+        lon, lat = self.point()
+        return {'lon': f"{lon:.6f}", 'lat': f"{lat:.6f}", 'radius': radius}
+
+    def location_id(self, popular):
+        return self.rng.choice(self.popular_ids if popular and self.popular_ids else self.location_ids)
+
+
+def scenarios(sampler):
+    """Lista ``(nazwa, funkcja zwracająca (ścieżka, parametry))``."""
+    cases = []
+    for size in BBOX_SIZES:
+        for window in WINDOWS:
+            cases.append((
+                f'locations/bbox={size}/window={window}',
+                lambda size=size, window=window: (
+                    '/api/locations/', {'bbox': sampler.bbox(size), **sampler.window(window)}),
+            ))
+    for bucket, window in HISTOGRAM_CASES:
+        cases.append((
+            f'histogram/bucket={bucket}/window={window}',
+            lambda bucket=bucket, window=window: (
+                '/api/emotion-points/histogram/', {'bucket': bucket, **sampler.window(window)}),
+        ))
+    for popular in (True, False):
+        for bucket, window in TIMELINE_CASES:
+            cases.append((
+                f"emotion-timeline/{'popular' if popular else 'random'}/bucket={bucket}/window={window}",
+                lambda popular=popular, bucket=bucket, window=window: (
+                    f'/api/locations/{sampler.location_id(popular)}/emotion-timeline/',
+                    {'bucket': bucket, **sampler.window(window)}),
+            ))
+    for radius in NEARBY_RADII:
+        cases.append((
+            f'nearby/radius={radius}',
+            lambda radius=radius: ('/api/locations/nearby/', sampler.nearby(radius)),
+        ))
+    year, week, _ = timezone.localtime(sampler.latest).isocalendar()
+    cases.append(('dashboard/latest-week', lambda: ('/emotions/dashboard/', {'year': year, 'week_num': week})))
+    return cases
+
+
+def run(user, iterations=20, warmup=2, seed=0, warm_cache=False, only=None, log=lambda message: None):
+    """
+    Odpytuje wszystkie scenariusze (albo te, których nazwa zawiera ``only``) jako ``user``.
+    Zwraca listę słowników z percentylami czasu (ms), liczbą zapytań i wierszy.
+    """
+    client = Client()
+    client.force_login(user)
+    sampler = Sampler(seed)
+    results = []
+
+    for name, make_request in scenarios(sampler):
+        if only and only not in name:
+            continue
+        timings, queries, rows, statuses = [], [], [], {}
+        for iteration in range(warmup + iterations):
+            path, params = make_request()
+            if not warm_cache:
+                cache.clear()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(path, params)
+                elapsed = (time.perf_counter() - started) * 1000
+            if iteration < warmup:
+                continue
+            timings.append(elapsed)
+            queries.append(len(captured.captured_queries))
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+            count = _rows(response)
+            if count is not None:
+                rows.append(count)
+
+        result = {
+            'scenario': name,
+            'iterations': iterations,
+            'p50_ms': round(percentile(timings, 50), 2),
+            'p95_ms': round(percentile(timings, 95), 2),
+            'p99_ms': round(percentile(timings, 99), 2),
+            'mean_ms': round(statistics.fmean(timings), 2),
+            'queries_median': statistics.median(queries),
+            'queries_max': max(queries),
+            'rows_median': statistics.median(rows) if rows else None,
+            'rows_max': max(rows) if rows else None,
+            'status_codes': statuses,
+        }
+        results.append(result)
+        log(
+            f"{name:<55} p50 {result['p50_ms']:>9.2f} ms  p95 {result['p95_ms']:>9.2f} ms  "
+            f"p99 {result['p99_ms']:>9.2f} ms  zapytań {result['queries_max']:>3}  "
+            f"wierszy {result['rows_median'] if rows else '-'}"
+        )
+    return results
+
+
+def compare(current, baseline):
+    """
+    Zestawia wyniki z bazowymi: lista ``(skala, scenariusz, p50 bazowe, p50, p95 bazowe,
+    p95, stosunek p95)`` dla par obecnych w obu plikach.
+    """
+    def by_key(report):
+        return {
+            (scale['scale'], result['scenario']): result
+            for scale in report.get('scales', [])
+            for result in scale['results']
+        }
+
+    before = by_key(baseline)
+    rows = []
+    for key, result in by_key(current).items():
+        if key in before:
+            old = before[key]
+            ratio = result['p95_ms'] / old['p95_ms'] if old['p95_ms'] else math.inf
+            rows.append((*key, old['p50_ms'], result['p50_ms'], old['p95_ms'], result['p95_ms'], ratio))
+    return rows
+
+
+def load_report(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_report(report, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,435 @@
+"""
+Szybki import dużych zbiorów danych (``manage.py load_dataset``) przez ``COPY FROM STDIN``.
+
+Wiersze (z CSV albo z generatora) nie trafiają do pamięci naraz: ``CsvStream`` zamienia
+iterator krotek na plik, z którego ``copy_expert`` (psycopg2) czyta kawałkami, więc
+import 10M punktów to jedno polecenie ``COPY`` na proces, bez ``bulk_create`` i bez ORM.
+
+Przebieg (``load``):
+
+1. Indeksy pomocnicze ładowanych tabel zapamiętujemy (``pg_get_indexdef``) i usuwamy —
+   zostają klucze główne i indeksy ograniczeń (UNIQUE), więc integralność jest sprawdzana.
+   ``DROP INDEX`` zatwierdza się od razu, więc definicje najpierw zapisujemy do pliku
+   (``index_recovery_path``) — gdy proces zginie przed odtworzeniem, wystarczy go wykonać
+   w ``psql``. Plik znika po odtworzeniu indeksów.
+2. Każda tabela to jeden lub kilka ``COPY`` — przy ``workers > 1`` równolegle w procesach
+   potomnych (``fork``, każdy z własnym połączeniem i własnym kawałkiem danych).
+3. Flaga ``is_latest`` liczona jeszcze bez indeksów, potem odtwarzamy indeksy
+   (``CREATE INDEX`` na gotowej tabeli jest wielokrotnie szybszy niż utrzymywanie ich
+   przy każdym wierszu) i robimy ``ANALYZE``.
+4. Dzielnice lokalizacji z CSV i statystyki (``LocationStats``, ``UserStats``) liczone
+   na końcu, jak po ``rebuild_aggregates``.
+
+Generatory: ``UniformGenerator`` (rozkłady jednostajne, jak seedery w ``fixtures/``)
+i ``emotions.workload.WorkloadGenerator`` (realistyczne rozkłady do benchmarków).
+
+Przy kilku procesach każdy ``COPY`` zatwierdza się osobno — błąd w jednym procesie
+zostawia wiersze pozostałych (indeksy i tak są odtwarzane).
+"""
+import csv
+import io
+import multiprocessing
+import os
+import random
+import tempfile
+from contextlib import contextmanager, nullcontext
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, connections
+from django.db.models import Max
+from django.utils import timezone
+
+from map import districts
+from map.district_index import get_index
+from map.models import Location
+
+from . import stats
+from .models import EmotionPoint
+
+DEFAULT_PASSWORD = 'HasloTestowe123!'
+STREAM_BATCH = 1000
+
+USER_COLUMNS = (
+    'username', 'password', 'first_name', 'last_name', 'email',
+    'is_staff', 'is_active', 'is_superuser', 'date_joined', 'avatar_variants',
+)
+LOCATION_COLUMNS = ('name', 'coordinates', 'district_id')
+POINT_COLUMNS = (
+    'user_id', 'location_id', 'emotional_value', 'privacy_status',
+    'created_at', 'updated_at', 'is_latest', 'is_hidden',
+)
+
+
+class LoadError(Exception):
+    pass
+
+
+class CsvStream:
+    """Plik tylko do odczytu dla ``copy_expert``: krotki z iteratora jako kolejne linie CSV."""
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator='\n')
+        self._pending = ''
+        self.count = 0
+
+    def read(self, size=-1):
+        while self._rows is not None and (size < 0 or len(self._pending) < size):
+            batch = list(islice(self._rows, STREAM_BATCH))
+            if not batch:
+                self._rows = None
+                break
+            self._buffer.seek(0)
+            self._buffer.truncate()
+            self._writer.writerows(batch)
+            self._pending += self._buffer.getvalue()
+            self.count += len(batch)
+        if size < 0:
+            size = len(self._pending)
+        chunk, self._pending = self._pending[:size], self._pending[size:]
+        return chunk
+
+
+def copy_rows(table, columns, rows):
+    """``COPY table (columns) FROM STDIN`` z iteratora krotek. Zwraca liczbę wierszy."""
+    quote = connection.ops.quote_name
+    sql = f"COPY {quote(table)} ({', '.join(quote(c) for c in columns)}) FROM STDIN WITH (FORMAT csv)"
+    stream = CsvStream(rows)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(sql, stream)
+    return stream.count
+
+
+def _copy_worker(queue, table, columns, source):
+    try:
+        queue.put(copy_rows(table, columns, source()))
+    except Exception as e:
+        queue.put(LoadError(f"{table}: {e}"))
+    finally:
+        connections.close_all()
+
+
+def copy_parallel(table, columns, sources):
+    """
+    ``COPY`` z kilku źródeł — ``sources`` to funkcje bez argumentów zwracające iteratory
+    krotek. Jedno źródło ładujemy w bieżącym połączeniu, kilka — w procesach potomnych
+    (po jednym na źródło). Zwraca łączną liczbę wierszy.
+    """
+    if len(sources) == 1:
+        return copy_rows(table, columns, sources[0]())
+
+    # Potomek nie może dzielić gniazda z rodzicem — każdy otworzy własne połączenie
+    connections.close_all()
+    context = multiprocessing.get_context('fork')
+    queue = context.SimpleQueue()
+    processes = [
+        context.Process(target=_copy_worker, args=(queue, table, columns, source))
+        for source in sources
+    ]
+    for process in processes:
+        process.start()
+    results = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    errors = [result for result in results if isinstance(result, Exception)]
+    if errors:
+        raise errors[0]
+    return sum(results)
+
+
+def split(total, parts):
+    """Podział ``total`` na ``parts`` kolejnych zakresów ``(start, count)``."""
+    base, extra = divmod(total, parts)
+    ranges, start = [], 0
+    for k in range(parts):
+        count = base + (1 if k < extra else 0)
+        ranges.append((start, count))
+        start += count
+    return [r for r in ranges if r[1]] or [(0, 0)]
+
+
+_SECONDARY_INDEXES_SQL = """
+    SELECT i.relname, pg_get_indexdef(i.oid)
+    FROM pg_index x
+    JOIN pg_class i ON i.oid = x.indexrelid
+    WHERE x.indrelid = %s::regclass
+      AND NOT x.indisprimary
+      AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid)
+    ORDER BY i.relname
+"""
+
+
+def secondary_indexes(table):
+    """Lista ``(nazwa, CREATE INDEX ...)`` indeksów tabeli poza PK i ograniczeniami."""
+    with connection.cursor() as cursor:
+        cursor.execute(_SECONDARY_INDEXES_SQL, [table])
+        return cursor.fetchall()
+
+
+def index_recovery_path():
+    return getattr(
+        settings,
+        'CITYFEEL_LOAD_INDEX_RECOVERY_FILE',
+        os.path.join(tempfile.gettempdir(), 'cityfeel_dropped_indexes.sql'),
+    )
+
+
+@contextmanager
+def without_secondary_indexes(tables, log=lambda message: None):
+    """
+    Usuwa indeksy pomocnicze ``tables`` na czas bloku i odtwarza je na końcu (także po błędzie).
+
+    Przed usunięciem zapisuje ich definicje do ``index_recovery_path()``.
+    """
+    dropped = [index for table in tables for index in secondary_indexes(table)]
+    if not dropped:
+        yield []
+        return
+
+    recovery_path = index_recovery_path()
+    with open(recovery_path, 'w', encoding='utf-8') as f:
+        f.writelines(f"{definition};\n" for _, definition in dropped)
+    log(f"Definicje usuwanych indeksów zapisano w {recovery_path} (do odtworzenia ręcznego po przerwaniu).")
+    with connection.cursor() as cursor:
+        for name, _ in dropped:
+            cursor.execute(f"DROP INDEX {connection.ops.quote_name(name)}")
+    try:
+        yield [name for name, _ in dropped]
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SET maintenance_work_mem = %s",
+                [getattr(settings, 'CITYFEEL_LOAD_MAINTENANCE_WORK_MEM', '512MB')],
+            )
+            for _, definition in dropped:
+                cursor.execute(definition)
+            cursor.execute("RESET maintenance_work_mem")
+        os.remove(recovery_path)
+
+
+def _ewkt(lon, lat):
+    return f"SRID=4326;POINT({lon} {lat})"
+
+
+# --- Źródła wierszy: CSV ---
+
+def _read_csv(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        yield from csv.DictReader(f)
+
+
+def user_rows_from_csv(path):
+    """Kolumny: ``username`` oraz opcjonalnie ``email``, ``first_name``, ``last_name``."""
+    password = make_password(None)  # konta bez hasła (logowanie po resecie)
+    now = timezone.now()
+    for record in _read_csv(path):
+        yield (
+            record['username'], password, record.get('first_name', ''), record.get('last_name', ''),
+            record.get('email', ''), False, True, False, now, '{}',
+        )
+
+
+def location_rows_from_csv(path):
+    """Kolumny: ``name``, ``lon``, ``lat``. Dzielnice przypisuje ``load`` po imporcie."""
+    for record in _read_csv(path):
+        yield record['name'], _ewkt(float(record['lon']), float(record['lat'])), None
+
+
+def _csv_byte_range(path, start, end):
+    """
+    Rekordy CSV, których linia zaczyna się w bajtach ``[start, end)`` pliku — dzięki temu
+    procesy dzielą plik bez wspólnego czytania. Wymaga jednej linii na rekord.
+    """
+    with open(path, 'rb') as f:
+        header = next(csv.reader([f.readline().decode('utf-8')]))
+        if start > f.tell():
+            f.seek(start - 1)
+            f.readline()  # dokończenie linii, w której wypada start
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            if line.strip():
+                yield dict(zip(header, next(csv.reader([line.decode('utf-8')]))))
+
+
+def point_rows_from_csv(path, start=0, end=None):
+    """
+    Kolumny: ``user_id``, ``location_id``, ``emotional_value`` oraz opcjonalnie
+    ``privacy_status`` (domyślnie public) i ``created_at`` (ISO 8601, domyślnie teraz).
+    """
+    if end is None:
+        end = os.path.getsize(path)
+    now = timezone.now()
+    for record in _csv_byte_range(path, start, end):
+        value = int(record['emotional_value'])
+        if not EmotionPoint.MIN_EMOTIONAL_VALUE <= value <= EmotionPoint.MAX_EMOTIONAL_VALUE:
+            raise ValueError(f"emotional_value poza zakresem: {value}")
+        created_at = record.get('created_at') or now
+        yield (
+            int(record['user_id']), int(record['location_id']), value,
+            record.get('privacy_status') or 'public', created_at, created_at, False, False,
+        )
+
+
+def point_csv_sources(path, workers):
+    size = os.path.getsize(path)
+    step = -(-size // workers)
+    return [
+        (lambda start=start: point_rows_from_csv(path, start, min(start + step, size)))
+        for start in range(0, size, step)
+    ] or [lambda: iter(())]
+
+
+# --- Źródła wierszy: generatory ---
+
+LAND_ZONES = [
+    # (lat_min, lat_max, lon_min, lon_max) — ląd Gdańska bez zatoki
+    (54.33, 54.42, 18.55, 18.65),
+    (54.32, 54.42, 18.46, 18.55),
+    (54.27, 54.33, 18.55, 18.65),
+    (54.35, 54.38, 18.65, 18.72),
+    (54.32, 54.35, 18.72, 18.85),
+]
+LOCATION_CATEGORIES = ['Szkoła', 'Park', 'Siłownia', 'Plaża', 'Kawiarnia', 'Restauracja', 'Przystanek', 'Sklep']
+VALUE_WEIGHTS = [10, 15, 30, 25, 20]
+
+
+class UniformGenerator:
+    """
+    Generator wierszy o rozkładach jednostajnych (jak fixtures/seed_gdansk_massive.py).
+
+    Każda metoda ``*_rows(start, count)`` zwraca iterator krotek dla jednego kawałka danych
+    i używa własnego ``random.Random`` z ziarna i początku kawałka — ten sam zbiór powstaje
+    przy każdym uruchomieniu z tym samym ziarnem i liczbą procesów.
+    ``prepare_points`` wołane jest raz, w procesie głównym, przed rozwidleniem.
+    """
+
+    def __init__(self, seed=0, password=DEFAULT_PASSWORD, now=None):
+        self.seed = seed
+        self.password_hash = make_password(password)
+        self.now = now or timezone.now()
+
+    def rng(self, table, part):
+        return random.Random(f"{self.seed}:{table}:{part}")
+
+    def user_rows(self, first_number, count):
+        for n in range(first_number, first_number + count):
+            yield f"load_user_{n}", self.password_hash, '', '', '', False, True, False, self.now, '{}'
+
+    def location_rows(self, first_number, count):
+        rng = self.rng('location', first_number)
+        index = get_index()
+        for n in range(first_number, first_number + count):
+            for _ in range(100):  # punkt w granicach dzielnic, jeśli są wczytane
+                lat_min, lat_max, lon_min, lon_max = rng.choice(LAND_ZONES)
+                lon, lat = rng.uniform(lon_min, lon_max), rng.uniform(lat_min, lat_max)
+                district_id = index.district_of((lon, lat)) if index.names else None
+                if not index.names or district_id is not None:
+                    break
+            yield f"{rng.choice(LOCATION_CATEGORIES)} #{n}", _ewkt(lon, lat), district_id
+
+    def prepare_points(self, user_ids, location_ids):
+        self.user_ids, self.location_ids = user_ids, location_ids
+
+    def point_rows(self, start, count):
+        rng = self.rng('point', start)
+        for _ in range(count):
+            created_at = self.now - timedelta(days=rng.randint(0, 365), seconds=rng.randint(0, 86400))
+            yield (
+                rng.choice(self.user_ids), rng.choice(self.location_ids),
+                rng.choices(range(1, 6), weights=VALUE_WEIGHTS)[0],
+                rng.choice(('public', 'private')), created_at, created_at, False, False,
+            )
+
+
+def _next_number(model):
+    return (model.objects.aggregate(n=Max('pk'))['n'] or 0) + 1
+
+
+def load(users=0, locations=0, points=0, users_csv=None, locations_csv=None, points_csv=None,
+         generator=None, workers=1, keep_indexes=False, log=lambda message: None):
+    """
+    Importuje użytkowników, lokalizacje i punkty emocji (z plików CSV albo wygenerowane
+    w podanej liczbie przez ``generator``, domyślnie ``UniformGenerator``) i przelicza
+    dane pochodne. Zwraca słownik z liczbą wierszy na tabelę.
+    """
+    User = get_user_model()
+    workers = max(1, workers)
+    tables = [
+        table for table, wanted in (
+            (User._meta.db_table, users or users_csv),
+            (Location._meta.db_table, locations or locations_csv),
+            (EmotionPoint._meta.db_table, points or points_csv),
+        ) if wanted
+    ]
+    loaded = {}
+    if generator is None and (users or locations or points):
+        generator = UniformGenerator()
+
+    indexes = nullcontext([]) if keep_indexes else without_secondary_indexes(tables, log)
+    with indexes as dropped:
+        if dropped:
+            log(f"Usunięto {len(dropped)} indeksów pomocniczych na czas importu.")
+
+        if users_csv:
+            loaded['users'] = copy_rows(User._meta.db_table, USER_COLUMNS, user_rows_from_csv(users_csv))
+        elif users:
+            first = _next_number(User)
+            loaded['users'] = copy_parallel(User._meta.db_table, USER_COLUMNS, [
+                (lambda s=start, c=count: generator.user_rows(first + s, c))
+                for start, count in split(users, workers)
+            ])
+        if 'users' in loaded:
+            log(f"Użytkownicy: {loaded['users']}")
+
+        if locations_csv:
+            loaded['locations'] = copy_rows(
+                Location._meta.db_table, LOCATION_COLUMNS, location_rows_from_csv(locations_csv))
+        elif locations:
+            first = _next_number(Location)
+            get_index()  # indeks dzielnic budujemy raz, przed rozwidleniem procesów
+            loaded['locations'] = copy_parallel(Location._meta.db_table, LOCATION_COLUMNS, [
+                (lambda s=start, c=count: generator.location_rows(first + s, c))
+                for start, count in split(locations, workers)
+            ])
+        if 'locations' in loaded:
+            log(f"Lokalizacje: {loaded['locations']}")
+
+        if points_csv:
+            loaded['points'] = copy_parallel(
+                EmotionPoint._meta.db_table, POINT_COLUMNS, point_csv_sources(points_csv, workers))
+        elif points:
+            user_ids = list(User.objects.order_by('pk').values_list('pk', flat=True))
+            location_ids = list(Location.objects.order_by('pk').values_list('pk', flat=True))
+            if not user_ids or not location_ids:
+                raise LoadError("Do wygenerowania punktów potrzebni są użytkownicy i lokalizacje.")
+            generator.prepare_points(user_ids, location_ids)
+            loaded['points'] = copy_parallel(EmotionPoint._meta.db_table, POINT_COLUMNS, [
+                (lambda s=start, c=count: generator.point_rows(s, c))
+                for start, count in split(points, workers)
+            ])
+        if 'points' in loaded:
+            log(f"Punkty emocji: {loaded['points']}")
+            log("Oznaczam najnowsze oceny użytkowników...")
+            stats.rebuild_latest_flags()
+
+        if dropped:
+            log("Odtwarzam indeksy...")
+
+    with connection.cursor() as cursor:
+        for table in tables:
+            cursor.execute(f"ANALYZE {connection.ops.quote_name(table)}")
+
+    if locations_csv:
+        districts.assign_districts(only_missing=True)
+    log("Przeliczam statystyki lokalizacji i użytkowników...")
+    stats.rebuild_location_stats()
+    stats.rebuild_user_stats()
+    return loaded
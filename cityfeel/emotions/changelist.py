@@ -0,0 +1,181 @@
+"""
+Narzędzia do list w adminie dla dużych tabel (miliony punktów emocji i komentarzy).
+
+Domyślna lista w adminie przy każdym wyświetleniu robi kilka rzeczy, które przy 10M
+wierszy trwają sekundy:
+
+- ``COUNT(*)`` do paginacji (plus drugi, bez filtrów, dla „X wyników (pokaż wszystkie)”)
+  — ``EstimatedCountPaginator`` powyżej progu bierze liczbę ze statystyk planera:
+  ``pg_class.reltuples`` bez filtrów, szacunek z ``EXPLAIN`` z filtrami;
+- ``date_hierarchy`` — ``SELECT DISTINCT date_trunc(...)`` po całej tabeli na każdym
+  poziomie — ``CreatedDrilldownFilter`` liczy rok/miesiąc/dzień w Pythonie z MIN/MAX
+  (dwa odczyty końców indeksu), a wybór to zakres ``created_at`` (Index Scan);
+- ``icontains`` po ``user__username`` i ``location__name`` na JOIN-ie z OR, którego nie
+  obsłuży żaden indeks — ``RelatedSearchMixin`` szuka najpierw id (indeksy trigramowe
+  na ``UPPER(username)`` / ``UPPER(name)``), a potem filtruje po kluczach obcych;
+- ``list_filter`` po FK ładuje do panelu bocznego wszystkie lokalizacje —
+  ``TopLocationFilter`` pokazuje tylko najaktywniejsze (z ``LocationStats``) i wybraną.
+"""
+import datetime
+import json
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Max, Min, Q, QuerySet
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from map.models import Location
+
+from .models import LocationStats
+
+
+def estimated_table_count(model):
+    """Liczba wierszy tabeli ze statystyk (``ANALYZE`` / autovacuum); -1 gdy ich brak."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else -1
+
+
+def estimated_query_count(queryset):
+    """Szacowana przez planer liczba wierszy zapytania (``EXPLAIN``, bez wykonywania)."""
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator listy w adminie: dokładny ``COUNT(*)`` tylko wtedy, gdy szacunek jest
+    poniżej ``CITYFEEL_ADMIN_ESTIMATED_COUNT_THRESHOLD`` — dla małych tabel i wąskich
+    filtrów liczba jest dokładna, a dla dużych przybliżona (tak jak liczba stron).
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet):
+            threshold = getattr(settings, 'CITYFEEL_ADMIN_ESTIMATED_COUNT_THRESHOLD', 100_000)
+            if queryset.query.where:
+                estimate = estimated_query_count(queryset)
+            else:
+                estimate = estimated_table_count(queryset.model)
+            if estimate >= threshold:
+                return estimate
+        return super().count
+
+
+class CreatedDrilldownFilter(admin.SimpleListFilter):
+    """
+    Zamiennik ``date_hierarchy``: rok → miesiąc → dzień. Opcje liczone w Pythonie
+    (lata z MIN/MAX ``created_at``, miesiące i dni z kalendarza), filtr to zakres dat.
+    Wymaga indeksu na ``created_at``.
+    """
+    title = 'data utworzenia'
+    parameter_name = 'created'
+    field_name = 'created_at'
+
+    def _selected(self):
+        """Wybrany ``(rok, miesiąc, dzień)`` (brakujące części jako ``None``) albo ``None``."""
+        if not self.value():
+            return None
+        try:
+            parts = [int(part) for part in self.value().split('-')]
+            if not 1 <= len(parts) <= 3 or parts[0] >= datetime.MAXYEAR:
+                return None
+            datetime.date(*(parts + [1] * (3 - len(parts))))  # walidacja
+        except ValueError:
+            return None
+        return tuple(parts + [None] * (3 - len(parts)))
+
+    def lookups(self, request, model_admin):
+        bounds = model_admin.model._default_manager.aggregate(
+            first=Min(self.field_name), last=Max(self.field_name)
+        )
+        if bounds['first'] is None:
+            return []
+        first, last = timezone.localtime(bounds['first']), timezone.localtime(bounds['last'])
+        choices = [(str(year), str(year)) for year in range(last.year, first.year - 1, -1)]
+
+        selected = self._selected()
+        if selected:
+            year, month, _ = selected
+            choices += [(f'{year}-{m:02d}', f'{year}-{m:02d}') for m in range(1, 13)]
+            if month:
+                day = datetime.date(year, month, 1)
+                while day.month == month:
+                    choices.append((day.isoformat(), day.isoformat()))
+                    day += datetime.timedelta(days=1)
+        return choices
+
+    def queryset(self, request, queryset):
+        selected = self._selected()
+        if not selected:
+            return queryset
+        year, month, day = selected
+        if day:
+            start = datetime.date(year, month, day)
+            end = start + datetime.timedelta(days=1)
+        elif month:
+            start = datetime.date(year, month, 1)
+            end = datetime.date(year + month // 12, month % 12 + 1, 1)
+        else:
+            start, end = datetime.date(year, 1, 1), datetime.date(year + 1, 1, 1)
+
+        def aware(date):
+            return timezone.make_aware(datetime.datetime.combine(date, datetime.time.min))
+
+        return queryset.filter(**{
+            f'{self.field_name}__gte': aware(start),
+            f'{self.field_name}__lt': aware(end),
+        })
+
+
+class TopLocationFilter(admin.SimpleListFilter):
+    """
+    Filtr po lokalizacji bez ładowania całej tabeli: ``TOP_LOCATIONS`` lokalizacji z
+    największą liczbą wpisów (``LocationStats``) oraz aktualnie wybrana. Inne miejsca
+    wybiera się wyszukiwarką albo linkiem ``?location=<id>``.
+    """
+    title = 'lokalizacja'
+    parameter_name = 'location'
+    TOP_LOCATIONS = 20
+
+    def lookups(self, request, model_admin):
+        top = [
+            (stats.location_id, stats.location.name)
+            for stats in LocationStats.objects.select_related('location')
+            .order_by('-emotion_points_count')[:self.TOP_LOCATIONS]
+        ]
+        selected = self.value()
+        if selected and selected.isdigit() and int(selected) not in dict(top):
+            top += Location.objects.filter(pk=int(selected)).values_list('pk', 'name')
+        return [(str(pk), name) for pk, name in top]
+
+    def queryset(self, request, queryset):
+        if self.value() and self.value().isdigit():
+            return queryset.filter(location_id=int(self.value()))
+        return queryset
+
+
+class RelatedSearchMixin:
+    """
+    Wyszukiwanie po użytkowniku i lokalizacji: id pasujących userów i miejsc (co najwyżej
+    ``CITYFEEL_ADMIN_SEARCH_MAX_MATCHES`` każdych) z indeksów trigramowych, potem
+    ``user_id IN (...) OR location_id IN (...)`` po indeksach kluczy obcych.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        limit = getattr(settings, 'CITYFEEL_ADMIN_SEARCH_MAX_MATCHES', 500)
+        users = get_user_model().objects.filter(username__icontains=term).values('pk')[:limit]
+        locations = Location.objects.filter(name__icontains=term).values('pk')[:limit]
+        return queryset.filter(Q(user__in=users) | Q(location__in=locations)), False
@@ -58,7 +58,7 @@ def city_statistics_dashboard(request):
 
     if not stats_data:
         # JEŚLI NIE MA W CACHE -> MĘCZYMY BAZĘ DANYCH
-        qs = EmotionPoint.objects.filter(created_at__iso_year=year, created_at__week=week)
+        qs = EmotionPoint.objects.filter(created_at__iso_year=year, created_at__week=week, is_hidden=False)
 
         emotions_over_time = list(qs.annotate(date=TruncDate('created_at')).values('date', 'emotional_value').annotate(
             count=Count('id')).order_by('date'))
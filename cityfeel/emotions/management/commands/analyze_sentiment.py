@@ -2,6 +2,7 @@ from django.core.management.base import BaseCommand
 
 from emotions.models import Comment
 from emotions import sentiment as sentiment_service
+from emotions.summary import invalidate_location_summary
 
 
 class Command(BaseCommand):
@@ -34,6 +35,8 @@ class Command(BaseCommand):
                     sentiment_score=result["score"],
                     sentiment_label=result["label"],
                 )
+                # QuerySet.update omija sygnały — etykieta sentymentu jest w podsumowaniu strony
+                invalidate_location_summary(comment.location_id)
                 updated += 1
                 if updated % 10 == 0:
                     self.stdout.write(f"  {updated}/{total}...")
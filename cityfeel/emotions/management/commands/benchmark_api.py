@@ -0,0 +1,166 @@
+import io
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from emotions import benchmark, bulk_load, workload
+from emotions.models import EmotionPoint
+from map.models import Location
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark /api/locations/, histogramu, emotion-timeline, nearby i dashboardu na "
+        "zbiorach różnej wielkości: p50/p95/p99, liczba zapytań i wierszy, wynik w JSON. "
+        "Zbiory ładowane są do osobnej bazy <NAME>_benchmark, usuwanej na końcu."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scales', nargs='+', choices=list(workload.SCALES), default=['10k', '100k'],
+            help="Skale zbiorów (domyślnie 10k 100k)",
+        )
+        parser.add_argument(
+            '--current-db', action='store_true',
+            help="Zamiast ładować zbiory, zmierz bieżącą bazę (dane bez zmian; zapisywane są tylko "
+                 "sesja logowania i last_login pierwszego użytkownika)",
+        )
+        parser.add_argument('--iterations', type=int, default=20, help="Powtórzenia każdego scenariusza")
+        parser.add_argument('--warmup', type=int, default=2, help="Powtórzenia rozgrzewkowe (pomijane)")
+        parser.add_argument('--seed', type=int, default=1, help="Ziarno zbioru i parametrów zapytań")
+        parser.add_argument(
+            '--until', default=workload.BENCHMARK_UNTIL,
+            help=f"Koniec okna czasu ładowanych zbiorów (YYYY-MM-DD, domyślnie {workload.BENCHMARK_UNTIL})",
+        )
+        parser.add_argument('--workers', type=int, default=1, help="Procesy COPY przy ładowaniu zbiorów")
+        parser.add_argument('--only', help="Tylko scenariusze, których nazwa zawiera ten tekst")
+        parser.add_argument(
+            '--warm-cache', action='store_true',
+            help="Nie czyść cache przed żądaniami (domyślnie mierzymy bez cache)",
+        )
+        parser.add_argument('--output', default='benchmark_results.json', help="Plik wynikowy JSON")
+        parser.add_argument('--baseline', help="Wcześniejszy plik JSON do porównania")
+        parser.add_argument(
+            '--max-regression', type=float,
+            help="Błąd, gdy p95 któregoś scenariusza wzrośnie ponad tyle razy względem bazowego (np. 1.2)",
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1 or options['warmup'] < 0:
+            raise CommandError("--iterations musi być >= 1, a --warmup >= 0.")
+        try:
+            options['until'] = workload.parse_until(options['until'])
+        except ValueError:
+            raise CommandError(f"Niepoprawna data --until: {options['until']} (oczekiwano YYYY-MM-DD).")
+        baseline = None
+        if options['baseline']:
+            try:
+                baseline = benchmark.load_report(options['baseline'])
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Nie udało się wczytać {options['baseline']}: {e}")
+
+        report = {
+            'created_at': timezone.now().isoformat(),
+            'profile': 'current-db' if options['current_db'] else 'realistic',
+            'seed': options['seed'],
+            'until': None if options['current_db'] else options['until'].date().isoformat(),
+            'iterations': options['iterations'],
+            'warm_cache': options['warm_cache'],
+            'scales': [],
+        }
+
+        setup_test_environment()
+        try:
+            if options['current_db']:
+                report['scales'].append(self._benchmark('current', options))
+            else:
+                report['scales'] = self._benchmark_scales(options)
+        finally:
+            teardown_test_environment()
+
+        benchmark.save_report(report, options['output'])
+        self.stdout.write(f"Zapisano wyniki w {options['output']}")
+
+        if baseline is not None:
+            self._compare(report, baseline, options['max_regression'])
+        self.stdout.write(self.style.SUCCESS("Gotowe."))
+
+    def _benchmark_scales(self, options):
+        # Osobna baza: flush i ładowanie nie dotykają danych ani bazy testów jednostkowych
+        settings_dict = connection.settings_dict
+        test_settings = settings_dict.get('TEST', {})
+        settings_dict['TEST'] = {**test_settings, 'NAME': f"{settings_dict['NAME']}_benchmark"}
+        try:
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                return [self._benchmark_scale(scale, options) for scale in options['scales']]
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+        finally:
+            settings_dict['TEST'] = test_settings
+
+    def _benchmark_scale(self, scale, options):
+        users, locations, points = workload.SCALES[scale]
+        self.stdout.write(f"Skala {scale}: ładuję {points} punktów...")
+        call_command('flush', interactive=False, verbosity=0)
+        call_command('load_districts', stdout=io.StringIO())
+        started = time.perf_counter()
+        try:
+            bulk_load.load(
+                users=users, locations=locations, points=points,
+                generator=workload.WorkloadGenerator(seed=options['seed'], until=options['until']),
+                workers=options['workers'],
+            )
+        except bulk_load.LoadError as e:
+            raise CommandError(f"Import nie powiódł się: {e}")
+        load_seconds = round(time.perf_counter() - started, 1)
+        self.stdout.write(f"Załadowano w {load_seconds} s.")
+        return {**self._benchmark(scale, options), 'load_seconds': load_seconds}
+
+    def _benchmark(self, scale, options):
+        user = get_user_model().objects.order_by('pk').first()
+        if user is None or not Location.objects.exists():
+            raise CommandError("Baza nie zawiera użytkowników lub lokalizacji.")
+        cache.clear()
+        results = benchmark.run(
+            user,
+            iterations=options['iterations'],
+            warmup=options['warmup'],
+            seed=options['seed'],
+            warm_cache=options['warm_cache'],
+            only=options['only'],
+            log=self.stdout.write,
+        )
+        return {
+            'scale': scale,
+            'dataset': {
+                'users': get_user_model().objects.count(),
+                'locations': Location.objects.count(),
+                'points': EmotionPoint.objects.count(),
+            },
+            'results': results,
+        }
+
+    def _compare(self, report, baseline, max_regression):
+        rows = benchmark.compare(report, baseline)
+        if not rows:
+            self.stdout.write("Brak wspólnych scenariuszy z wynikiem bazowym.")
+            return
+        self.stdout.write("Porównanie z wynikiem bazowym (p50 / p95 w ms):")
+        regressions = []
+        for scale, scenario, old_p50, p50, old_p95, p95, ratio in rows:
+            line = f"{scale:>5} {scenario:<55} {old_p50:>9.2f} -> {p50:>9.2f}  {old_p95:>9.2f} -> {p95:>9.2f}  x{ratio:.2f}"
+            if max_regression and ratio > max_regression:
+                regressions.append(f"{scale} {scenario}")
+                line = self.style.ERROR(line)
+            self.stdout.write(line)
+        if regressions:
+            raise CommandError(
+                f"p95 wzrósł ponad x{max_regression} w {len(regressions)} scenariuszach: " + ", ".join(regressions)
+            )
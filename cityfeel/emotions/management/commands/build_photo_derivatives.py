@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from emotions import photos
+from emotions.models import Photo
+
+
+class Command(BaseCommand):
+    help = "Generuje warianty zdjęć (miniatura, średni; WebP + JPEG) dla zdjęć, które ich nie mają"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help="Generuj ponownie także dla zdjęć, które mają już warianty",
+        )
+
+    def handle(self, *args, **options):
+        qs = Photo.objects.exclude(image='').order_by('pk')
+        if not options['all']:
+            qs = qs.filter(variants={})
+
+        done = failed = 0
+        for photo_id in qs.values_list('pk', flat=True).iterator():
+            if photos.process_photo(photo_id) is None:
+                failed += 1
+            else:
+                done += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Gotowe. Warianty: {done}, błędy: {failed}."))
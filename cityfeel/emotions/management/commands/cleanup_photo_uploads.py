@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from emotions import uploads
+
+
+class Command(BaseCommand):
+    help = "Usuwa porzucone sesje uploadu zdjęć w kawałkach i ich pliki tymczasowe"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=int,
+            default=24,
+            help="Sesje bez aktywności dłużej niż tyle godzin (domyślnie 24)",
+        )
+
+    def handle(self, *args, **options):
+        count = uploads.cleanup_stale_uploads(timedelta(hours=options['hours']))
+        self.stdout.write(self.style.SUCCESS(f"Gotowe. Usunięto {count} sesji uploadu."))
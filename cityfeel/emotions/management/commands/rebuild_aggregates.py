@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from emotions import stats
+
+
+class Command(BaseCommand):
+    help = "Przelicza zdenormalizowane statystyki (po loaddata, bulk_create lub imporcie danych)"
+
+    def handle(self, *args, **options):
+        self.stdout.write("Oznaczam najnowsze oceny użytkowników...")
+        stats.rebuild_latest_flags()
+        self.stdout.write("Przeliczam statystyki lokalizacji...")
+        count = stats.rebuild_location_stats()
+        self.stdout.write("Przeliczam statystyki użytkowników...")
+        users_count = stats.rebuild_user_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"Gotowe. Zaktualizowano statystyki {count} lokalizacji i {users_count} użytkowników."
+        ))
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Jednorazowe wypełnienie statystyk dla istniejących danych (kopia SQL z emotions.stats
+# z chwili tworzenia migracji — migracje nie powinny importować bieżącego kodu aplikacji).
+BACKFILL_SQL = """
+    INSERT INTO emotions_location_stats (
+        location_id, avg_emotional_value, voters_count, emotion_points_count,
+        comments_count, photos_count, last_activity, updated_at
+    )
+    SELECT
+        l.id,
+        (
+            SELECT AVG(sub.emotional_value)
+            FROM (
+                SELECT DISTINCT ON (e.user_id) e.emotional_value
+                FROM emotions_emotion_point e
+                WHERE e.location_id = l.id
+                ORDER BY e.user_id, e.created_at DESC
+            ) sub
+        ),
+        (SELECT COUNT(DISTINCT e.user_id) FROM emotions_emotion_point e WHERE e.location_id = l.id),
+        (SELECT COUNT(*) FROM emotions_emotion_point e WHERE e.location_id = l.id),
+        (SELECT COUNT(*) FROM emotions_comment c WHERE c.location_id = l.id),
+        (SELECT COUNT(*) FROM emotions_photo p WHERE p.location_id = l.id),
+        (SELECT MAX(e.created_at) FROM emotions_emotion_point e WHERE e.location_id = l.id),
+        NOW()
+    FROM map_location l
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emotions', '0013_merge_20260530_2058'),
+        ('map', '0002_alter_location_options_alter_location_coordinates_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LocationStats',
+            fields=[
+                ('location', models.OneToOneField(help_text='Lokalizacja, której dotyczą statystyki', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='map.location')),
+                ('avg_emotional_value', models.FloatField(blank=True, help_text='Średnia z najnowszych ocen każdego użytkownika', null=True)),
+                ('voters_count', models.PositiveIntegerField(default=0, help_text='Liczba użytkowników, którzy ocenili lokalizację')),
+                ('emotion_points_count', models.PositiveIntegerField(default=0, help_text='Liczba wszystkich punktów emocji (cała historia)')),
+                ('comments_count', models.PositiveIntegerField(default=0, help_text='Liczba komentarzy')),
+                ('photos_count', models.PositiveIntegerField(default=0, help_text='Liczba zdjęć')),
+                ('last_activity', models.DateTimeField(blank=True, help_text='Data najnowszego punktu emocji', null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Statystyki lokalizacji',
+                'verbose_name_plural': 'Statystyki lokalizacji',
+                'db_table': 'emotions_location_stats',
+                'indexes': [models.Index(models.OrderBy(models.F('last_activity'), descending=True, nulls_last=True), name='locstats_activity_desc_idx'), models.Index(models.OrderBy(models.F('last_activity'), nulls_last=True), name='locstats_activity_asc_idx'), models.Index(models.OrderBy(models.F('avg_emotional_value'), descending=True, nulls_last=True), models.OrderBy(models.F('emotion_points_count'), descending=True), name='locstats_avg_desc_idx'), models.Index(models.OrderBy(models.F('avg_emotional_value'), nulls_last=True), models.OrderBy(models.F('emotion_points_count'), descending=True), name='locstats_avg_asc_idx')],
+            },
+        ),
+        migrations.RunSQL(BACKFILL_SQL, reverse_sql=migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emotions', '0014_location_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='photo',
+            name='variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Warianty zdjęcia (miniatura, średni) generowane w tle'),
+        ),
+    ]
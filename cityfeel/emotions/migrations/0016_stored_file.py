@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:05
+
+import emotions.models
+import emotions.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emotions', '0015_photo_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('name', models.CharField(help_text='Nazwa pliku w storage', max_length=255, primary_key=True, serialize=False)),
+                ('size', models.BigIntegerField(help_text='Rozmiar w bajtach')),
+                ('refcount', models.PositiveIntegerField(default=1, help_text='Liczba rekordów wskazujących na plik')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Plik mediów',
+                'verbose_name_plural': 'Pliki mediów',
+                'db_table': 'emotions_stored_file',
+            },
+        ),
+        migrations.AlterField(
+            model_name='photo',
+            name='image',
+            field=models.ImageField(storage=emotions.storage.get_content_hash_storage, upload_to='location_photos/', validators=[emotions.models.validate_image_size]),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:20
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emotions', '0016_stored_file'),
+        ('map', '0003_district'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PhotoUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255)),
+                ('size', models.PositiveIntegerField(help_text='Deklarowany rozmiar pliku w bajtach')),
+                ('sha256', models.CharField(help_text='Deklarowana suma SHA-256 całego pliku (hex)', max_length=64)),
+                ('offset', models.PositiveIntegerField(default=0, help_text='Liczba bajtów już odebranych')),
+                ('caption', models.CharField(blank=True, max_length=255)),
+                ('privacy_status', models.CharField(choices=[('public', 'Publiczny'), ('private', 'Prywatny')], default='public', max_length=10)),
+                ('status', models.CharField(choices=[('pending', 'W trakcie'), ('completed', 'Zakończony')], default='pending', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='photo_uploads', to='map.location')),
+                ('photo', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload', to='emotions.photo')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='photo_uploads', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Upload zdjęcia',
+                'verbose_name_plural': 'Uploady zdjęć',
+                'db_table': 'emotions_photo_upload',
+            },
+        ),
+    ]
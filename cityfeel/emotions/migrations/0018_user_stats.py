@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Jednorazowe wypełnienie liczników dla istniejących danych (kopia SQL z emotions.stats
+# z chwili tworzenia migracji — migracje nie powinny importować bieżącego kodu aplikacji).
+BACKFILL_SQL = """
+    WITH latest AS (
+        SELECT DISTINCT ON (e.user_id, e.location_id) e.user_id, e.privacy_status
+        FROM emotions_emotion_point e
+        ORDER BY e.user_id, e.location_id, e.created_at DESC
+    ),
+    counts AS (
+        SELECT latest.user_id,
+               COUNT(*) AS locations_count,
+               COUNT(*) FILTER (WHERE latest.privacy_status = 'public') AS public_count,
+               COUNT(*) FILTER (WHERE latest.privacy_status = 'private') AS private_count
+        FROM latest
+        GROUP BY latest.user_id
+    ),
+    activity AS (
+        SELECT e.user_id, MAX(e.created_at) AS last_activity
+        FROM emotions_emotion_point e
+        GROUP BY e.user_id
+    )
+    INSERT INTO emotions_user_stats (
+        user_id, locations_count, public_count, private_count, last_activity, updated_at
+    )
+    SELECT
+        u.id,
+        COALESCE(counts.locations_count, 0),
+        COALESCE(counts.public_count, 0),
+        COALESCE(counts.private_count, 0),
+        activity.last_activity,
+        NOW()
+    FROM auth_user u
+    LEFT JOIN counts ON counts.user_id = u.id
+    LEFT JOIN activity ON activity.user_id = u.id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cf_auth', '0005_avatar_variants'),
+        ('emotions', '0017_photo_upload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(help_text='Użytkownik, którego dotyczą statystyki', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('locations_count', models.PositiveIntegerField(default=0, help_text='Liczba ocenionych lokalizacji')),
+                ('public_count', models.PositiveIntegerField(default=0, help_text='Lokalizacje, w których najnowsza ocena jest publiczna')),
+                ('private_count', models.PositiveIntegerField(default=0, help_text='Lokalizacje, w których najnowsza ocena jest prywatna')),
+                ('last_activity', models.DateTimeField(blank=True, help_text='Data najnowszego punktu emocji', null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Statystyki użytkownika',
+                'verbose_name_plural': 'Statystyki użytkowników',
+                'db_table': 'emotions_user_stats',
+            },
+        ),
+        migrations.RunSQL(BACKFILL_SQL, reverse_sql=migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:20
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import UnaccentExtension
+from django.db import migrations, models
+
+
+# 'simple' (bez stemmingu — PostgreSQL nie ma polskiego słownika snowball) z unaccent
+# przed nim, żeby wyszukiwanie ignorowało znaki diakrytyczne w treści i w zapytaniu.
+CREATE_CONFIG_SQL = """
+    CREATE TEXT SEARCH CONFIGURATION cityfeel_pl (COPY = simple);
+    ALTER TEXT SEARCH CONFIGURATION cityfeel_pl
+        ALTER MAPPING FOR hword, hword_part, word WITH unaccent, simple;
+"""
+
+DROP_CONFIG_SQL = "DROP TEXT SEARCH CONFIGURATION IF EXISTS cityfeel_pl;"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emotions', '0018_user_stats'),
+        ('map', '0004_location_name_trgm'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        UnaccentExtension(),
+        migrations.RunSQL(CREATE_CONFIG_SQL, DROP_CONFIG_SQL),
+        migrations.AddField(
+            model_name='comment',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.SearchVector('content', config='cityfeel_pl'), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='comment_search_idx'),
+        ),
+    ]
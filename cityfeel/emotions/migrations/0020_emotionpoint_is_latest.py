@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Oznaczenie najnowszego wpisu każdej pary (user, lokalizacja) w istniejących danych
+# (kopia SQL z emotions.stats z chwili tworzenia migracji).
+BACKFILL_SQL = """
+    UPDATE emotions_emotion_point e
+    SET is_latest = TRUE
+    FROM (
+        SELECT DISTINCT ON (e.user_id, e.location_id) e.id
+        FROM emotions_emotion_point e
+        ORDER BY e.user_id, e.location_id, e.created_at DESC, e.id DESC
+    ) latest
+    WHERE e.id = latest.id
+"""
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emotions', '0019_comment_search'),
+        ('map', '0004_location_name_trgm'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emotionpoint',
+            name='is_latest',
+            field=models.BooleanField(default=False, editable=False, help_text='Czy to najnowszy wpis tego użytkownika w tej lokalizacji (obecny stan oceny)'),
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='emotionpoint',
+            index=models.Index(condition=models.Q(('is_latest', True)), fields=['location', 'emotional_value'], name='emotions_latest_loc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emotionpoint',
+            index=models.Index(condition=models.Q(('is_latest', True)), fields=['user', '-created_at'], name='emotions_latest_user_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emotions', '0020_emotionpoint_is_latest'),
+        ('map', '0004_location_name_trgm'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['status', '-created_at'], name='report_status_created_idx'),
+        ),
+    ]
@@ -0,0 +1,135 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Część baz ma już kolumnę is_hidden (z wcześniejszej gałęzi, bez modelu — skrypty
+# z fixtures zdejmowały z niej NOT NULL), więc kolumnę dodajemy warunkowo i porządkujemy.
+def hidden_column_sql(table):
+    return f"""
+        ALTER TABLE {table} ADD COLUMN IF NOT EXISTS is_hidden boolean;
+        UPDATE {table} SET is_hidden = FALSE WHERE is_hidden IS NULL;
+        ALTER TABLE {table} ALTER COLUMN is_hidden SET DEFAULT FALSE;
+        ALTER TABLE {table} ALTER COLUMN is_hidden SET NOT NULL;
+    """
+
+
+def add_hidden_field(model_name, table, help_text):
+    return migrations.SeparateDatabaseAndState(
+        database_operations=[
+            migrations.RunSQL(
+                hidden_column_sql(table),
+                f"ALTER TABLE {table} DROP COLUMN is_hidden;",
+            ),
+        ],
+        state_operations=[
+            migrations.AddField(
+                model_name=model_name,
+                name='is_hidden',
+                field=models.BooleanField(db_default=False, default=False, editable=False, help_text=help_text),
+            ),
+        ],
+    )
+
+
+# Wpisy już ukryte (istniejąca kolumna) nie mogą być is_latest
+# (kopia SQL z emotions.stats z chwili tworzenia migracji).
+LATEST_FLAGS_SQL = """
+    WITH latest AS (
+        SELECT DISTINCT ON (e.user_id, e.location_id) e.id
+        FROM emotions_emotion_point e
+        WHERE NOT e.is_hidden
+        ORDER BY e.user_id, e.location_id, e.created_at DESC, e.id DESC
+    )
+    UPDATE emotions_emotion_point e
+    SET is_latest = NOT e.is_latest
+    WHERE e.is_latest <> (e.id IN (SELECT id FROM latest))
+"""
+
+
+# LocationStats (0014) i UserStats (0018) liczyły też wpisy, które były już ukryte — przeliczamy
+# wiersze miejsc i userów z ukrytą treścią (kopia SQL z emotions.stats z chwili tworzenia migracji).
+LOCATION_STATS_SQL = """
+    INSERT INTO emotions_location_stats (
+        location_id, avg_emotional_value, voters_count, emotion_points_count,
+        comments_count, photos_count, last_activity, updated_at
+    )
+    SELECT
+        l.id,
+        (SELECT AVG(e.emotional_value) FROM emotions_emotion_point e WHERE e.location_id = l.id AND e.is_latest),
+        (SELECT COUNT(*) FROM emotions_emotion_point e WHERE e.location_id = l.id AND e.is_latest),
+        (SELECT COUNT(*) FROM emotions_emotion_point e WHERE e.location_id = l.id AND NOT e.is_hidden),
+        (SELECT COUNT(*) FROM emotions_comment c WHERE c.location_id = l.id AND NOT c.is_hidden),
+        (SELECT COUNT(*) FROM emotions_photo p WHERE p.location_id = l.id AND NOT p.is_hidden),
+        (SELECT MAX(e.created_at) FROM emotions_emotion_point e WHERE e.location_id = l.id AND NOT e.is_hidden),
+        NOW()
+    FROM map_location l
+    WHERE l.id IN (
+        SELECT location_id FROM emotions_emotion_point WHERE is_hidden
+        UNION SELECT location_id FROM emotions_comment WHERE is_hidden
+        UNION SELECT location_id FROM emotions_photo WHERE is_hidden
+    )
+    ON CONFLICT (location_id) DO UPDATE SET
+        avg_emotional_value = EXCLUDED.avg_emotional_value,
+        voters_count = EXCLUDED.voters_count,
+        emotion_points_count = EXCLUDED.emotion_points_count,
+        comments_count = EXCLUDED.comments_count,
+        photos_count = EXCLUDED.photos_count,
+        last_activity = EXCLUDED.last_activity,
+        updated_at = EXCLUDED.updated_at
+"""
+
+
+USER_STATS_SQL = """
+    INSERT INTO emotions_user_stats (
+        user_id, locations_count, public_count, private_count, last_activity, updated_at
+    )
+    SELECT
+        u.id,
+        (SELECT COUNT(*) FROM emotions_emotion_point e WHERE e.user_id = u.id AND e.is_latest),
+        (SELECT COUNT(*) FROM emotions_emotion_point e
+         WHERE e.user_id = u.id AND e.is_latest AND e.privacy_status = 'public'),
+        (SELECT COUNT(*) FROM emotions_emotion_point e
+         WHERE e.user_id = u.id AND e.is_latest AND e.privacy_status = 'private'),
+        (SELECT MAX(e.created_at) FROM emotions_emotion_point e WHERE e.user_id = u.id AND NOT e.is_hidden),
+        NOW()
+    FROM auth_user u
+    WHERE u.id IN (SELECT user_id FROM emotions_emotion_point WHERE is_hidden)
+    ON CONFLICT (user_id) DO UPDATE SET
+        locations_count = EXCLUDED.locations_count,
+        public_count = EXCLUDED.public_count,
+        private_count = EXCLUDED.private_count,
+        last_activity = EXCLUDED.last_activity,
+        updated_at = EXCLUDED.updated_at
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emotions', '0021_report_status_created_idx'),
+        ('map', '0004_location_name_trgm'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        add_hidden_field('comment', 'emotions_comment', 'Ukryty przez moderatora — niewidoczny w aplikacji i API'),
+        add_hidden_field('emotionpoint', 'emotions_emotion_point', 'Ukryty przez moderatora — pomijany w statystykach i listach'),
+        add_hidden_field('photo', 'emotions_photo', 'Ukryte przez moderatora — niewidoczne w aplikacji i API'),
+        migrations.RunSQL(LATEST_FLAGS_SQL, migrations.RunSQL.noop),
+        migrations.RunSQL(LOCATION_STATS_SQL, migrations.RunSQL.noop),
+        migrations.RunSQL(USER_STATS_SQL, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(condition=models.Q(('is_hidden', False)), fields=['location', '-created_at'], name='comment_visible_loc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emotionpoint',
+            index=models.Index(condition=models.Q(('is_hidden', False)), fields=['location', 'created_at'], name='emotions_visible_loc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='photo',
+            index=models.Index(condition=models.Q(('is_hidden', False)), fields=['location', '-created_at'], name='photo_visible_loc_idx'),
+        ),
+    ]
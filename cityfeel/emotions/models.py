@@ -1,11 +1,19 @@
 # cityfeel/emotions/models.py
 
+import uuid
+
 from django.db import models
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.core.files.storage import default_storage
 from map.models import Location
 
+from .photos import variant_key
+from .storage import get_content_hash_storage
+
 
 class EmotionPoint(models.Model):
     """
@@ -17,7 +25,7 @@ class EmotionPoint(models.Model):
 
     Agregacje:
     - "Stan bieżący" = średnia z najnowszego wpisu każdego usera per lokalizacja
-      (DISTINCT ON (user_id) ORDER BY created_at DESC).
+      (wiersze z ``is_latest=True``).
     - "W oknie czasu" = mean-of-means (każdy user dostaje jedną wagę w oknie,
       niezależnie od liczby wpisów).
 
@@ -76,6 +84,23 @@ class EmotionPoint(models.Model):
         help_text="Kiedy ten punkt emocji był ostatnio aktualizowany"
     )
 
+    # Utrzymywana sygnałami (emotions.stats.refresh_latest_flag); po bulk_create / imporcie
+    # przelicza ją ``manage.py rebuild_aggregates``.
+    is_latest = models.BooleanField(
+        default=False,
+        editable=False,
+        help_text="Czy to najnowszy wpis tego użytkownika w tej lokalizacji (obecny stan oceny)"
+    )
+
+    # Ustawiana akcjami moderacji (emotions.moderation.set_hidden). Ukryty wpis nigdy nie
+    # jest is_latest, więc znika ze „stanu bieżącego” bez dodatkowego warunku w zapytaniach.
+    is_hidden = models.BooleanField(
+        default=False,
+        db_default=False,
+        editable=False,
+        help_text="Ukryty przez moderatora — pomijany w statystykach i listach"
+    )
+
     class Meta:
         verbose_name = "Punkt emocji"
         verbose_name_plural = "Punkty emocji"
@@ -84,9 +109,28 @@ class EmotionPoint(models.Model):
             models.Index(fields=['user', 'created_at'], name='emotions_user_created_idx'),
             models.Index(fields=['location', 'emotional_value'], name='emotions_loc_value_idx'),
             models.Index(fields=['privacy_status'], name='emotions_privacy_idx'),
-            # Wspiera DISTINCT ON (location_id, user_id) ORDER BY ... created_at DESC
-            # — agregacja "latest per user at location" w trybie A.
+            # Wspiera wybór najnowszego wpisu pary (user, lokalizacja) przy odświeżaniu
+            # flagi is_latest (emotions.stats.refresh_latest_flag).
             models.Index(fields=['location', 'user', '-created_at'], name='emotions_loc_user_created_idx'),
+            # "Stan bieżący" — tylko najnowsze wpisy: średnia/rozkład lokalizacji
+            # i lista ocen na profilu bez DISTINCT ON po całej historii.
+            models.Index(
+                fields=['location', 'emotional_value'],
+                condition=models.Q(is_latest=True),
+                name='emotions_latest_loc_idx',
+            ),
+            models.Index(
+                fields=['user', '-created_at'],
+                condition=models.Q(is_latest=True),
+                name='emotions_latest_user_idx',
+            ),
+            # Historia bez ukrytych wpisów: liczba wpisów i ostatnia aktywność lokalizacji
+            # (LocationStats) oraz agregacja w oknie czasu.
+            models.Index(
+                fields=['location', 'created_at'],
+                condition=models.Q(is_hidden=False),
+                name='emotions_visible_loc_idx',
+            ),
         ]
         ordering = ['-created_at']
 
@@ -94,6 +138,10 @@ class EmotionPoint(models.Model):
         return f"{self.user.username} - {self.location.name} ({self.emotional_value}/{self.MAX_EMOTIONAL_VALUE})"
 
 
+# Konfiguracja wyszukiwania pełnotekstowego komentarzy (tworzona w migracji 0019).
+SEARCH_CONFIG = 'cityfeel_pl'
+
+
 class Comment(models.Model):
     """
     Komentarz użytkownika do lokalizacji.
@@ -163,16 +211,170 @@ class Comment(models.Model):
         help_text="Data utworzenia komentarza"
     )
 
+    is_hidden = models.BooleanField(
+        default=False,
+        db_default=False,
+        editable=False,
+        help_text="Ukryty przez moderatora — niewidoczny w aplikacji i API"
+    )
+
+    # Wektor pełnotekstowy treści, liczony przez bazę przy każdym INSERT/UPDATE.
+    # Konfiguracja ``cityfeel_pl`` (migracja 0019) to 'simple' + unaccent — PostgreSQL
+    # nie ma polskiego stemmera, więc dopasowujemy całe słowa bez względu na wielkość
+    # liter i znaki diakrytyczne („zolw” znajduje „żółw”).
+    search_vector = models.GeneratedField(
+        expression=SearchVector('content', config=SEARCH_CONFIG),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
     class Meta:
         verbose_name = "Komentarz"
         verbose_name_plural = "Komentarze"
         db_table = "emotions_comment"
         ordering = ['-created_at']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='comment_search_idx'),
+            # Komentarze lokalizacji (strona szczegółów, licznik w LocationStats) bez ukrytych
+            models.Index(
+                fields=['location', '-created_at'],
+                condition=models.Q(is_hidden=False),
+                name='comment_visible_loc_idx',
+            ),
+            # Lista w adminie (sortowanie domyślne, filtr dat emotions.changelist)
+            models.Index(fields=['-created_at'], name='comment_created_idx'),
+        ]
 
     def __str__(self):
         return f"Komentarz {self.user} do {self.location.name}"
 
 
+class LocationStats(models.Model):
+    """
+    Zdenormalizowane statystyki lokalizacji (jeden wiersz per Location).
+
+    Liczone przez ``emotions.stats`` i odświeżane sygnałami przy zapisie/usunięciu
+    EmotionPoint, Comment i Photo. Dzięki temu lista lokalizacji sortuje i filtruje
+    po zindeksowanych kolumnach zamiast agregować JOIN punkty × komentarze × zdjęcia.
+
+    - ``avg_emotional_value`` — "stan bieżący" (średnia z najnowszego wpisu każdego usera),
+      ta sama definicja co tryb A w ``api.aggregation``.
+    - ``emotion_points_count`` — liczba wszystkich wpisów w historii.
+    - ``last_activity`` — data najnowszego punktu emocji.
+    """
+    location = models.OneToOneField(
+        Location,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        help_text="Lokalizacja, której dotyczą statystyki"
+    )
+
+    avg_emotional_value = models.FloatField(
+        null=True, blank=True,
+        help_text="Średnia z najnowszych ocen każdego użytkownika"
+    )
+
+    voters_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Liczba użytkowników, którzy ocenili lokalizację"
+    )
+
+    emotion_points_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Liczba wszystkich punktów emocji (cała historia)"
+    )
+
+    comments_count = models.PositiveIntegerField(default=0, help_text="Liczba komentarzy")
+
+    photos_count = models.PositiveIntegerField(default=0, help_text="Liczba zdjęć")
+
+    last_activity = models.DateTimeField(
+        null=True, blank=True,
+        help_text="Data najnowszego punktu emocji"
+    )
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Statystyki lokalizacji"
+        verbose_name_plural = "Statystyki lokalizacji"
+        db_table = "emotions_location_stats"
+        indexes = [
+            # Indeksy odpowiadają dokładnie sortowaniom z LocationListView
+            # (NULLS LAST w obu kierunkach), żeby strona listy była Index Scanem + LIMIT.
+            models.Index(
+                models.F('last_activity').desc(nulls_last=True),
+                name='locstats_activity_desc_idx',
+            ),
+            models.Index(
+                models.F('last_activity').asc(nulls_last=True),
+                name='locstats_activity_asc_idx',
+            ),
+            models.Index(
+                models.F('avg_emotional_value').desc(nulls_last=True),
+                models.F('emotion_points_count').desc(),
+                name='locstats_avg_desc_idx',
+            ),
+            models.Index(
+                models.F('avg_emotional_value').asc(nulls_last=True),
+                models.F('emotion_points_count').desc(),
+                name='locstats_avg_asc_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Statystyki: {self.location.name}"
+
+
+class UserStats(models.Model):
+    """
+    Zdenormalizowane liczniki aktywności użytkownika (jeden wiersz per user).
+
+    Liczone przez ``emotions.stats`` i odświeżane sygnałami przy zapisie/usunięciu
+    EmotionPoint. Profil i społeczność czytają liczniki zamiast agregować historię.
+
+    - ``locations_count`` — liczba różnych ocenionych lokalizacji,
+    - ``public_count`` / ``private_count`` — prywatność najnowszej oceny w każdej
+      lokalizacji ("obecny stan ocen", jak na profilu),
+    - ``last_activity`` — data najnowszego punktu emocji.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        help_text="Użytkownik, którego dotyczą statystyki"
+    )
+
+    locations_count = models.PositiveIntegerField(default=0, help_text="Liczba ocenionych lokalizacji")
+
+    public_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Lokalizacje, w których najnowsza ocena jest publiczna"
+    )
+
+    private_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Lokalizacje, w których najnowsza ocena jest prywatna"
+    )
+
+    last_activity = models.DateTimeField(
+        null=True, blank=True,
+        help_text="Data najnowszego punktu emocji"
+    )
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Statystyki użytkownika"
+        verbose_name_plural = "Statystyki użytkowników"
+        db_table = "emotions_user_stats"
+
+    def __str__(self):
+        return f"Statystyki: {self.user}"
+
+
 def validate_image_size(image):
     file_size = image.size
     limit_mb = 5
@@ -206,13 +408,23 @@ class Photo(models.Model):
         help_text="Lokalizacja, której dotyczy zdjęcie"
     )
 
+    # Nazwa pliku = SHA-256 treści (emotions.storage); katalog z upload_to to tylko prefiks
     image = models.ImageField(
-        upload_to='location_photos/%Y/%m/%d/',
+        upload_to='location_photos/',
+        storage=get_content_hash_storage,
         validators=[validate_image_size]
     )
 
     caption = models.CharField(max_length=255, blank=True)
 
+    # Ścieżki wariantów w storage, np. {"thumb_webp": "...", "thumb_jpg": "..."} — patrz emotions.photos
+    variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text="Warianty zdjęcia (miniatura, średni) generowane w tle"
+    )
+
     # [WAŻNE] Status prywatności zdjęcia
     privacy_status = models.CharField(
         max_length=10,
@@ -223,13 +435,121 @@ class Photo(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    is_hidden = models.BooleanField(
+        default=False,
+        db_default=False,
+        editable=False,
+        help_text="Ukryte przez moderatora — niewidoczne w aplikacji i API"
+    )
+
     class Meta:
         verbose_name = "Zdjęcie"
         verbose_name_plural = "Zdjęcia"
+        indexes = [
+            models.Index(
+                fields=['location', '-created_at'],
+                condition=models.Q(is_hidden=False),
+                name='photo_visible_loc_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"Zdjęcie do lokalizacji {self.location.name}"
 
+    def variant_url(self, name, fmt='JPEG'):
+        """URL wariantu; dopóki warianty nie są gotowe — URL oryginału."""
+        path = (self.variants or {}).get(variant_key(name, fmt))
+        if path:
+            return default_storage.url(path)
+        return self.image.url if self.image else ''
+
+    @property
+    def thumbnail_url(self):
+        return self.variant_url('thumb')
+
+    @property
+    def thumbnail_webp_url(self):
+        return self.variant_url('thumb', 'WEBP')
+
+    @property
+    def medium_url(self):
+        return self.variant_url('medium')
+
+    @property
+    def medium_webp_url(self):
+        return self.variant_url('medium', 'WEBP')
+
+
+class PhotoUpload(models.Model):
+    """
+    Sesja wznawialnego uploadu zdjęcia w kawałkach (emotions.uploads, API /api/photo-uploads/).
+
+    Kawałki trafiają do pliku tymczasowego; ``offset`` to liczba bajtów już zapisanych,
+    od której klient wznawia wysyłanie. Po sprawdzeniu sumy SHA-256 plik jest atomowo
+    dołączany do nowego Photo.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_COMPLETED = 'completed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'W trakcie'),
+        (STATUS_COMPLETED, 'Zakończony'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='photo_uploads',
+    )
+    location = models.ForeignKey(
+        Location,
+        on_delete=models.CASCADE,
+        related_name='photo_uploads',
+    )
+    filename = models.CharField(max_length=255)
+    size = models.PositiveIntegerField(help_text="Deklarowany rozmiar pliku w bajtach")
+    sha256 = models.CharField(max_length=64, help_text="Deklarowana suma SHA-256 całego pliku (hex)")
+    offset = models.PositiveIntegerField(default=0, help_text="Liczba bajtów już odebranych")
+    caption = models.CharField(max_length=255, blank=True)
+    privacy_status = models.CharField(max_length=10, choices=Photo.PRIVACY_CHOICES, default='public')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    photo = models.OneToOneField(
+        Photo,
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name='upload',
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Upload zdjęcia"
+        verbose_name_plural = "Uploady zdjęć"
+        db_table = "emotions_photo_upload"
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+
+class StoredFile(models.Model):
+    """
+    Licznik referencji pliku w storage adresowanym treścią (emotions.storage).
+
+    Wiersze zapisuje i usuwa sam storage (surowe SQL z upsertem) — nie edytujemy ich ręcznie.
+    """
+    name = models.CharField(max_length=255, primary_key=True, help_text="Nazwa pliku w storage")
+    size = models.BigIntegerField(help_text="Rozmiar w bajtach")
+    refcount = models.PositiveIntegerField(default=1, help_text="Liczba rekordów wskazujących na plik")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Plik mediów"
+        verbose_name_plural = "Pliki mediów"
+        db_table = "emotions_stored_file"
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount})"
+
 
 class Report(models.Model):
     REPORT_REASONS = [
@@ -295,6 +615,10 @@ class Report(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Zgłoszenie'
         verbose_name_plural = 'Zgłoszenia'
+        indexes = [
+            # Kolejka moderacji: filtr po statusie + najnowsze najpierw, oraz liczniki per status.
+            models.Index(fields=['status', '-created_at'], name='report_status_created_idx'),
+        ]
 
     def __str__(self):
         if self.location:
@@ -0,0 +1,124 @@
+"""
+Kolejka moderacji zgłoszeń (panel ``emotions:admin_reports``).
+
+Zgłoszenia grupujemy po obiekcie, którego dotyczą (``location_id``, ``emotion_point_id``,
+``comment_id``), więc dziesięć zgłoszeń spamu pod jednym komentarzem to jeden wiersz
+z licznikiem. Grupowanie, stronicowanie i liczniki per status robi baza — filtr po
+statusie i sortowanie po dacie idą po indeksie ``report_status_created_idx``.
+
+Obiekty zgłoszeń dla bieżącej strony dociągamy osobno (po jednym zapytaniu na typ),
+zamiast JOIN-ować je do zapytania grupującego.
+
+Ukrywanie treści (``set_hidden``, akcje w adminie) ustawia ``is_hidden`` na EmotionPoint,
+Comment lub Photo. To ``UPDATE`` bez sygnałów, więc flagę ``is_latest``, statystyki
+i cache podsumowań lokalizacji odświeżamy tutaj — jak sygnały przy zapisie.
+"""
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from map.models import Location
+
+from . import stats
+from .models import Comment, EmotionPoint, Report
+from .summary import invalidate_location_summary
+
+TARGET_FIELDS = ('location_id', 'emotion_point_id', 'comment_id')
+DEFAULT_STATUS = 'pending'
+
+STATUSES = dict(Report.REPORT_STATUS)
+REASONS = dict(Report.REPORT_REASONS)
+
+
+def grouped_reports(status=DEFAULT_STATUS, reason=None):
+    """
+    Zgłoszenia o danym statusie (i opcjonalnie powodzie) zgrupowane po obiekcie —
+    słowniki z polami celu, ``reports_count``, ``reasons``, ``reporters`` (nazwy
+    zgłaszających), ``descriptions`` (niepuste opisy) i ``latest_at``, od najświeższej
+    aktywności.
+    """
+    qs = Report.objects.filter(status=status)
+    if reason:
+        qs = qs.filter(reason=reason)
+    return (
+        qs.order_by()
+        .values(*TARGET_FIELDS)
+        .annotate(
+            reports_count=Count('id'),
+            reasons=ArrayAgg('reason', distinct=True, ordering='reason'),
+            reporters=ArrayAgg('reporter__username', distinct=True, ordering='reporter__username'),
+            descriptions=ArrayAgg(
+                'description', distinct=True, ordering='description', filter=Q(description__gt='')
+            ),
+            latest_at=Max('created_at'),
+        )
+        .order_by('-latest_at', *TARGET_FIELDS)
+    )
+
+
+def status_counts(reason=None):
+    """Liczba zgłoszeń w każdym statusie — jedno zapytanie z GROUP BY."""
+    qs = Report.objects.all()
+    if reason:
+        qs = qs.filter(reason=reason)
+    counts = dict.fromkeys(STATUSES, 0)
+    counts.update(qs.order_by().values_list('status').annotate(n=Count('id')))
+    return counts
+
+
+def attach_targets(rows):
+    """
+    Uzupełnia wiersze kolejki o obiekty ``location`` / ``emotion_point`` / ``comment``
+    i czytelne nazwy powodów. Po jednym zapytaniu na typ obiektu niezależnie od
+    rozmiaru strony.
+    """
+    ids = {field: {row[field] for row in rows if row[field]} for field in TARGET_FIELDS}
+    locations = Location.objects.in_bulk(ids['location_id'])
+    points = EmotionPoint.objects.select_related('user', 'location').in_bulk(ids['emotion_point_id'])
+    comments = Comment.objects.select_related('user', 'location').in_bulk(ids['comment_id'])
+
+    for row in rows:
+        row['location'] = locations.get(row['location_id'])
+        row['emotion_point'] = points.get(row['emotion_point_id'])
+        row['comment'] = comments.get(row['comment_id'])
+        row['reason_labels'] = [REASONS.get(r, r) for r in row['reasons']]
+        row['descriptions'] = row['descriptions'] or []  # grupa bez opisów — NULL z ArrayAgg
+    return rows
+
+
+def set_hidden(queryset, hidden=True):
+    """
+    Ukrywa (albo przywraca, ``hidden=False``) obiekty z ``queryset`` — EmotionPoint,
+    Comment lub Photo. Zwraca liczbę obiektów, których stan się zmienił.
+    """
+    model = queryset.model
+    rows = list(queryset.exclude(is_hidden=hidden).values_list('pk', 'user_id', 'location_id'))
+    if not rows:
+        return 0
+
+    location_ids = {location_id for _, _, location_id in rows}
+    with transaction.atomic():
+        model.objects.filter(pk__in=[pk for pk, _, _ in rows]).update(is_hidden=hidden)
+        if model is EmotionPoint:
+            # Ukryty wpis traci is_latest na rzecz poprzedniego widocznego wpisu pary
+            for user_id, location_id in {(user_id, location_id) for _, user_id, location_id in rows}:
+                stats.refresh_latest_flag(user_id, location_id)
+            stats.refresh_user_stats([user_id for _, user_id, _ in rows])
+        stats.refresh_location_stats(list(location_ids))
+
+    for location_id in location_ids:
+        invalidate_location_summary(location_id)
+    return len(rows)
+
+
+def set_reported_hidden(reports, hidden=True):
+    """
+    Ukrywa/przywraca treści wskazane przez zgłoszenia (oceny i komentarze — lokalizacji
+    moderacja nie ukrywa). Zwraca liczbę zmienionych obiektów.
+    """
+    targets = list(reports.values_list('emotion_point_id', 'comment_id'))
+    point_ids = {point_id for point_id, _ in targets if point_id}
+    comment_ids = {comment_id for _, comment_id in targets if comment_id}
+    return (
+        set_hidden(EmotionPoint.objects.filter(pk__in=point_ids), hidden)
+        + set_hidden(Comment.objects.filter(pk__in=comment_ids), hidden)
+    )
@@ -0,0 +1,216 @@
+"""
+Warianty zdjęć (miniatura, średni) generowane w tle po dodaniu zdjęcia.
+
+Oryginał (do 5 MB) zostaje w ``Photo.image``; strony i admin pokazują warianty
+o stałej szerokości. Każdy wariant zapisujemy w WebP i w JPEG (fallback dla
+``<picture>``). Przed skalowaniem stosujemy orientację z EXIF, a warianty
+zapisujemy bez metadanych (EXIF/GPS, ICC, XMP).
+
+Przetwarzanie uruchamia sygnał ``post_save`` po zatwierdzeniu transakcji
+(``transaction.on_commit``) w puli wątków procesu — żądanie nie czeka na Pillow.
+Ścieżki wariantów trafiają do ``Photo.variants`` (JSON); dopóki ich nie ma,
+``Photo.variant_url`` zwraca oryginał. Zdjęcia sprzed wdrożenia lub po awarii:
+``python manage.py build_photo_derivatives``.
+
+Nazwa wariantu to nazwa oryginału (hash treści) plus odcisk parametrów renderowania
+(``variant_version``) — zmiana szerokości, jakości czy formatu daje nowe URL-e, więc
+warianty mogą być cache'owane jako niezmienne. Ten sam oryginał i te same parametry
+to ten sam plik, współdzielony przez zdjęcia z deduplikacji: istniejącego nie
+renderujemy ponownie, a równoległe zadania zapisują identyczną treść pod tą samą nazwą.
+"""
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import connection, transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# nazwa -> szerokość w px (wysokość proporcjonalnie; mniejszych zdjęć nie powiększamy)
+VARIANT_WIDTHS = {
+    'thumb': 320,
+    'medium': 1280,
+}
+# format Pillow -> (rozszerzenie, parametry zapisu)
+FORMATS = {
+    'WEBP': ('webp', {'quality': 80, 'method': 4}),
+    'JPEG': ('jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+# Nadpisanie wariantu = zapis tej samej treści (nazwa z odciskiem oryginału i parametrów)
+derivative_storage = FileSystemStorage(allow_overwrite=True)
+
+_executor = None
+_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                workers = getattr(settings, 'CITYFEEL_PHOTO_WORKERS', 2)
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='photo-derivatives')
+    return _executor
+
+
+def variant_key(name, fmt):
+    """Klucz w ``Photo.variants``, np. ``thumb_webp``."""
+    return f'{name}_{FORMATS[fmt][0]}'
+
+
+def variant_version(*params):
+    """Krótki odcisk parametrów renderowania (szerokości, formaty, jakość) do nazw wariantów."""
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:8]
+
+
+def derivative_path(original_name, suffix):
+    """Ścieżka wariantu obok oryginału: ``<katalog>/derivatives/<nazwa>.<suffix>``."""
+    base, _ = os.path.splitext(original_name)
+    directory, filename = os.path.split(base)
+    return f'{directory}/derivatives/{filename}.{suffix}'
+
+
+def save_derivative(path, data):
+    """Zapisuje wariant dokładnie pod ``path`` (nadpisując plik o tej samej nazwie) i zwraca nazwę."""
+    return derivative_storage.save(path, ContentFile(data))
+
+
+def unshared_paths(paths, other_variants):
+    """Ścieżki z ``paths``, których nie używa żaden ze słowników wariantów ``other_variants``."""
+    shared = {path for variants in other_variants for path in (variants or {}).values()}
+    return set(paths) - shared
+
+
+def prepare_image(image):
+    """Orientacja z EXIF + tryb kolorów, który da się zapisać jako JPEG."""
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        rgba = image.convert('RGBA')
+        background = Image.new('RGB', rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        return background
+    if image.mode != 'RGB':
+        return image.convert('RGB')
+    return image
+
+
+def render_variants(fp):
+    """
+    Generuje warianty z pliku obrazu.
+
+    Returns:
+        dict: ``{(nazwa, format): bajty}`` dla wszystkich par z VARIANT_WIDTHS × FORMATS.
+    """
+    with Image.open(fp) as source:
+        # JPEG: dekodujemy od razu w zmniejszonej skali (1/2, 1/4, 1/8), o ile obie
+        # krawędzie zostaną ≥ największej szerokości — obrót z EXIF może je zamienić
+        largest = max(VARIANT_WIDTHS.values())
+        source.draft('RGB', (largest, largest))
+        image = prepare_image(source)
+
+    rendered = {}
+    for name, width in sorted(VARIANT_WIDTHS.items(), key=lambda item: -item[1]):
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.Resampling.LANCZOS)
+        for fmt, (_, options) in FORMATS.items():
+            buffer = io.BytesIO()
+            # Bez exif=/icc_profile= Pillow nie przepisuje metadanych do wariantu
+            image.save(buffer, format=fmt, **options)
+            rendered[(name, fmt)] = buffer.getvalue()
+    return rendered
+
+
+def build_derivatives(photo):
+    """
+    Generuje i zapisuje warianty zdjęcia, aktualizuje ``Photo.variants``.
+
+    Zapis przez ``QuerySet.update`` (bez sygnałów ``post_save``), więc wpis
+    podsumowania lokalizacji unieważniamy sami.
+    """
+    from .models import Photo
+    from .summary import invalidate_location_summary
+
+    version = variant_version(VARIANT_WIDTHS, FORMATS)
+    paths = {
+        (name, fmt): derivative_path(photo.image.name, f'{version}.{name}.{ext}')
+        for name in VARIANT_WIDTHS for fmt, (ext, _) in FORMATS.items()
+    }
+    if all(derivative_storage.exists(path) for path in paths.values()):
+        # Warianty tej treści i tych parametrów już są (np. zdjęcie z deduplikacji)
+        variants = {variant_key(name, fmt): path for (name, fmt), path in paths.items()}
+    else:
+        with photo.image.open('rb') as fp:
+            rendered = render_variants(fp)
+        variants = {
+            variant_key(name, fmt): save_derivative(paths[(name, fmt)], data)
+            for (name, fmt), data in rendered.items()
+        }
+
+    # Stare warianty mogą należeć też do innych zdjęć z tym samym oryginałem
+    stale = set((photo.variants or {}).values()) - set(variants.values())
+    if stale:
+        others = Photo.objects.filter(image=photo.image.name).exclude(pk=photo.pk)
+        delete_files(unshared_paths(stale, others.values_list('variants', flat=True)))
+
+    Photo.objects.filter(pk=photo.pk).update(variants=variants)
+    photo.variants = variants
+    invalidate_location_summary(photo.location_id)
+    return variants
+
+
+def process_photo(photo_id):
+    """Zadanie w tle: warianty dla zdjęcia o danym id (brak zdjęcia/pliku nie jest błędem)."""
+    from .models import Photo
+
+    photo = Photo.objects.filter(pk=photo_id).first()
+    if photo is None or not photo.image:
+        return None
+    try:
+        return build_derivatives(photo)
+    except Exception:
+        logger.exception("Nie udało się wygenerować wariantów zdjęcia %s", photo_id)
+        return None
+
+
+def _run_in_worker(func, *args):
+    try:
+        func(*args)
+    finally:
+        # Wątek puli ma własne połączenie z bazą — nie zostawiamy go otwartego
+        connection.close()
+
+
+def submit_after_commit(func, *args):
+    """
+    Uruchamia ``func(*args)`` w puli wątków po zatwierdzeniu bieżącej transakcji.
+
+    Wspólne dla wariantów zdjęć i awatarów (auth.avatars); z
+    ``CITYFEEL_PHOTO_DERIVATIVES_ASYNC = False`` wykonuje się synchronicznie po commicie.
+    """
+    if getattr(settings, 'CITYFEEL_PHOTO_DERIVATIVES_ASYNC', True):
+        transaction.on_commit(lambda: _get_executor().submit(_run_in_worker, func, *args))
+    else:
+        transaction.on_commit(lambda: func(*args))
+
+
+def schedule(photo_id):
+    """Kolejkuje warianty po zatwierdzeniu bieżącej transakcji."""
+    submit_after_commit(process_photo, photo_id)
+
+
+def delete_files(paths):
+    for path in paths:
+        try:
+            derivative_storage.delete(path)
+        except OSError:
+            logger.warning("Nie udało się usunąć wariantu %s", path)
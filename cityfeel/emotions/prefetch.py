@@ -0,0 +1,55 @@
+"""
+Prefetch „N najnowszych powiązanych obiektów” dla strony rodziców.
+
+Zwykły ``Prefetch('emotion_points', ...)`` ładuje całą historię każdego usera ze
+strony; ``Prefetch`` z wycinkiem (``qs[:n]``) liczy w Django ``ROW_NUMBER() OVER
+(PARTITION BY ...)``, więc i tak skanuje całe historie, a odrzuca nadmiar dopiero
+po numeracji. Tutaj dla każdego rodzica bierzemy skorelowane podzapytanie z LIMIT
+(w PostgreSQL odpowiednik LATERAL):
+
+    SELECT u.id, ARRAY(SELECT ep.id FROM emotions_emotion_point ep
+                       WHERE ep.user_id = u.id AND ...
+                       ORDER BY ep.created_at DESC LIMIT n)
+    FROM auth_user u WHERE u.id IN (...page...)
+
+Przy indeksie (fk, kolumna sortowania) każde podzapytanie to krótki Index Scan,
+więc koszt i pamięć rosną z rozmiarem strony × N, a nie z długością historii.
+Drugie zapytanie pobiera wybrane obiekty (z ``select_related`` z querysetu).
+"""
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db.models import OuterRef
+
+
+def prefetch_top_n(instances, queryset, fk_name, n, to_attr):
+    """
+    Ustawia na każdym obiekcie z ``instances`` listę ``to_attr`` z co najwyżej ``n``
+    obiektami z ``queryset`` (w jego kolejności) powiązanymi przez ``fk_name``.
+
+    Args:
+        instances: obiekty rodziców (np. strona ListView), wszystkie tego samego modelu
+        queryset: przefiltrowany i posortowany queryset dzieci, np.
+            ``EmotionPoint.objects.filter(privacy_status='public').order_by('-created_at')``
+        fk_name: nazwa pola FK dziecka wskazującego rodzica (np. ``'user'``)
+        n: limit na rodzica
+        to_attr: nazwa atrybutu z wynikiem
+    """
+    instances = list(instances)
+    if not instances:
+        return instances
+
+    parent_model = type(instances[0])
+    top_ids = queryset.filter(**{fk_name: OuterRef('pk')}).values('pk')[:n]
+    ids_by_parent = dict(
+        parent_model._base_manager
+        .filter(pk__in=[obj.pk for obj in instances])
+        .annotate(_top_ids=ArraySubquery(top_ids))
+        .values_list('pk', '_top_ids')
+    )
+
+    wanted = [pk for ids in ids_by_parent.values() for pk in ids]
+    objects = queryset.order_by().in_bulk(wanted) if wanted else {}
+
+    for obj in instances:
+        ids = ids_by_parent.get(obj.pk, [])
+        setattr(obj, to_attr, [objects[pk] for pk in ids if pk in objects])
+    return instances
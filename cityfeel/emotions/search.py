@@ -0,0 +1,30 @@
+"""
+Wyszukiwanie pełnotekstowe w treści komentarzy.
+
+``Comment.search_vector`` to kolumna generowana (``to_tsvector('cityfeel_pl', content)``)
+z indeksem GIN ``comment_search_idx``, więc baza utrzymuje ją sama przy każdym zapisie.
+Zapytanie parsujemy jak w wyszukiwarkach (``websearch_to_tsquery``: słowa, "frazy",
+``-wykluczenia``, ``or``) w tej samej konfiguracji, a wyniki sortujemy po ``ts_rank``.
+"""
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F
+
+from .models import SEARCH_CONFIG
+
+
+def comment_search_query(q):
+    return SearchQuery(q, config=SEARCH_CONFIG, search_type='websearch')
+
+
+def search_comments(queryset, q):
+    """
+    Zawęża ``queryset`` komentarzy do pasujących do ``q`` i dokleja ``rank``
+    (sortowanie: najtrafniejsze, potem najnowsze).
+    """
+    query = comment_search_query(q)
+    return (
+        queryset
+        .filter(search_vector=query)
+        .annotate(rank=SearchRank(F('search_vector'), query))
+        .order_by('-rank', '-created_at')
+    )
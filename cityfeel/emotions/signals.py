@@ -1,8 +1,17 @@
-from django.db.models.signals import post_save
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 
-from .models import Comment
+from map.models import Location
+from .models import EmotionPoint, Comment, Photo
+from . import photos
 from . import sentiment as sentiment_service
+from . import stats
+from .storage import content_hash_storage, is_hashed_name, retain_new_files, track_new_files
+from .summary import invalidate_location_summary, invalidate_user_summaries
 
 
 @receiver(post_save, sender=Comment)
@@ -16,3 +25,112 @@ def analyze_comment_sentiment(sender, instance, created, **kwargs):
             sentiment_score=result["score"],
             sentiment_label=result["label"],
         )
+
+
+def _deleting(origin, model):
+    """Czy usunięcie jest kaskadą z usuwanego obiektu ``model`` (wtedy statystyki znikną razem z nim)."""
+    if isinstance(origin, model):
+        return True
+    return isinstance(origin, QuerySet) and origin.model is model
+
+
+def _deleting_location(origin):
+    return _deleting(origin, Location)
+
+
+@receiver(post_save, sender=Location)
+def create_location_stats(sender, instance, created, raw=False, **kwargs):
+    # Każda lokalizacja ma wiersz statystyk — lista lokalizacji łączy się z nim INNER JOIN-em.
+    if created and not raw:
+        stats.refresh_location_stats(instance.pk)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def create_user_stats(sender, instance, created, raw=False, **kwargs):
+    # Jak przy lokalizacji — każdy user ma wiersz liczników (społeczność łączy się z nim INNER JOIN-em).
+    if created and not raw:
+        stats.refresh_user_stats(instance.pk)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_summaries_on_user_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # Podsumowania miejsc mają zapisaną nazwę autora; logowanie (samo last_login) jej nie zmienia
+    if created or raw or (update_fields is not None and set(update_fields) <= {'last_login'}):
+        return
+    invalidate_user_summaries(instance.pk)
+
+
+# Flagę is_latest odświeżamy przed statystykami — obie z niej korzystają
+# (odbiorniki wykonują się w kolejności rejestracji).
+@receiver(post_save, sender=EmotionPoint)
+def refresh_latest_flag_on_save(sender, instance, created, raw=False, **kwargs):
+    # Zmiana istniejącego wpisu nie zmienia kolejności wpisów pary (user, lokalizacja).
+    if created and not raw:
+        stats.refresh_latest_flag(instance.user_id, instance.location_id)
+
+
+@receiver(post_delete, sender=EmotionPoint)
+def refresh_latest_flag_on_delete(sender, instance, origin=None, **kwargs):
+    if not (_deleting(origin, get_user_model()) or _deleting_location(origin)):
+        stats.refresh_latest_flag(instance.user_id, instance.location_id)
+
+
+@receiver(post_save, sender=EmotionPoint)
+def refresh_user_stats_on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        stats.refresh_user_stats(instance.user_id)
+
+
+@receiver(post_delete, sender=EmotionPoint)
+def refresh_user_stats_on_delete(sender, instance, origin=None, **kwargs):
+    if not _deleting(origin, get_user_model()):
+        stats.refresh_user_stats(instance.user_id)
+
+
+@receiver(post_save, sender=EmotionPoint)
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=Photo)
+def refresh_stats_on_save(sender, instance, raw=False, **kwargs):
+    # Fixtures (loaddata, raw=True) pomijamy — po imporcie: manage.py rebuild_aggregates.
+    if raw:
+        return
+    stats.refresh_location_stats(instance.location_id)
+    invalidate_location_summary(instance.location_id)
+
+
+@receiver(post_delete, sender=EmotionPoint)
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=Photo)
+def refresh_stats_on_delete(sender, instance, origin=None, **kwargs):
+    invalidate_location_summary(instance.location_id)
+    if _deleting_location(origin):
+        return
+    stats.refresh_location_stats(instance.location_id)
+
+
+@receiver(pre_save, sender=Photo)
+def track_new_photo_file(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        track_new_files(instance, ['image'], update_fields)
+
+
+@receiver(post_save, sender=Photo)
+def retain_new_photo_file(sender, instance, **kwargs):
+    # Referencję liczymy razem z wierszem — wycofana transakcja nie zostawia jej w StoredFile
+    retain_new_files(instance)
+
+
+@receiver(post_save, sender=Photo)
+def schedule_photo_derivatives(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and instance.image:
+        photos.schedule(instance.pk)
+
+
+@receiver(post_delete, sender=Photo)
+def release_photo_files(sender, instance, **kwargs):
+    # Ta sama treść może należeć do kilku zdjęć (deduplikacja) — pliki, w tym warianty,
+    # usuwamy dopiero z ostatnią referencją. Zdjęcia sprzed deduplikacji nie mają licznika.
+    released = content_hash_storage.release(instance.image.name)
+    paths = list((instance.variants or {}).values())
+    if paths and (released or not is_hashed_name(instance.image.name)):
+        transaction.on_commit(lambda: photos.delete_files(paths))
@@ -0,0 +1,242 @@
+"""
+Utrzymanie zdenormalizowanych statystyk (``LocationStats``, ``UserStats``).
+
+Statystyki lokalizacji liczymy w SQL — każda miara we własnym podzapytaniu, bez JOIN
+punkty × komentarze × zdjęcia (który mnożyłby wiersze przed agregacją):
+
+- ``refresh_location_stats(ids)`` — skorelowane podzapytania dla kilku lokalizacji;
+  wołane z sygnałów po każdym zapisie/usunięciu EmotionPoint, Comment lub Photo.
+  Każde podzapytanie to Index Scan po ``location_id``.
+- ``rebuild_location_stats()`` — pełne przeliczenie z pre-agregowanych podzapytań
+  (GROUP BY location_id); używane po masowych importach (``bulk_create`` / ``COPY``
+  omijają sygnały) i w komendzie ``rebuild_aggregates``.
+
+Oba warianty robią UPSERT (``ON CONFLICT (location_id) DO UPDATE``), więc są idempotentne.
+
+``UserStats`` utrzymujemy tak samo (``refresh_user_stats`` / ``rebuild_user_stats``);
+odświeżane są przy zapisie/usunięciu EmotionPoint, a podzapytania idą po częściowym
+indeksie najnowszych wpisów (``WHERE is_latest``) i po (user_id, created_at).
+
+Flaga ``EmotionPoint.is_latest`` (najnowszy wpis usera w lokalizacji) to podstawa
+„stanu bieżącego” w obu statystykach, więc przy zmianach odświeżamy ją najpierw
+(``refresh_latest_flag`` dla jednej pary, ``rebuild_latest_flags`` po imporcie).
+
+Treści ukryte przez moderację (``is_hidden``) nie liczą się nigdzie: nie dostają flagi
+``is_latest``, a liczniki historii, komentarzy i zdjęć idą po częściowych indeksach
+``WHERE NOT is_hidden``.
+"""
+from django.db import connection, transaction
+
+
+# Aktualizujemy tylko wiersze, których flaga się zmienia (poprzedni najnowszy
+# i nowy najnowszy), więc przy INSERT to co najwyżej dwa wiersze. Wpisy ukryte przez
+# moderację nie mogą być najnowsze — gdy ukryte są wszystkie, para nie ma flagi wcale.
+_LATEST_FLAG_SQL = """
+    WITH latest AS (
+        SELECT e.id
+        FROM emotions_emotion_point e
+        WHERE e.user_id = %(user)s AND e.location_id = %(location)s AND NOT e.is_hidden
+        ORDER BY e.created_at DESC, e.id DESC
+        LIMIT 1
+    )
+    UPDATE emotions_emotion_point e
+    SET is_latest = NOT e.is_latest
+    WHERE e.user_id = %(user)s AND e.location_id = %(location)s
+      AND e.is_latest <> (e.id IN (SELECT id FROM latest))
+"""
+
+
+_REBUILD_LATEST_FLAGS_SQL = """
+    WITH latest AS (
+        SELECT DISTINCT ON (e.user_id, e.location_id) e.id
+        FROM emotions_emotion_point e
+        WHERE NOT e.is_hidden
+        ORDER BY e.user_id, e.location_id, e.created_at DESC, e.id DESC
+    )
+    UPDATE emotions_emotion_point e
+    SET is_latest = NOT e.is_latest
+    WHERE e.is_latest <> (e.id IN (SELECT id FROM latest))
+"""
+
+
+def refresh_latest_flag(user_id, location_id):
+    """Ustawia ``is_latest`` na najnowszym wpisie pary (user, lokalizacja), a zdejmuje z pozostałych."""
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Dwa równoległe wpisy tej samej pary nie mogą zostawić dwóch flag: blokada na
+        # czas transakcji szereguje odświeżenia (kolizje klucza tylko niepotrzebnie czekają).
+        cursor.execute(
+            "SELECT pg_advisory_xact_lock((%(user)s::bigint << 32) # %(location)s::bigint)",
+            {'user': user_id, 'location': location_id},
+        )
+        cursor.execute(_LATEST_FLAG_SQL, {'user': user_id, 'location': location_id})
+
+
+def rebuild_latest_flags():
+    """Przelicza ``is_latest`` dla całej tabeli. Zwraca liczbę zmienionych wierszy."""
+    with connection.cursor() as cursor:
+        cursor.execute(_REBUILD_LATEST_FLAGS_SQL)
+        return cursor.rowcount
+
+
+_UPSERT_SQL = """
+    INSERT INTO emotions_location_stats (
+        location_id, avg_emotional_value, voters_count, emotion_points_count,
+        comments_count, photos_count, last_activity, updated_at
+    )
+    {select}
+    ON CONFLICT (location_id) DO UPDATE SET
+        avg_emotional_value = EXCLUDED.avg_emotional_value,
+        voters_count = EXCLUDED.voters_count,
+        emotion_points_count = EXCLUDED.emotion_points_count,
+        comments_count = EXCLUDED.comments_count,
+        photos_count = EXCLUDED.photos_count,
+        last_activity = EXCLUDED.last_activity,
+        updated_at = EXCLUDED.updated_at
+"""
+
+
+_CORRELATED_SELECT_SQL = """
+    SELECT
+        l.id,
+        (SELECT AVG(e.emotional_value) FROM emotions_emotion_point e WHERE e.location_id = l.id AND e.is_latest),
+        (SELECT COUNT(*) FROM emotions_emotion_point e WHERE e.location_id = l.id AND e.is_latest),
+        (SELECT COUNT(*) FROM emotions_emotion_point e WHERE e.location_id = l.id AND NOT e.is_hidden),
+        (SELECT COUNT(*) FROM emotions_comment c WHERE c.location_id = l.id AND NOT c.is_hidden),
+        (SELECT COUNT(*) FROM emotions_photo p WHERE p.location_id = l.id AND NOT p.is_hidden),
+        (SELECT MAX(e.created_at) FROM emotions_emotion_point e WHERE e.location_id = l.id AND NOT e.is_hidden),
+        NOW()
+    FROM map_location l
+    WHERE l.id = ANY(%s)
+"""
+
+
+_PREAGGREGATED_SELECT_SQL = """
+    WITH points AS (
+        SELECT e.location_id,
+               COUNT(*) AS points_count,
+               MAX(e.created_at) AS last_activity
+        FROM emotions_emotion_point e
+        WHERE NOT e.is_hidden
+        GROUP BY e.location_id
+    ),
+    latest AS (
+        SELECT e.location_id, AVG(e.emotional_value) AS avg_value, COUNT(*) AS voters_count
+        FROM emotions_emotion_point e
+        WHERE e.is_latest
+        GROUP BY e.location_id
+    ),
+    comments AS (
+        SELECT c.location_id, COUNT(*) AS comments_count
+        FROM emotions_comment c
+        WHERE NOT c.is_hidden
+        GROUP BY c.location_id
+    ),
+    photos AS (
+        SELECT p.location_id, COUNT(*) AS photos_count
+        FROM emotions_photo p
+        WHERE NOT p.is_hidden
+        GROUP BY p.location_id
+    )
+    SELECT
+        l.id,
+        latest.avg_value,
+        COALESCE(latest.voters_count, 0),
+        COALESCE(points.points_count, 0),
+        COALESCE(comments.comments_count, 0),
+        COALESCE(photos.photos_count, 0),
+        points.last_activity,
+        NOW()
+    FROM map_location l
+    LEFT JOIN points ON points.location_id = l.id
+    LEFT JOIN latest ON latest.location_id = l.id
+    LEFT JOIN comments ON comments.location_id = l.id
+    LEFT JOIN photos ON photos.location_id = l.id
+"""
+
+
+def refresh_location_stats(location_ids):
+    """Przelicza ``LocationStats`` dla podanych lokalizacji (lista lub pojedyncze id)."""
+    if isinstance(location_ids, int):
+        location_ids = [location_ids]
+    location_ids = [pk for pk in set(location_ids) if pk is not None]
+    if not location_ids:
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(_UPSERT_SQL.format(select=_CORRELATED_SELECT_SQL), [location_ids])
+
+
+def rebuild_location_stats():
+    """Przelicza ``LocationStats`` dla wszystkich lokalizacji. Zwraca liczbę wierszy."""
+    with connection.cursor() as cursor:
+        cursor.execute(_UPSERT_SQL.format(select=_PREAGGREGATED_SELECT_SQL))
+        return cursor.rowcount
+
+
+_USER_UPSERT_SQL = """
+    INSERT INTO emotions_user_stats (
+        user_id, locations_count, public_count, private_count, last_activity, updated_at
+    )
+    {select}
+    ON CONFLICT (user_id) DO UPDATE SET
+        locations_count = EXCLUDED.locations_count,
+        public_count = EXCLUDED.public_count,
+        private_count = EXCLUDED.private_count,
+        last_activity = EXCLUDED.last_activity,
+        updated_at = EXCLUDED.updated_at
+"""
+
+
+# Najnowszy wpis usera w każdej lokalizacji decyduje o tym, czy ocena jest publiczna czy prywatna
+_USER_SELECT_SQL = """
+    WITH counts AS (
+        SELECT e.user_id,
+               COUNT(*) AS locations_count,
+               COUNT(*) FILTER (WHERE e.privacy_status = 'public') AS public_count,
+               COUNT(*) FILTER (WHERE e.privacy_status = 'private') AS private_count
+        FROM emotions_emotion_point e
+        WHERE e.is_latest {and_where}
+        GROUP BY e.user_id
+    ),
+    activity AS (
+        SELECT e.user_id, MAX(e.created_at) AS last_activity
+        FROM emotions_emotion_point e
+        WHERE NOT e.is_hidden {and_where}
+        GROUP BY e.user_id
+    )
+    SELECT
+        u.id,
+        COALESCE(counts.locations_count, 0),
+        COALESCE(counts.public_count, 0),
+        COALESCE(counts.private_count, 0),
+        activity.last_activity,
+        NOW()
+    FROM auth_user u
+    LEFT JOIN counts ON counts.user_id = u.id
+    LEFT JOIN activity ON activity.user_id = u.id
+    {user_where}
+"""
+
+
+def refresh_user_stats(user_ids):
+    """Przelicza ``UserStats`` dla podanych użytkowników (lista lub pojedyncze id)."""
+    if isinstance(user_ids, int):
+        user_ids = [user_ids]
+    user_ids = [pk for pk in set(user_ids) if pk is not None]
+    if not user_ids:
+        return
+
+    select = _USER_SELECT_SQL.format(
+        and_where="AND e.user_id = ANY(%(ids)s)",
+        user_where="WHERE u.id = ANY(%(ids)s)",
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(_USER_UPSERT_SQL.format(select=select), {'ids': user_ids})
+
+
+def rebuild_user_stats():
+    """Przelicza ``UserStats`` dla wszystkich użytkowników. Zwraca liczbę wierszy."""
+    select = _USER_SELECT_SQL.format(and_where='', user_where='')
+    with connection.cursor() as cursor:
+        cursor.execute(_USER_UPSERT_SQL.format(select=select))
+        return cursor.rowcount
@@ -0,0 +1,131 @@
+"""
+Storage plików mediów adresowany treścią (zdjęcia lokalizacji, awatary).
+
+Plik zapisujemy pod nazwą z SHA-256 treści: ``<katalog>/<ab>/<sha256><ext>``, gdzie
+``<katalog>`` to pierwszy człon ścieżki z ``upload_to`` (``location_photos``, ``avatars``).
+Dzięki temu:
+
+- identyczne pliki zajmują miejsce raz — drugi upload tej samej treści dostaje
+  istniejącą nazwę, a licznik referencji (``StoredFile.refcount``) rośnie o 1
+  (``retain``, w post_save rekordu — wycofany zapis wiersza nie zostawia referencji),
+- URL zmienia się razem z treścią, więc może być cache'owany bez końca
+  (``Cache-Control: immutable`` — patrz ``emotions.views.serve_media``).
+
+Plik znika dopiero, gdy licznik spadnie do zera (``release``) — wołają to sygnały
+usunięcia zdjęcia i zmiany/usunięcia awatara. Pliki sprzed wdrożenia (nazwy
+nieadresowane treścią, bez wiersza StoredFile) nie są usuwane, jak dotąd.
+"""
+import hashlib
+import os
+import re
+
+from django.core.files.storage import FileSystemStorage
+from django.db import connection, transaction
+
+# <ab>/<sha256>.ext oraz warianty: <ab>/derivatives/<sha256>.<odcisk parametrów>.thumb.webp (emotions.photos)
+HASHED_NAME_RE = re.compile(r'(^|/)[0-9a-f]{2}/(derivatives/)?[0-9a-f]{64}(\.[a-z0-9]+)*$')
+
+_INCREF_SQL = """
+INSERT INTO emotions_stored_file (name, size, refcount, created_at)
+VALUES (%s, %s, 1, NOW())
+ON CONFLICT (name) DO UPDATE SET refcount = emotions_stored_file.refcount + 1
+"""
+
+_DECREF_SQL = """
+UPDATE emotions_stored_file SET refcount = refcount - 1
+WHERE name = %s AND refcount > 0
+RETURNING refcount
+"""
+
+
+def content_hash(content):
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_hashed_name(name):
+    return bool(name) and HASHED_NAME_RE.search(name) is not None
+
+
+class ContentHashStorage(FileSystemStorage):
+    """FileSystemStorage z nazwami z hasha treści, deduplikacją i licznikiem referencji."""
+
+    def __init__(self, **kwargs):
+        # Nadpisanie pliku o tej samej nazwie = zapis tej samej treści — bezpieczne
+        kwargs.setdefault('allow_overwrite', True)
+        super().__init__(**kwargs)
+
+    def hashed_name(self, name, content):
+        directory = name.split('/', 1)[0] if '/' in name else ''
+        ext = os.path.splitext(name)[1].lower()
+        digest = content_hash(content)
+        hashed = f'{digest[:2]}/{digest}{ext}'
+        return f'{directory}/{hashed}' if directory else hashed
+
+    def _save(self, name, content):
+        name = self.hashed_name(name, content)
+        if not self.exists(name):
+            name = super()._save(name, content)
+        return name
+
+    def retain(self, name):
+        """Zwiększa licznik referencji pliku — woła post_save rekordu, w jego transakcji."""
+        with connection.cursor() as cursor:
+            cursor.execute(_INCREF_SQL, [name, self.size(name)])
+
+    def release(self, name):
+        """
+        Zmniejsza licznik referencji pliku; przy zerze usuwa wiersz i (po commicie) plik.
+
+        Returns:
+            bool: True, jeśli była to ostatnia referencja.
+        """
+        if not name:
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute(_DECREF_SQL, [name])
+            row = cursor.fetchone()
+            if row is None or row[0] > 0:
+                return False
+            cursor.execute("DELETE FROM emotions_stored_file WHERE name = %s AND refcount = 0", [name])
+
+        def delete_file():
+            from .models import StoredFile
+
+            # Ta sama treść mogła zostać wgrana ponownie między commitem a tym callbackiem
+            if not StoredFile.objects.filter(name=name).exists():
+                self.delete(name)
+
+        transaction.on_commit(delete_file)
+        return True
+
+
+content_hash_storage = ContentHashStorage()
+
+
+def track_new_files(instance, fields, update_fields=None):
+    """
+    pre_save: zapamiętuje pola z nowym plikiem (jeszcze niezapisanym w storage).
+
+    Plik trafia do storage w trakcie zapisu wiersza, licznik referencji — dopiero
+    w post_save (``retain_new_files``), czyli w tej samej transakcji co wiersz.
+    """
+    instance._new_stored_files = [
+        field for field in fields
+        if (update_fields is None or field in update_fields)
+        and getattr(instance, field) and not getattr(instance, field)._committed
+    ]
+
+
+def retain_new_files(instance):
+    """post_save: liczy referencje plików zapamiętanych przez ``track_new_files``."""
+    for field in getattr(instance, '_new_stored_files', ()):
+        content_hash_storage.retain(getattr(instance, field).name)
+    instance._new_stored_files = []
+
+
+def get_content_hash_storage():
+    """Callable dla ``FileField(storage=...)`` — migracje zapisują referencję, nie instancję."""
+    return content_hash_storage
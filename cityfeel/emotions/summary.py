@@ -0,0 +1,150 @@
+"""
+Podsumowanie lokalizacji dla strony szczegółów (``LocationDetailView``).
+
+Strona pokazuje średnią, rozkład ocen, liczniki, oceny użytkowników, komentarze i zdjęcia.
+Zamiast kilku agregacji przy każdym wyświetleniu składamy to raz do słownika i trzymamy
+w cache (read-through). Sygnały zapisu/usunięcia EmotionPoint, Comment i Photo danej
+lokalizacji usuwają wpis (``invalidate_location_summary``), więc gorąca strona to
+zapytanie o samą lokalizację + odczyt z cache. W cache są tylko proste wartości
+(``values()``), a nie instancje modeli z całymi wierszami autorów; zmiana konta
+użytkownika (np. nazwy) usuwa podsumowania miejsc, w których coś dodał.
+
+Średnia i rozkład liczone są z najnowszego głosu każdego użytkownika — tak samo jak
+średnia miejsca na mapie (tryb A w ``api.aggregation``) i w ``LocationStats``.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import EmotionPoint, Comment, Photo, LocationStats
+
+
+SUMMARY_CACHE_TIMEOUT = 60 * 10
+TOP_RATINGS_LIMIT = 50
+
+# W cache trzymamy tylko pola potrzebne szablonowi (bez haseł, e-maili itp. autorów)
+RATING_FIELDS = ('id', 'user_id', 'user__username', 'emotional_value', 'privacy_status', 'created_at')
+COMMENT_FIELDS = (
+    'id', 'user_id', 'user__username', 'privacy_status', 'content', 'created_at',
+    'sentiment_label', 'sentiment_score',
+)
+PHOTO_FIELDS = ('id', 'user_id', 'user__username', 'privacy_status', 'caption', 'created_at', 'image', 'variants')
+
+
+def _cache_key(location_id):
+    return f'location_summary_v2_{location_id}'
+
+
+def build_location_summary(location_id):
+    """Podsumowanie jako słownik prostych wartości (listy słowników z ``values()``) — do cache."""
+    # Najnowszy głos każdego usera (flaga is_latest, częściowy indeks emotions_latest_loc_idx)
+    latest = EmotionPoint.objects.filter(location_id=location_id, is_latest=True)
+
+    distribution = list(
+        latest
+        .values('emotional_value')
+        .annotate(count=Count('id'))
+        .order_by('emotional_value')
+    )
+    voters_count = sum(d['count'] for d in distribution)
+    avg_emotional_value = (
+        sum(d['emotional_value'] * d['count'] for d in distribution) / voters_count
+        if voters_count else None
+    )
+
+    ratings = list(latest.order_by('-created_at').values(*RATING_FIELDS)[:TOP_RATINGS_LIMIT])
+    # Pierwszy komentarz do każdej oceny (jak ``related_comments.first()``)
+    rating_comments = {}
+    for row in (
+        Comment.objects
+        .filter(emotion_point_id__in=[r['id'] for r in ratings], is_hidden=False)
+        .order_by('pk')
+        .values('emotion_point_id', 'content')
+    ):
+        rating_comments.setdefault(row['emotion_point_id'], row['content'])
+    for rating in ratings:
+        rating['comment'] = rating_comments.get(rating['id'])
+
+    comments = list(
+        Comment.objects
+        .filter(location_id=location_id, emotion_point__isnull=True, is_hidden=False)
+        .order_by('-created_at')
+        .values(*COMMENT_FIELDS)
+    )
+    photos = list(
+        Photo.objects
+        .filter(location_id=location_id, is_hidden=False)
+        .order_by('-created_at')
+        .values(*PHOTO_FIELDS)
+    )
+
+    counts = (
+        LocationStats.objects
+        .filter(location_id=location_id)
+        .values('emotion_points_count', 'comments_count', 'photos_count')
+        .first()
+    ) or {'emotion_points_count': 0, 'comments_count': 0, 'photos_count': 0}
+
+    return {
+        'avg_emotional_value': avg_emotional_value,
+        'voters_count': voters_count,
+        'distribution': distribution,
+        'ratings': ratings,
+        'comments': comments,
+        'photos': photos,
+        **counts,
+    }
+
+
+def _author(row):
+    if row['user_id'] is None:
+        return None
+    return get_user_model()(id=row['user_id'], username=row['user__username'])
+
+
+def _hydrate(model, row, location_id):
+    """Lekka instancja modelu z wiersza cache (bez zapytań) — dla szablonu i porównań po pk."""
+    fields = {k: v for k, v in row.items() if k not in ('user__username', 'comment')}
+    instance = model(location_id=location_id, **fields)
+    instance.user = _author(row)
+    return instance
+
+
+def get_location_summary(location_id):
+    """
+    Podsumowanie z cache; przy braku — liczy i zapisuje (read-through). Oceny, komentarze
+    i zdjęcia zwracamy jako instancje modeli odtworzone z zapisanych wartości; ocena ma
+    ``existing_comment`` (pierwszy komentarz do niej albo None).
+    """
+    key = _cache_key(location_id)
+    summary = cache.get(key)
+    if summary is None:
+        summary = build_location_summary(location_id)
+        cache.set(key, summary, SUMMARY_CACHE_TIMEOUT)
+
+    ratings = []
+    for row in summary['ratings']:
+        rating = _hydrate(EmotionPoint, row, location_id)
+        rating.existing_comment = Comment(content=row['comment']) if row['comment'] is not None else None
+        ratings.append(rating)
+    return {
+        **summary,
+        'ratings': ratings,
+        'comments': [_hydrate(Comment, row, location_id) for row in summary['comments']],
+        'photos': [_hydrate(Photo, row, location_id) for row in summary['photos']],
+    }
+
+
+def invalidate_location_summary(location_id):
+    if location_id is not None:
+        cache.delete(_cache_key(location_id))
+
+
+def invalidate_user_summaries(user_id):
+    """Usuwa podsumowania miejsc, w których użytkownik ma oceny, komentarze lub zdjęcia (zmiana autora)."""
+    location_ids = set(
+        EmotionPoint.objects.filter(user_id=user_id, is_latest=True).values_list('location_id', flat=True)
+    )
+    location_ids.update(Comment.objects.filter(user_id=user_id).values_list('location_id', flat=True))
+    location_ids.update(Photo.objects.filter(user_id=user_id).values_list('location_id', flat=True))
+    cache.delete_many([_cache_key(location_id) for location_id in location_ids if location_id is not None])
@@ -0,0 +1,44 @@
+"""
+Testy benchmarku API (emotions.benchmark).
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.test import TestCase
+
+from emotions import benchmark
+from emotions.models import EmotionPoint
+from map.models import Location
+
+User = get_user_model()
+
+
+class BenchmarkTestCase(TestCase):
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(benchmark.percentile(values, 50), 50)
+        self.assertEqual(benchmark.percentile(values, 99), 99)
+        self.assertEqual(benchmark.percentile([7], 95), 7)
+
+    def test_run_reports_latency_queries_and_rows(self):
+        alice = User.objects.create_user(username='alice', password='pass')
+        park = Location.objects.create(name='Park', coordinates=Point(18.6, 54.35, srid=4326))
+        EmotionPoint.objects.create(user=alice, location=park, emotional_value=4)
+
+        results = benchmark.run(alice, iterations=3, warmup=1, only='nearby')
+
+        self.assertEqual([r['scenario'] for r in results], ['nearby/radius=50', 'nearby/radius=500'])
+        for result in results:
+            self.assertEqual(result['status_codes'], {'200': 3})
+            self.assertEqual(result['rows_median'], 1)
+            self.assertGreaterEqual(result['queries_max'], 1)
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+
+    def test_compare_with_baseline(self):
+        def report(p95):
+            return {'scales': [{'scale': '10k', 'results': [
+                {'scenario': 'nearby/radius=50', 'p50_ms': 1.0, 'p95_ms': p95},
+            ]}]}
+
+        rows = benchmark.compare(report(3.0), report(2.0))
+        self.assertEqual(rows, [('10k', 'nearby/radius=50', 1.0, 1.0, 2.0, 3.0, 1.5)])
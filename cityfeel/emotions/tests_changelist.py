@@ -0,0 +1,67 @@
+"""
+Testy list w adminie dla dużych tabel (emotions.changelist).
+"""
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from emotions.changelist import EstimatedCountPaginator, estimated_query_count
+from emotions.models import Comment, EmotionPoint
+from map.models import Location
+
+User = get_user_model()
+
+
+class AdminChangelistTestCase(TestCase):
+    url = '/admin/emotions/emotionpoint/'
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='pass', email='a@a.pl')
+        self.alice = User.objects.create_user(username='alice', password='pass')
+        self.bob = User.objects.create_user(username='bob', password='pass')
+        self.park = Location.objects.create(name='Park Oliwski', coordinates=Point(18.56, 54.41, srid=4326))
+        self.port = Location.objects.create(name='Port', coordinates=Point(18.66, 54.40, srid=4326))
+
+        self.march = EmotionPoint.objects.create(user=self.alice, location=self.park, emotional_value=4)
+        self.april = EmotionPoint.objects.create(user=self.bob, location=self.port, emotional_value=2)
+        EmotionPoint.objects.filter(pk=self.march.pk).update(
+            created_at=timezone.make_aware(datetime.datetime(2025, 3, 14, 12)))
+        EmotionPoint.objects.filter(pk=self.april.pk).update(
+            created_at=timezone.make_aware(datetime.datetime(2025, 4, 2, 12)))
+        self.client.login(username='admin', password='pass')
+
+    def _ids(self, params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return {obj.pk for obj in response.context['cl'].result_list}
+
+    def test_date_drilldown(self):
+        self.assertEqual(self._ids({'created': '2025'}), {self.march.pk, self.april.pk})
+        self.assertEqual(self._ids({'created': '2025-03'}), {self.march.pk})
+        self.assertEqual(self._ids({'created': '2025-04-02'}), {self.april.pk})
+        self.assertEqual(self._ids({'created': 'nie-data'}), {self.march.pk, self.april.pk})
+
+    def test_search_by_user_or_location(self):
+        self.assertEqual(self._ids({'q': 'alic'}), {self.march.pk})
+        self.assertEqual(self._ids({'q': 'oliw'}), {self.march.pk})
+
+    def test_location_filter(self):
+        self.assertEqual(self._ids({'location': self.port.pk}), {self.april.pk})
+
+    def test_comment_changelist(self):
+        Comment.objects.create(user=self.alice, location=self.park, content='Piękne drzewa')
+        response = self.client.get('/admin/emotions/comment/', {'q': 'drzewa'})
+        self.assertEqual(len(response.context['cl'].result_list), 1)
+
+    def test_paginator_exact_below_threshold(self):
+        paginator = EstimatedCountPaginator(EmotionPoint.objects.order_by('-created_at'), 100)
+        self.assertEqual(paginator.count, 2)
+
+    @override_settings(CITYFEEL_ADMIN_ESTIMATED_COUNT_THRESHOLD=0)
+    def test_paginator_uses_planner_estimate(self):
+        queryset = EmotionPoint.objects.filter(emotional_value__gte=1)
+        paginator = EstimatedCountPaginator(queryset, 100)
+        self.assertEqual(paginator.count, estimated_query_count(queryset))
@@ -0,0 +1,65 @@
+"""
+Testy flagi EmotionPoint.is_latest (najnowszy wpis usera w lokalizacji).
+"""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from emotions.models import EmotionPoint
+from map.models import Location
+
+User = get_user_model()
+
+
+class LatestFlagTestCase(TestCase):
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='testpass123')
+        self.bob = User.objects.create_user(username='bob', password='testpass123')
+        self.park = Location.objects.create(name='Park', coordinates=Point(18.6, 54.35, srid=4326))
+        self.plac = Location.objects.create(name='Plac', coordinates=Point(18.7, 54.36, srid=4326))
+
+    def _latest_ids(self):
+        return set(EmotionPoint.objects.filter(is_latest=True).values_list('id', flat=True))
+
+    def test_new_entry_takes_over_flag(self):
+        first = EmotionPoint.objects.create(user=self.alice, location=self.park, emotional_value=2)
+        self.assertEqual(self._latest_ids(), {first.id})
+
+        second = EmotionPoint.objects.create(user=self.alice, location=self.park, emotional_value=4)
+        other_user = EmotionPoint.objects.create(user=self.bob, location=self.park, emotional_value=1)
+        other_location = EmotionPoint.objects.create(user=self.alice, location=self.plac, emotional_value=5)
+
+        self.assertEqual(self._latest_ids(), {second.id, other_user.id, other_location.id})
+
+    def test_deleting_latest_restores_previous(self):
+        first = EmotionPoint.objects.create(user=self.alice, location=self.park, emotional_value=2)
+        second = EmotionPoint.objects.create(user=self.alice, location=self.park, emotional_value=4)
+
+        second.delete()
+        self.assertEqual(self._latest_ids(), {first.id})
+
+    def test_rebuild_after_bulk_create(self):
+        EmotionPoint.objects.bulk_create([
+            EmotionPoint(user=self.alice, location=self.park, emotional_value=1),
+            EmotionPoint(user=self.alice, location=self.plac, emotional_value=3),
+        ])
+        self.assertEqual(self._latest_ids(), set())
+
+        call_command('rebuild_aggregates', stdout=StringIO())
+        self.assertEqual(len(self._latest_ids()), 2)
+
+    def test_current_state_reads_flag(self):
+        EmotionPoint.objects.create(user=self.alice, location=self.park, emotional_value=1)
+        EmotionPoint.objects.create(user=self.alice, location=self.park, emotional_value=5)
+        EmotionPoint.objects.create(user=self.bob, location=self.park, emotional_value=3)
+
+        self.assertAlmostEqual(self.park.stats.avg_emotional_value, 4.0)
+
+        self.client.login(username='bob', password='testpass123')
+        response = self.client.get(reverse('cf_auth:profile', kwargs={'user_id': self.alice.pk}))
+        self.assertEqual([ep.emotional_value for ep in response.context['recent_emotions']], [5])
@@ -0,0 +1,95 @@
+"""
+Testy szybkiego importu przez COPY (emotions.bulk_load, komenda load_dataset).
+"""
+import io
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from emotions import bulk_load
+from emotions.models import EmotionPoint, LocationStats, UserStats
+from map.models import Location
+
+User = get_user_model()
+
+
+class CsvSplitTestCase(SimpleTestCase):
+
+    def setUp(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write('user_id,location_id,emotional_value\n')
+            for i in range(1, 12):
+                f.write(f'{i},{i * 100},{i % 5 + 1}\n')
+        self.addCleanup(os.remove, f.name)
+        self.path = f.name
+        self.size = os.path.getsize(f.name)
+
+    def test_byte_ranges_cover_every_row_once(self):
+        expected = [
+            {'user_id': str(i), 'location_id': str(i * 100), 'emotional_value': str(i % 5 + 1)}
+            for i in range(1, 12)
+        ]
+        for workers in (1, 2, 3, 5, 8, 40, self.size):
+            step = -(-self.size // workers)
+            rows = [
+                row
+                for start in range(0, self.size, step)
+                for row in bulk_load._csv_byte_range(self.path, start, min(start + step, self.size))
+            ]
+            self.assertEqual(rows, expected, f'workers={workers}')
+
+    def test_point_sources_split_rows(self):
+        rows = [
+            row[:3]
+            for source in bulk_load.point_csv_sources(self.path, 4)
+            for row in source()
+        ]
+        self.assertEqual(rows, [(i, i * 100, i % 5 + 1) for i in range(1, 12)])
+
+
+class LoadDatasetTestCase(TestCase):
+
+    def _indexes(self):
+        return {
+            table: bulk_load.secondary_indexes(table)
+            for table in ('auth_user', 'map_location', 'emotions_emotion_point')
+        }
+
+    def test_generated_load(self):
+        indexes_before = self._indexes()
+        call_command('load_dataset', users=20, locations=10, points=300, seed=7, stdout=io.StringIO())
+
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(Location.objects.count(), 10)
+        self.assertEqual(EmotionPoint.objects.count(), 300)
+        self.assertEqual(self._indexes(), indexes_before)
+        self.assertFalse(os.path.exists(bulk_load.index_recovery_path()))
+
+        pairs = EmotionPoint.objects.values('user_id', 'location_id').distinct().count()
+        self.assertEqual(EmotionPoint.objects.filter(is_latest=True).count(), pairs)
+        self.assertEqual(LocationStats.objects.count(), 10)
+        self.assertEqual(
+            sum(LocationStats.objects.values_list('emotion_points_count', flat=True)), 300
+        )
+        self.assertTrue(UserStats.objects.exists())
+        self.assertTrue(User.objects.first().check_password(bulk_load.DEFAULT_PASSWORD))
+
+    def test_points_from_csv(self):
+        alice = User.objects.create_user(username='alice', password='pass')
+        park = Location.objects.create(name='Park', coordinates=Point(18.6, 54.35, srid=4326))
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write('user_id,location_id,emotional_value,created_at\n')
+            f.write(f'{alice.pk},{park.pk},2,2025-01-01T10:00:00+00:00\n')
+            f.write(f'{alice.pk},{park.pk},5,2025-02-01T10:00:00+00:00\n')
+        self.addCleanup(os.remove, f.name)
+
+        loaded = bulk_load.load(points_csv=f.name)
+
+        self.assertEqual(loaded, {'points': 2})
+        latest = EmotionPoint.objects.get(is_latest=True)
+        self.assertEqual(latest.emotional_value, 5)
+        self.assertAlmostEqual(float(LocationStats.objects.get(location=park).avg_emotional_value), 5.0)
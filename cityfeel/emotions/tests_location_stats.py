@@ -0,0 +1,130 @@
+"""
+Testy zdenormalizowanych statystyk lokalizacji (LocationStats) i listy lokalizacji,
+która sortuje/filtruje po nich zamiast agregować JOIN punkty × komentarze × zdjęcia.
+"""
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from emotions.models import EmotionPoint, Comment, Photo, LocationStats
+from map.models import Location
+
+User = get_user_model()
+
+
+class LocationStatsMaintenanceTestCase(TestCase):
+    """Sygnały utrzymują LocationStats w zgodzie z danymi."""
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='x')
+        self.bob = User.objects.create_user(username='bob', password='x')
+        self.location = Location.objects.create(
+            name='Plac', coordinates=Point(18.6, 54.35, srid=4326)
+        )
+
+    def _stats(self):
+        return LocationStats.objects.get(location=self.location)
+
+    def test_new_location_gets_empty_stats_row(self):
+        stats = self._stats()
+        self.assertIsNone(stats.avg_emotional_value)
+        self.assertEqual(stats.emotion_points_count, 0)
+        self.assertIsNone(stats.last_activity)
+
+    def test_avg_uses_latest_vote_per_user(self):
+        EmotionPoint.objects.create(user=self.alice, location=self.location, emotional_value=1)
+        EmotionPoint.objects.create(user=self.alice, location=self.location, emotional_value=5)
+        latest_bob = EmotionPoint.objects.create(user=self.bob, location=self.location, emotional_value=3)
+
+        stats = self._stats()
+        # latest per user: alice 5, bob 3 → 4.0; historia: 3 wpisy
+        self.assertAlmostEqual(stats.avg_emotional_value, 4.0)
+        self.assertEqual(stats.voters_count, 2)
+        self.assertEqual(stats.emotion_points_count, 3)
+        self.assertEqual(stats.last_activity, latest_bob.created_at)
+
+    def test_comments_and_photos_counted_independently(self):
+        ep = EmotionPoint.objects.create(user=self.alice, location=self.location, emotional_value=4)
+        Comment.objects.create(user=self.alice, location=self.location, emotion_point=ep, content='A')
+        Comment.objects.create(user=self.bob, location=self.location, content='B')
+        Photo.objects.create(user=self.alice, location=self.location, image='a.jpg')
+
+        stats = self._stats()
+        self.assertEqual(stats.emotion_points_count, 1)
+        self.assertEqual(stats.comments_count, 2)
+        self.assertEqual(stats.photos_count, 1)
+
+    def test_delete_updates_stats(self):
+        ep = EmotionPoint.objects.create(user=self.alice, location=self.location, emotional_value=2)
+        ep.delete()
+
+        stats = self._stats()
+        self.assertIsNone(stats.avg_emotional_value)
+        self.assertEqual(stats.emotion_points_count, 0)
+
+    def test_deleting_location_removes_stats(self):
+        EmotionPoint.objects.create(user=self.alice, location=self.location, emotional_value=2)
+        self.location.delete()
+        self.assertFalse(LocationStats.objects.exists())
+
+    def test_rebuild_command_fixes_stale_stats(self):
+        ep = EmotionPoint.objects.create(user=self.alice, location=self.location, emotional_value=2)
+        # QuerySet.update omija sygnały — statystyki są nieaktualne aż do przebudowy.
+        past = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+        EmotionPoint.objects.filter(pk=ep.pk).update(created_at=past, emotional_value=5)
+        LocationStats.objects.all().delete()
+
+        call_command('rebuild_aggregates', stdout=StringIO())
+
+        stats = self._stats()
+        self.assertAlmostEqual(stats.avg_emotional_value, 5.0)
+        self.assertEqual(stats.last_activity, past)
+
+
+class LocationListViewTestCase(TestCase):
+    """Lista lokalizacji czyta statystyki z LocationStats."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='u', password='testpass123')
+        self.other = User.objects.create_user(username='o', password='testpass123')
+        self.good = Location.objects.create(name='Dobre', coordinates=Point(18.6, 54.35, srid=4326))
+        self.bad = Location.objects.create(name='Złe', coordinates=Point(18.61, 54.36, srid=4326))
+        self.empty = Location.objects.create(name='Puste', coordinates=Point(18.62, 54.37, srid=4326))
+
+        EmotionPoint.objects.create(user=self.user, location=self.good, emotional_value=5)
+        EmotionPoint.objects.create(user=self.other, location=self.good, emotional_value=4)
+        EmotionPoint.objects.create(user=self.user, location=self.bad, emotional_value=1)
+        Photo.objects.create(user=self.user, location=self.bad, image='x.jpg')
+
+        self.client.login(username='u', password='testpass123')
+        self.url = reverse('map:location_list')
+
+    def _names(self, query=''):
+        response = self.client.get(self.url + query)
+        self.assertEqual(response.status_code, 200)
+        return [loc.name for loc in response.context['locations']]
+
+    def test_default_sort_by_last_activity_with_empty_last(self):
+        self.assertEqual(self._names(), ['Złe', 'Dobre', 'Puste'])
+
+    def test_sort_by_avg_desc_puts_unrated_last(self):
+        self.assertEqual(self._names('?sort_by=-avg_emotional_value'), ['Dobre', 'Złe', 'Puste'])
+
+    def test_sort_by_avg_asc_puts_unrated_last(self):
+        self.assertEqual(self._names('?sort_by=avg_emotional_value'), ['Złe', 'Dobre', 'Puste'])
+
+    def test_rating_and_photo_filters(self):
+        self.assertEqual(self._names('?min_rating=4'), ['Dobre'])
+        self.assertEqual(self._names('?has_photos=1'), ['Złe'])
+
+    def test_annotations_available_for_template(self):
+        response = self.client.get(self.url + '?sort_by=-avg_emotional_value')
+        first = response.context['locations'][0]
+        self.assertAlmostEqual(first.avg_emotional_value, 4.5)
+        self.assertEqual(first.emotion_points_count, 2)
+        self.assertEqual(first.photos_count, 0)
@@ -0,0 +1,119 @@
+"""
+Testy podsumowania lokalizacji (cache read-through dla LocationDetailView).
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from emotions.models import EmotionPoint, Comment, Photo
+from emotions.summary import get_location_summary
+from map.models import Location
+
+User = get_user_model()
+
+
+class LocationSummaryTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username='alice', password='x')
+        self.bob = User.objects.create_user(username='bob', password='x')
+        self.location = Location.objects.create(name='Plac', coordinates=Point(18.6, 54.35, srid=4326))
+
+    def test_latest_per_user_avg_and_distribution(self):
+        EmotionPoint.objects.create(user=self.alice, location=self.location, emotional_value=1)
+        EmotionPoint.objects.create(user=self.alice, location=self.location, emotional_value=5)
+        EmotionPoint.objects.create(user=self.bob, location=self.location, emotional_value=3)
+
+        summary = get_location_summary(self.location.pk)
+        self.assertAlmostEqual(summary['avg_emotional_value'], 4.0)
+        self.assertEqual(summary['voters_count'], 2)
+        self.assertEqual(summary['emotion_points_count'], 3)
+        self.assertEqual(
+            summary['distribution'],
+            [{'emotional_value': 3, 'count': 1}, {'emotional_value': 5, 'count': 1}],
+        )
+        self.assertEqual([r.user_id for r in summary['ratings']], [self.bob.pk, self.alice.pk])
+
+    def test_second_read_hits_cache(self):
+        EmotionPoint.objects.create(user=self.alice, location=self.location, emotional_value=4)
+        get_location_summary(self.location.pk)
+
+        with self.assertNumQueries(0):
+            summary = get_location_summary(self.location.pk)
+        self.assertEqual(summary['ratings'][0].user.username, 'alice')
+
+    def test_invalidated_on_point_comment_and_photo_writes(self):
+        get_location_summary(self.location.pk)
+
+        ep = EmotionPoint.objects.create(user=self.alice, location=self.location, emotional_value=2)
+        self.assertEqual(get_location_summary(self.location.pk)['voters_count'], 1)
+
+        Comment.objects.create(user=self.bob, location=self.location, content='Ładnie')
+        self.assertEqual(len(get_location_summary(self.location.pk)['comments']), 1)
+
+        photo = Photo.objects.create(user=self.bob, location=self.location, image='a.jpg')
+        self.assertEqual(len(get_location_summary(self.location.pk)['photos']), 1)
+
+        photo.delete()
+        ep.delete()
+        summary = get_location_summary(self.location.pk)
+        self.assertEqual(summary['photos'], [])
+        self.assertIsNone(summary['avg_emotional_value'])
+
+    def test_cache_holds_plain_values_without_author_rows(self):
+        EmotionPoint.objects.create(user=self.alice, location=self.location, emotional_value=4)
+        Comment.objects.create(user=self.bob, location=self.location, content='Ładnie')
+        get_location_summary(self.location.pk)
+
+        cached = cache.get(f'location_summary_v2_{self.location.pk}')
+        self.assertIsInstance(cached['ratings'][0], dict)
+        self.assertIsInstance(cached['comments'][0], dict)
+        self.assertNotIn(self.alice.password, repr(cached))
+
+    def test_invalidated_when_author_renamed(self):
+        Comment.objects.create(user=self.bob, location=self.location, content='Ładnie')
+        get_location_summary(self.location.pk)
+
+        self.bob.username = 'robert'
+        self.bob.save()
+        self.assertEqual(get_location_summary(self.location.pk)['comments'][0].user.username, 'robert')
+
+    def test_other_location_writes_keep_cache(self):
+        other = Location.objects.create(name='Inny', coordinates=Point(18.7, 54.4, srid=4326))
+        get_location_summary(self.location.pk)
+
+        EmotionPoint.objects.create(user=self.alice, location=other, emotional_value=5)
+        with self.assertNumQueries(0):
+            get_location_summary(self.location.pk)
+
+
+class LocationDetailHotPathTestCase(TestCase):
+    """Gorąca strona szczegółów nie agreguje punktów, komentarzy ani zdjęć."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='u', password='testpass123')
+        self.other = User.objects.create_user(username='o', password='testpass123')
+        self.location = Location.objects.create(name='Plac', coordinates=Point(18.6, 54.35, srid=4326))
+        EmotionPoint.objects.create(user=self.user, location=self.location, emotional_value=5)
+        EmotionPoint.objects.create(user=self.other, location=self.location, emotional_value=3)
+        Comment.objects.create(user=self.other, location=self.location, content='Komentarz')
+        self.client.login(username='u', password='testpass123')
+        self.url = reverse('map:location_detail', kwargs={'pk': self.location.pk})
+
+    def test_warm_page_reads_only_location(self):
+        self.client.get(self.url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        emotions_queries = [q['sql'] for q in queries if 'emotions_' in q['sql']]
+        self.assertEqual(emotions_queries, [])
+        self.assertEqual(response.context['user_emotion_point'].emotional_value, 5)
+        self.assertEqual(len(response.context['comments_list']), 1)
@@ -0,0 +1,109 @@
+"""
+Testy storage adresowanego treścią (emotions.storage): deduplikacja, licznik referencji,
+awatary i nagłówki cache przy serwowaniu mediów.
+"""
+import io
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase, RequestFactory, override_settings
+from PIL import Image
+
+from emotions.models import Photo, StoredFile
+from emotions.storage import content_hash_storage, is_hashed_name
+from emotions.views import serve_media
+from map.models import Location
+
+User = get_user_model()
+
+
+def _upload(color='red', name='foto.jpg'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (40, 40), color=color).save(buffer, format='JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/jpeg')
+
+
+class HashedNameTestCase(SimpleTestCase):
+
+    def test_is_hashed_name(self):
+        digest = 'a' * 64
+        self.assertTrue(is_hashed_name(f'location_photos/aa/{digest}.jpg'))
+        self.assertTrue(is_hashed_name(f'location_photos/aa/derivatives/{digest}.0f3a9c1b.thumb.webp'))
+        self.assertFalse(is_hashed_name('location_photos/2025/01/01/foto.jpg'))
+        self.assertFalse(is_hashed_name('avatars/user_1_avatar.png'))
+
+
+class ContentHashStorageTestCase(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root, CITYFEEL_PHOTO_DERIVATIVES_ASYNC=False)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.location = Location.objects.create(name='Plac', coordinates=Point(18.6, 54.35, srid=4326))
+
+    def test_identical_uploads_share_one_file(self):
+        first = Photo.objects.create(location=self.location, image=_upload(name='a.jpg'))
+        second = Photo.objects.create(location=self.location, image=_upload(name='b.JPG'))
+        other = Photo.objects.create(location=self.location, image=_upload(color='blue'))
+
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertNotEqual(first.image.name, other.image.name)
+        self.assertEqual(StoredFile.objects.get(name=first.image.name).refcount, 2)
+
+    def test_rolled_back_save_leaves_no_reference(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            photo = Photo.objects.create(location=self.location, image=_upload())
+            raise RuntimeError
+        self.assertFalse(StoredFile.objects.filter(name=photo.image.name).exists())
+
+    def test_file_deleted_with_last_reference(self):
+        first = Photo.objects.create(location=self.location, image=_upload())
+        second = Photo.objects.create(location=self.location, image=_upload())
+        name = first.image.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(content_hash_storage.exists(name))
+        self.assertEqual(StoredFile.objects.get(name=name).refcount, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(content_hash_storage.exists(name))
+        self.assertFalse(StoredFile.objects.filter(name=name).exists())
+
+    def test_reupload_before_commit_keeps_file(self):
+        photo = Photo.objects.create(location=self.location, image=_upload())
+        name = photo.image.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            photo.delete()
+            Photo.objects.create(location=self.location, image=_upload())
+        self.assertTrue(content_hash_storage.exists(name))
+
+    def test_avatar_url_changes_with_content(self):
+        user = User.objects.create_user(username='alice', password='x')
+        user.avatar = _upload(name='me.png')
+        user.save()
+        first_name = user.avatar.name
+        self.assertTrue(first_name.startswith('avatars/'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user.avatar = _upload(color='green', name='me.png')
+            user.save()
+
+        self.assertNotEqual(user.avatar.name, first_name)
+        self.assertFalse(content_hash_storage.exists(first_name))
+
+    def test_serve_media_marks_hashed_files_immutable(self):
+        photo = Photo.objects.create(location=self.location, image=_upload())
+        request = RequestFactory().get('/media/' + photo.image.name)
+
+        response = serve_media(request, photo.image.name)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
@@ -0,0 +1,87 @@
+"""
+Testy ukrywania treści przez moderację (is_hidden, emotions.moderation.set_hidden).
+"""
+from django.contrib.admin.sites import site
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from rest_framework.test import APIClient
+
+from emotions import moderation
+from emotions.admin import ReportAdmin
+from emotions.models import Comment, EmotionPoint, LocationStats, Report
+from emotions.summary import get_location_summary
+from map.models import Location
+
+User = get_user_model()
+
+
+class HiddenContentTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username='alice', password='pass')
+        self.bob = User.objects.create_user(username='bob', password='pass')
+        self.park = Location.objects.create(name='Park', coordinates=Point(18.6, 54.35, srid=4326))
+
+        self.older = EmotionPoint.objects.create(user=self.alice, location=self.park, emotional_value=2)
+        self.newer = EmotionPoint.objects.create(user=self.alice, location=self.park, emotional_value=5)
+        self.bobs = EmotionPoint.objects.create(user=self.bob, location=self.park, emotional_value=4)
+        self.comment = Comment.objects.create(user=self.bob, location=self.park, content='Spam spam')
+
+    def _stats(self):
+        return LocationStats.objects.get(location=self.park)
+
+    def test_hiding_latest_falls_back_to_previous_entry(self):
+        moderation.set_hidden(EmotionPoint.objects.filter(pk=self.newer.pk))
+
+        self.newer.refresh_from_db()
+        self.older.refresh_from_db()
+        self.assertTrue(self.newer.is_hidden)
+        self.assertFalse(self.newer.is_latest)
+        self.assertTrue(self.older.is_latest)
+
+        stats = self._stats()
+        self.assertAlmostEqual(float(stats.avg_emotional_value), 3.0)
+        self.assertEqual(stats.emotion_points_count, 2)
+
+    def test_unhide_restores(self):
+        moderation.set_hidden(EmotionPoint.objects.filter(pk=self.newer.pk))
+        changed = moderation.set_hidden(EmotionPoint.objects.filter(pk=self.newer.pk), hidden=False)
+
+        self.assertEqual(changed, 1)
+        self.newer.refresh_from_db()
+        self.assertTrue(self.newer.is_latest)
+        self.assertAlmostEqual(float(self._stats().avg_emotional_value), 4.5)
+
+    def test_hidden_excluded_from_reads(self):
+        get_location_summary(self.park.pk)  # cache, który ukrycie musi unieważnić
+        moderation.set_hidden(Comment.objects.filter(pk=self.comment.pk))
+        moderation.set_hidden(EmotionPoint.objects.filter(pk=self.bobs.pk))
+
+        self.assertEqual(self._stats().comments_count, 0)
+        self.assertEqual(get_location_summary(self.park.pk)['comments'], [])
+
+        client = APIClient()
+        client.force_authenticate(self.alice)
+        ids = {item['id'] for item in client.get('/api/emotion-points/').data['results']}
+        self.assertEqual(ids, {self.older.id, self.newer.id})
+        location = client.get('/api/locations/').data[0]
+        self.assertEqual(location['emotion_points_count'], 2)
+        self.assertAlmostEqual(float(location['avg_emotional_value']), 5.0)
+
+    def test_report_admin_hides_and_resolves(self):
+        moderator = User.objects.create_user(username='mod', password='pass', is_staff=True)
+        Report.objects.create(reporter=self.alice, comment=self.comment, reason='spam')
+        Report.objects.create(reporter=moderator, comment=self.comment, reason='spam')
+
+        request = RequestFactory().post('/')
+        request.user = moderator
+        admin = ReportAdmin(Report, site)
+        admin.message_user = lambda *args, **kwargs: None
+        admin.hide_and_resolve(request, Report.objects.all())
+
+        self.comment.refresh_from_db()
+        self.assertTrue(self.comment.is_hidden)
+        self.assertEqual(set(Report.objects.values_list('status', flat=True)), {'resolved'})
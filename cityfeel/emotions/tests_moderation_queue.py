@@ -0,0 +1,99 @@
+"""
+Testy kolejki moderacji (emotions:admin_reports) — grupowanie po obiekcie, filtry, paginacja.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from emotions import views
+from emotions.models import Comment, EmotionPoint, Report
+from map.models import Location
+
+User = get_user_model()
+
+
+class ModerationQueueTestCase(TestCase):
+    url = reverse('emotions:admin_reports')
+
+    def setUp(self):
+        self.staff = User.objects.create_user(username='mod', password='pass', is_staff=True)
+        self.author = User.objects.create_user(username='author', password='pass')
+        self.reporters = [User.objects.create_user(username=f'r{i}', password='pass') for i in range(3)]
+
+        self.location = Location.objects.create(name='Park', coordinates=Point(18.6, 54.35, srid=4326))
+        self.point = EmotionPoint.objects.create(user=self.author, location=self.location, emotional_value=1)
+        self.comment = Comment.objects.create(
+            user=self.author, location=self.location, emotion_point=self.point, content='Kup tanio!'
+        )
+
+        for reporter, reason, description in zip(
+            self.reporters, ('spam', 'spam', 'inappropriate'), ('Reklama kasyna', '', None)
+        ):
+            Report.objects.create(reporter=reporter, comment=self.comment, reason=reason, description=description)
+        Report.objects.create(reporter=self.reporters[0], emotion_point=self.point, reason='other')
+        Report.objects.create(
+            reporter=self.reporters[1], location=self.location, reason='fake_location', status='dismissed'
+        )
+
+        self.client.login(username='mod', password='pass')
+
+    def test_duplicates_collapse_into_one_row(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        groups = response.context['groups']
+        self.assertEqual(len(groups), 2)
+        by_comment = next(g for g in groups if g['comment'])
+        self.assertEqual(by_comment['comment'], self.comment)
+        self.assertEqual(by_comment['reports_count'], 3)
+        self.assertEqual(by_comment['reasons'], ['inappropriate', 'spam'])
+        self.assertEqual(by_comment['reporters'], ['r0', 'r1', 'r2'])
+        self.assertEqual(by_comment['descriptions'], ['Reklama kasyna'])
+        by_point = next(g for g in groups if g['emotion_point'])
+        self.assertEqual(by_point['emotion_point'], self.point)
+        self.assertEqual(by_point['reporters'], ['r0'])
+        self.assertEqual(by_point['descriptions'], [])
+        self.assertContains(response, 'Reklama kasyna')
+
+    def test_status_counts_and_filters(self):
+        response = self.client.get(self.url, {'status': 'dismissed'})
+        counts = {value: count for value, _, count in response.context['status_counts']}
+
+        self.assertEqual(counts, {'pending': 4, 'resolved': 0, 'dismissed': 1})
+        self.assertEqual([g['location'] for g in response.context['groups']], [self.location])
+
+        response = self.client.get(self.url, {'reason': 'spam'})
+        self.assertEqual(response.context['groups'][0]['reports_count'], 2)
+        self.assertEqual(response.context['status_counts'][0][2], 2)
+
+    def test_paginated_with_constant_queries(self):
+        for i in range(4):
+            loc = Location.objects.create(name=f'L{i}', coordinates=Point(18.6 + i / 100, 54.3, srid=4326))
+            Report.objects.create(reporter=self.reporters[0], location=loc, reason='spam')
+
+        original = views.REPORTS_PER_PAGE
+        views.REPORTS_PER_PAGE = 2
+        try:
+            with CaptureQueriesContext(connection) as small_page:
+                first = self.client.get(self.url)
+            self.assertEqual(first.context['page_obj'].paginator.num_pages, 3)
+
+            # Dwa razy większa strona (same lokalizacje, jak wyżej) — tyle samo zapytań
+            views.REPORTS_PER_PAGE = 4
+            with self.assertNumQueries(len(small_page)):
+                bigger = self.client.get(self.url)
+            self.assertEqual(len(bigger.context['groups']), 4)
+
+            views.REPORTS_PER_PAGE = 2
+            last = self.client.get(self.url, {'page': 3})
+            self.assertEqual(len(last.context['groups']), 2)
+        finally:
+            views.REPORTS_PER_PAGE = original
+
+    def test_requires_staff(self):
+        self.client.login(username='author', password='pass')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
@@ -0,0 +1,149 @@
+"""
+Testy wariantów zdjęć (emotions.photos): skalowanie, orientacja EXIF, usuwanie metadanych
+oraz generowanie w tle po dodaniu zdjęcia.
+"""
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.gis.geos import Point
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from PIL import Image
+
+from emotions import photos
+from emotions.models import Photo
+from map.models import Location
+
+
+def _jpeg(size=(2000, 1000), orientation=None, color='red'):
+    image = Image.new('RGB', size, color=color)
+    exif = Image.Exif()
+    exif[0x010F] = 'Aparat'  # Make
+    if orientation:
+        exif[0x0112] = orientation
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', exif=exif)
+    return buffer.getvalue()
+
+
+class RenderVariantsTestCase(SimpleTestCase):
+
+    def _open(self, data):
+        image = Image.open(io.BytesIO(data))
+        image.load()
+        return image
+
+    def test_widths_and_formats(self):
+        rendered = photos.render_variants(io.BytesIO(_jpeg()))
+
+        self.assertEqual(set(rendered), {
+            ('thumb', 'WEBP'), ('thumb', 'JPEG'), ('medium', 'WEBP'), ('medium', 'JPEG'),
+        })
+        self.assertEqual(self._open(rendered[('thumb', 'JPEG')]).size, (320, 160))
+        self.assertEqual(self._open(rendered[('medium', 'WEBP')]).size, (1280, 640))
+        self.assertEqual(self._open(rendered[('medium', 'WEBP')]).format, 'WEBP')
+
+    def test_small_image_is_not_upscaled(self):
+        rendered = photos.render_variants(io.BytesIO(_jpeg(size=(200, 100))))
+        self.assertEqual(self._open(rendered[('medium', 'JPEG')]).size, (200, 100))
+
+    def test_exif_orientation_applied_and_metadata_stripped(self):
+        # 6 = obrót o 90° — zdjęcie z telefonu trzymanego pionowo
+        rendered = photos.render_variants(io.BytesIO(_jpeg(orientation=6)))
+
+        thumb = self._open(rendered[('thumb', 'JPEG')])
+        self.assertEqual(thumb.size, (320, 640))
+        self.assertEqual(dict(thumb.getexif()), {})
+        self.assertEqual(dict(self._open(rendered[('thumb', 'WEBP')]).getexif()), {})
+
+    def test_transparent_png_flattened(self):
+        image = Image.new('RGBA', (400, 400), (0, 0, 255, 0))
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG')
+
+        rendered = photos.render_variants(io.BytesIO(buffer.getvalue()))
+        thumb = self._open(rendered[('thumb', 'JPEG')])
+        self.assertEqual(thumb.mode, 'RGB')
+        self.assertEqual(thumb.getpixel((10, 10)), (255, 255, 255))
+
+
+class PhotoDerivativesPipelineTestCase(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root, CITYFEEL_PHOTO_DERIVATIVES_ASYNC=False)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.location = Location.objects.create(name='Plac', coordinates=Point(18.6, 54.35, srid=4326))
+
+    def _create_photo(self):
+        upload = SimpleUploadedFile('foto.jpg', _jpeg(), 'image/jpeg')
+        return Photo.objects.create(location=self.location, image=upload)
+
+    def test_variants_built_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            photo = self._create_photo()
+            self.assertEqual(photo.thumbnail_url, photo.image.url)
+
+        photo.refresh_from_db()
+        self.assertEqual(set(photo.variants), {'thumb_webp', 'thumb_jpg', 'medium_webp', 'medium_jpg'})
+        self.assertTrue(photo.thumbnail_webp_url.endswith('.thumb.webp'))
+        self.assertTrue(photo.medium_url.endswith('.medium.jpg'))
+        for path in photo.variants.values():
+            self.assertTrue(default_storage.exists(path))
+
+    def test_variant_files_removed_with_photo(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            photo = self._create_photo()
+        photo.refresh_from_db()
+        paths = list(photo.variants.values())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            photo.delete()
+        self.assertFalse(any(default_storage.exists(path) for path in paths))
+
+    def test_backfill_command(self):
+        photo = self._create_photo()  # bez on_commit — warianty nie powstały
+        self.assertEqual(photo.variants, {})
+
+        call_command('build_photo_derivatives', stdout=io.StringIO())
+
+        photo.refresh_from_db()
+        self.assertEqual(len(photo.variants), 4)
+
+    def test_changed_parameters_give_new_variant_urls(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            photo = self._create_photo()
+        photo.refresh_from_db()
+        old_paths = set(photo.variants.values())
+
+        with mock.patch.dict(photos.VARIANT_WIDTHS, {'thumb': 200}):
+            call_command('build_photo_derivatives', '--all', stdout=io.StringIO())
+
+        photo.refresh_from_db()
+        self.assertTrue(old_paths.isdisjoint(photo.variants.values()))
+        self.assertFalse(any(default_storage.exists(path) for path in old_paths))
+
+    def test_deduplicated_photos_share_variants(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self._create_photo()
+        first.refresh_from_db()
+
+        with mock.patch.object(photos, 'render_variants', wraps=photos.render_variants) as render:
+            with self.captureOnCommitCallbacks(execute=True):
+                second = self._create_photo()
+        second.refresh_from_db()
+
+        render.assert_not_called()
+        self.assertEqual(second.variants, first.variants)
+
+        # Przebudowa jednego ze zdjęć nie usuwa wariantów, których używa drugie
+        with mock.patch.dict(photos.VARIANT_WIDTHS, {'thumb': 200}):
+            photos.process_photo(first.pk)
+        self.assertTrue(all(default_storage.exists(path) for path in second.variants.values()))
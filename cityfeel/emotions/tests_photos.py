@@ -2,9 +2,9 @@ from django.test import TestCase
 from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.contrib.gis.geos import Point
+import hashlib
 import io
 from PIL import Image
-from datetime import datetime
 
 from emotions.models import Photo, validate_image_size
 from emotions.forms import PhotoForm
@@ -73,11 +73,12 @@ class PhotoModelTestCase(TestCase):
             validate_image_size(large_file)
 
     def test_upload_path_pattern(self):
-        """Test ścieżki upload: location_photos/%Y/%m/%d/."""
+        """Test ścieżki upload: location_photos/<ab>/<sha256>.jpg (storage adresowany treścią)."""
         image_file = self._create_test_image()
+        content = image_file.read()
         photo_file = SimpleUploadedFile(
             name='test_photo.jpg',
-            content=image_file.read(),
+            content=content,
             content_type='image/jpeg'
         )
 
@@ -86,13 +87,8 @@ class PhotoModelTestCase(TestCase):
             image=photo_file
         )
 
-        # Sprawdź czy ścieżka zawiera location_photos/%Y/%m/%d/
-        self.assertIn('location_photos/', photo.image.name)
-
-        # Sprawdź format daty w ścieżce (YYYY/MM/DD)
-        today = datetime.now()
-        year_month_day = f"{today.year}/{today.month:02d}/{today.day:02d}"
-        self.assertIn(year_month_day, photo.image.name)
+        digest = hashlib.sha256(content).hexdigest()
+        self.assertEqual(photo.image.name, f"location_photos/{digest[:2]}/{digest}.jpg")
 
     def test_relation_with_location(self):
         """Test relacji z Location (ForeignKey, related_name='photos')."""
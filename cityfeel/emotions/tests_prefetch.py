@@ -0,0 +1,56 @@
+"""
+Testy prefetchu N najnowszych obiektów per rodzic (emotions.prefetch).
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.test import TestCase
+from django.urls import reverse
+
+from emotions.models import EmotionPoint
+from emotions.prefetch import prefetch_top_n
+from map.models import Location
+
+User = get_user_model()
+
+
+class PrefetchTopNTestCase(TestCase):
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='testpass123')
+        self.bob = User.objects.create_user(username='bob', password='testpass123')
+        self.carol = User.objects.create_user(username='carol', password='testpass123')
+        self.locations = [
+            Location.objects.create(name=f'L{i}', coordinates=Point(18.6 + i / 100, 54.35, srid=4326))
+            for i in range(6)
+        ]
+        for loc in self.locations:
+            EmotionPoint.objects.create(user=self.alice, location=loc, emotional_value=4)
+        EmotionPoint.objects.create(user=self.bob, location=self.locations[0], emotional_value=2)
+        EmotionPoint.objects.create(
+            user=self.bob, location=self.locations[1], emotional_value=5, privacy_status='private'
+        )
+
+    def _public(self):
+        return EmotionPoint.objects.filter(privacy_status='public').select_related('location').order_by('-created_at')
+
+    def test_limits_and_orders_per_parent(self):
+        users = [self.alice, self.bob, self.carol]
+        with self.assertNumQueries(2):
+            prefetch_top_n(users, self._public(), fk_name='user', n=3, to_attr='recent')
+            names = [ep.location.name for ep in self.alice.recent]
+
+        self.assertEqual(names, ['L5', 'L4', 'L3'])
+        self.assertEqual([ep.emotional_value for ep in self.bob.recent], [2])
+        self.assertEqual(self.carol.recent, [])
+
+    def test_empty_instances(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(prefetch_top_n([], self._public(), fk_name='user', n=3, to_attr='recent'), [])
+
+    def test_community_view_uses_bounded_prefetch(self):
+        self.client.login(username='carol', password='testpass123')
+        response = self.client.get(reverse('cf_auth:community'))
+
+        users = {u.username: u for u in response.context['users_list']}
+        self.assertEqual(len(users['alice'].recent_public_emotions), 3)
+        self.assertEqual(len(users['bob'].recent_public_emotions), 1)
@@ -0,0 +1,97 @@
+"""
+Testy liczników aktywności użytkownika (UserStats) i ich użycia na profilu i w społeczności.
+"""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from emotions.models import EmotionPoint, UserStats
+from map.models import Location
+
+User = get_user_model()
+
+
+class UserStatsMaintenanceTestCase(TestCase):
+    """Sygnały utrzymują UserStats w zgodzie z historią EmotionPoint."""
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='x')
+        self.park = Location.objects.create(name='Park', coordinates=Point(18.6, 54.35, srid=4326))
+        self.plac = Location.objects.create(name='Plac', coordinates=Point(18.7, 54.36, srid=4326))
+
+    def _stats(self):
+        return UserStats.objects.get(user=self.alice)
+
+    def test_new_user_gets_empty_row(self):
+        stats = self._stats()
+        self.assertEqual(stats.locations_count, 0)
+        self.assertIsNone(stats.last_activity)
+
+    def test_counts_latest_privacy_per_location(self):
+        EmotionPoint.objects.create(user=self.alice, location=self.park, emotional_value=2)
+        EmotionPoint.objects.create(
+            user=self.alice, location=self.park, emotional_value=4, privacy_status='private'
+        )
+        last = EmotionPoint.objects.create(user=self.alice, location=self.plac, emotional_value=5)
+
+        stats = self._stats()
+        self.assertEqual(stats.locations_count, 2)
+        self.assertEqual(stats.public_count, 1)
+        self.assertEqual(stats.private_count, 1)
+        self.assertEqual(stats.last_activity, last.created_at)
+
+    def test_delete_updates_counters(self):
+        ep = EmotionPoint.objects.create(user=self.alice, location=self.park, emotional_value=2)
+        ep.delete()
+        self.assertEqual(self._stats().locations_count, 0)
+
+    def test_location_delete_updates_counters(self):
+        EmotionPoint.objects.create(user=self.alice, location=self.park, emotional_value=2)
+        self.park.delete()
+        self.assertEqual(self._stats().locations_count, 0)
+
+    def test_user_delete_cascades(self):
+        EmotionPoint.objects.create(user=self.alice, location=self.park, emotional_value=2)
+        self.alice.delete()
+        self.assertFalse(UserStats.objects.exists())
+
+    def test_rebuild_after_bulk_create(self):
+        EmotionPoint.objects.bulk_create([
+            EmotionPoint(user=self.alice, location=self.park, emotional_value=3),
+            EmotionPoint(user=self.alice, location=self.plac, emotional_value=3, privacy_status='private'),
+        ])
+        self.assertEqual(self._stats().locations_count, 0)
+
+        call_command('rebuild_aggregates', stdout=StringIO())
+        stats = self._stats()
+        self.assertEqual((stats.locations_count, stats.public_count, stats.private_count), (2, 1, 1))
+
+
+class UserStatsPagesTestCase(TestCase):
+
+    def setUp(self):
+        self.viewer = User.objects.create_user(username='viewer', password='testpass123')
+        self.alice = User.objects.create_user(username='alice', password='testpass123')
+        park = Location.objects.create(name='Park', coordinates=Point(18.6, 54.35, srid=4326))
+        EmotionPoint.objects.create(user=self.alice, location=park, emotional_value=2)
+        EmotionPoint.objects.create(user=self.alice, location=park, emotional_value=5)
+        self.client.login(username='viewer', password='testpass123')
+
+    def test_community_reads_counter(self):
+        response = self.client.get(reverse('cf_auth:community'))
+        users = {u.username: u for u in response.context['users_list']}
+        self.assertEqual(users['alice'].emotions_count, 1)
+
+    def test_profile_reads_counters(self):
+        response = self.client.get(reverse('cf_auth:profile', kwargs={'user_id': self.alice.pk}))
+        self.assertEqual(response.context['total_emotions'], 1)
+        self.assertEqual(response.context['public_emotions'], 1)
+
+    def test_profile_without_stats_row(self):
+        UserStats.objects.filter(user=self.alice).delete()
+        response = self.client.get(reverse('cf_auth:profile', kwargs={'user_id': self.alice.pk}))
+        self.assertEqual(response.context['total_emotions'], 1)
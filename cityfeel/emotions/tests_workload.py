@@ -0,0 +1,63 @@
+"""
+Testy generatora realistycznego obciążenia (emotions.workload).
+"""
+import datetime
+import io
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from emotions.models import EmotionPoint
+from emotions.workload import WorkloadGenerator
+from map.models import Location
+
+
+class WorkloadGeneratorTestCase(TestCase):
+    until = timezone.make_aware(datetime.datetime(2025, 6, 1))
+
+    def _points(self, seed, chunks):
+        generator = WorkloadGenerator(seed=seed, until=self.until, password='pass')
+        generator.prepare_points(list(range(1, 51)), list(range(1, 21)))
+        return [row for start, count in chunks for row in generator.point_rows(start, count)]
+
+    def test_deterministic_regardless_of_chunks(self):
+        whole = self._points(5, [(0, 25_000)])
+        self.assertEqual(whole, self._points(5, [(0, 12_345), (12_345, 12_655)]))
+        self.assertNotEqual(whole, self._points(6, [(0, 25_000)]))
+
+    def test_distributions(self):
+        rows = self._points(5, [(0, 20_000)])
+        self.assertTrue(all(self.until - datetime.timedelta(days=365) <= row[4] < self.until for row in rows))
+        self.assertTrue(all(1 <= row[2] <= 5 for row in rows))
+
+        per_location = {}
+        for row in rows:
+            per_location[row[1]] = per_location.get(row[1], 0) + 1
+        # Zipf: najpopularniejsze miejsce ma wielokrotnie więcej ocen niż najmniej popularne
+        self.assertGreater(max(per_location.values()), 5 * min(per_location.values()))
+
+        night = sum(1 for row in rows if timezone.localtime(row[4]).hour in (2, 3, 4))
+        evening = sum(1 for row in rows if timezone.localtime(row[4]).hour in (18, 19, 20))
+        self.assertGreater(evening, 5 * night)
+
+    def test_realistic_load_places_locations_in_districts(self):
+        call_command('load_districts', stdout=io.StringIO())
+        call_command(
+            'load_dataset', profile='realistic', users=30, locations=20, points=500, seed=3,
+            stdout=io.StringIO(),
+        )
+
+        self.assertEqual(Location.objects.count(), 20)
+        self.assertFalse(Location.objects.filter(district__isnull=True).exists())
+        self.assertEqual(EmotionPoint.objects.count(), 500)
+        # Powtórne oceny tych samych miejsc zostawiają historię poza is_latest
+        self.assertTrue(EmotionPoint.objects.filter(is_latest=False).exists())
+
+    def test_until_fixes_time_window(self):
+        call_command(
+            'load_dataset', profile='realistic', users=10, locations=5, points=200, seed=3,
+            until='2025-06-01', stdout=io.StringIO(),
+        )
+        dates = EmotionPoint.objects.values_list('created_at', flat=True)
+        self.assertTrue(all(self.until - datetime.timedelta(days=365) <= d < self.until for d in dates))
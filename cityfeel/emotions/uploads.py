@@ -0,0 +1,207 @@
+"""
+Wznawialny upload zdjęć w kawałkach (API: /api/photo-uploads/).
+
+Przebieg:
+1. ``POST /api/photo-uploads/`` — klient deklaruje lokalizację, nazwę, rozmiar i SHA-256 pliku.
+2. ``PUT /api/photo-uploads/<id>/chunk/`` z nagłówkiem ``Upload-Offset`` — surowe bajty
+   kawałka. Strumień żądania czytamy blokami (``READ_BLOCK_SIZE``) do osobnego pliku
+   tymczasowego, więc pamięć nie zależy od wielkości kawałka ani pliku.
+3. Po zerwaniu połączenia ``GET /api/photo-uploads/<id>/`` zwraca ``offset`` — od tego
+   miejsca klient wysyła dalej.
+4. ``POST /api/photo-uploads/<id>/complete/`` — sprawdzamy rozmiar, SHA-256 i to, że plik
+   jest obrazem, po czym w jednej transakcji tworzymy Photo i zamykamy sesję.
+
+Dopiero odebrany w całości kawałek dopisujemy do pliku sesji — pod ``SELECT ... FOR UPDATE``
+sprawdzamy offset, dopisujemy i zapisujemy nowy offset. Blokada nie czeka więc na wolnego
+klienta, a równoległe wysyłanie tego samego kawałka kończy się 409. Porzucone
+(niezakończone) sesje sprząta ``manage.py cleanup_photo_uploads``.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image
+
+from .models import Photo, PhotoUpload, validate_image_size
+
+READ_BLOCK_SIZE = 64 * 1024
+MAX_UPLOAD_SIZE = 5 * 1024 * 1024  # jak validate_image_size
+STALE_AFTER = timedelta(hours=24)
+
+
+class UploadError(Exception):
+    """Błąd uploadu; ``status`` to sugerowany kod HTTP, ``offset`` — bieżący stan sesji."""
+
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+def get_temp_dir():
+    return getattr(
+        settings,
+        'CITYFEEL_UPLOAD_TEMP_DIR',
+        os.path.join(tempfile.gettempdir(), 'cityfeel_uploads'),
+    )
+
+
+def get_max_chunk_size():
+    return getattr(settings, 'CITYFEEL_UPLOAD_MAX_CHUNK_SIZE', 1024 * 1024)
+
+
+def temp_path(upload):
+    return os.path.join(get_temp_dir(), f'{upload.pk}.part')
+
+
+def start_upload(user, location, filename, size, sha256, caption='', privacy_status='public'):
+    if size > MAX_UPLOAD_SIZE:
+        raise UploadError(f"Maksymalny rozmiar pliku to {MAX_UPLOAD_SIZE // (1024 * 1024)}MB", status=413)
+
+    upload = PhotoUpload.objects.create(
+        user=user,
+        location=location,
+        filename=os.path.basename(filename),
+        size=size,
+        sha256=sha256.lower(),
+        caption=caption,
+        privacy_status=privacy_status,
+    )
+    os.makedirs(get_temp_dir(), exist_ok=True)
+    open(temp_path(upload), 'wb').close()
+    return upload
+
+
+def write_chunk(upload_id, offset, stream, length):
+    """
+    Dopisuje kawałek od ``offset``; zwraca zaktualizowaną sesję.
+
+    ``stream`` to obiekt z ``read(n)`` (strumień żądania), ``length`` — Content-Length.
+    """
+    max_chunk_size = get_max_chunk_size()
+    if length is None or length <= 0:
+        raise UploadError("Brak danych kawałka (Content-Length).")
+    if length > max_chunk_size:
+        raise UploadError(f"Maksymalny rozmiar kawałka to {max_chunk_size} B.", status=413)
+
+    os.makedirs(get_temp_dir(), exist_ok=True)
+    with tempfile.TemporaryFile(dir=get_temp_dir()) as chunk:
+        # Strumień czytamy przed blokadą wiersza — wolny klient nie trzyma transakcji
+        written = 0
+        while written < length:
+            block = stream.read(min(READ_BLOCK_SIZE, length - written))
+            if not block:
+                break
+            chunk.write(block)
+            written += len(block)
+        if written != length:
+            # Zerwane połączenie — offset się nie zmienia, klient wznowi od niego
+            current = PhotoUpload.objects.filter(pk=upload_id).values_list('offset', flat=True).first()
+            raise UploadError("Niepełny kawałek.", offset=current)
+        chunk.seek(0)
+
+        with transaction.atomic():
+            upload = PhotoUpload.objects.select_for_update().get(pk=upload_id)
+            if upload.status != PhotoUpload.STATUS_PENDING:
+                raise UploadError("Upload jest już zakończony.", status=409, offset=upload.offset)
+            if offset != upload.offset:
+                raise UploadError("Niezgodny Upload-Offset.", status=409, offset=upload.offset)
+            if offset + length > upload.size:
+                raise UploadError("Kawałek wykracza poza zadeklarowany rozmiar pliku.", offset=upload.offset)
+
+            path = temp_path(upload)
+            with open(path, 'r+b' if os.path.exists(path) else 'w+b') as f:
+                # Bajty po przerwanym wcześniej dopisywaniu (bez zapisu offsetu) nadpisujemy
+                f.seek(offset)
+                f.truncate()
+                shutil.copyfileobj(chunk, f, READ_BLOCK_SIZE)
+
+            upload.offset = offset + length
+            upload.save(update_fields=['offset', 'updated_at'])
+    return upload
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(READ_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _verify_image(path):
+    try:
+        with Image.open(path) as image:
+            image.verify()
+    except Exception:
+        raise UploadError("Plik nie jest poprawnym obrazem.")
+
+
+def complete_upload(upload_id):
+    """Weryfikuje plik i atomowo tworzy z niego Photo; ponowne wywołanie zwraca to samo zdjęcie."""
+    with transaction.atomic():
+        upload = PhotoUpload.objects.select_for_update().get(pk=upload_id)
+        if upload.status == PhotoUpload.STATUS_COMPLETED:
+            return upload
+        if upload.offset != upload.size:
+            raise UploadError("Plik nie został jeszcze w całości przesłany.", status=409, offset=upload.offset)
+
+        path = temp_path(upload)
+        checksum_ok = _file_sha256(path) == upload.sha256
+        if checksum_ok:
+            _verify_image(path)
+            with open(path, 'rb') as f:
+                image = File(f, name=upload.filename)
+                try:
+                    validate_image_size(image)
+                except ValidationError as e:
+                    raise UploadError(e.messages[0], status=413)
+                upload.photo = Photo.objects.create(
+                    user=upload.user,
+                    location=upload.location,
+                    image=image,
+                    caption=upload.caption,
+                    privacy_status=upload.privacy_status,
+                )
+            upload.status = PhotoUpload.STATUS_COMPLETED
+            upload.save(update_fields=['photo', 'status', 'updated_at'])
+            transaction.on_commit(lambda: _remove(path))
+        else:
+            # Nie wiadomo, który kawałek jest uszkodzony — zaczynamy od nowa
+            upload.offset = 0
+            upload.save(update_fields=['offset', 'updated_at'])
+            open(path, 'wb').close()
+
+    if not checksum_ok:
+        raise UploadError("Suma kontrolna SHA-256 się nie zgadza.", status=422, offset=0)
+    return upload
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def cleanup_stale_uploads(older_than=STALE_AFTER):
+    """
+    Usuwa niezakończone sesje bez aktywności dłuższej niż ``older_than`` (i ich pliki tymczasowe).
+
+    Zakończone sesje zostają — ``complete_upload`` zwraca z nich zdjęcie przy ponowieniu.
+    """
+    cutoff = timezone.now() - older_than
+    stale = PhotoUpload.objects.filter(status=PhotoUpload.STATUS_PENDING, updated_at__lt=cutoff)
+    count = 0
+    for upload in stale.iterator():
+        _remove(temp_path(upload))
+        count += 1
+    stale.delete()
+    return count
@@ -4,10 +4,18 @@ from django.views.decorators.http import require_POST
 from django.http import HttpResponseForbidden
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
+from django.core.paginator import Paginator
+from django.conf import settings
+from django.views.static import serve
+
+from . import moderation
+from .storage import is_hashed_name
 
 # Dodany model Report do importów
 from .models import EmotionPoint, Comment, Photo, Report
 
+REPORTS_PER_PAGE = 25
+
 
 def check_owner_or_staff(user, obj_user):
     """Pomocnicza funkcja sprawdzająca uprawnienia (właściciel lub admin)."""
@@ -80,16 +88,52 @@ def edit_photo_caption(request, pk):
 @staff_member_required
 def admin_reports_view(request):
     """
-    Widok panelu moderatora z listą zgłoszeń.
+    Widok panelu moderatora — kolejka zgłoszeń zgrupowanych po zgłoszonym obiekcie.
     Tylko dla użytkowników z uprawnieniami staff (admin/moderator).
+
+    Parametry GET: ``status`` (domyślnie ``pending``), ``reason``, ``page``.
     """
-    # Pobieramy zgłoszenia i sortujemy od najnowszego. 
-    # select_related przyspiesza ładowanie bazy.
-    reports = Report.objects.select_related('reporter', 'location', 'comment', 'comment__location').order_by('-created_at')
+    status = request.GET.get('status')
+    if status not in moderation.STATUSES:
+        status = moderation.DEFAULT_STATUS
+    reason = request.GET.get('reason')
+    if reason not in moderation.REASONS:
+        reason = None
+
+    paginator = Paginator(moderation.grouped_reports(status, reason), REPORTS_PER_PAGE)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    page_obj.object_list = moderation.attach_targets(list(page_obj.object_list))
+
+    # Parametry filtrów dla linków paginacji
+    q = request.GET.copy()
+    q.pop('page', None)
 
     context = {
-        'reports': reports
+        'page_obj': page_obj,
+        'is_paginated': page_obj.has_other_pages(),
+        'groups': page_obj.object_list,
+        'status_counts': [
+            (value, moderation.STATUSES[value], count)
+            for value, count in moderation.status_counts(reason).items()
+        ],
+        'reasons': Report.REPORT_REASONS,
+        'current_status': status,
+        'current_reason': reason or '',
+        'query_string': q.urlencode(),
     }
-    
+
     # Skoro daliśmy plik admin_reports.html do głównego folderu templates, odwołujemy się do niego bezpośrednio
-    return render(request, 'admin_reports.html', context)
\ No newline at end of file
+    return render(request, 'admin_reports.html', context)
+
+
+def serve_media(request, path):
+    """
+    Serwuje MEDIA_ROOT (tryb deweloperski) z nagłówkami cache.
+
+    Pliki adresowane treścią (emotions.storage) i ich warianty nigdy nie zmieniają
+    zawartości pod tym samym URL-em — przeglądarka i proxy mogą trzymać je bez końca.
+    """
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    if response.status_code == 200 and is_hashed_name(path):
+        response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
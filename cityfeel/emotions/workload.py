@@ -0,0 +1,185 @@
+"""
+Deterministyczny generator realistycznego obciążenia do benchmarków
+(``manage.py load_dataset --profile realistic``).
+
+W przeciwieństwie do ``bulk_load.UniformGenerator`` (i seederów w ``fixtures/``)
+rozkłady naśladują ruch produkcyjny:
+
+- popularność lokalizacji — rozkład Zipfa (kilka miejsc zbiera większość ocen),
+- aktywność użytkowników — prawo potęgowe (garstka bardzo aktywnych, długi ogon),
+- powtórne oceny — część ocen to powrót do „ulubionych” miejsc użytkownika, więc pary
+  (użytkownik, lokalizacja) mają historię, a ``is_latest`` ma co wybierać,
+- czas — rytm dobowy (szczyty rano, w południe i wieczorem) i tygodniowy (weekendy),
+- położenie — lokalizacje losowane wewnątrz poligonów dzielnic z ``export.geojson``,
+- nastrój — średnia lokalizacji i skłonność użytkownika plus szum.
+
+Zbiór zależy tylko od ziarna, liczności i ``until``: punkty losujemy blokami po
+``POINT_BLOCK`` wierszy, każdy blok z własnego ziarna, a cechy użytkowników i miejsc
+z ziarna i ich numeru — wynik nie zależy od liczby procesów ``--workers``.
+"""
+import itertools
+import json
+import math
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.gis.geos import Point
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from map.districts import find_geojson_path, iter_district_features
+from map.district_index import get_index
+
+from .bulk_load import DEFAULT_PASSWORD, LOCATION_CATEGORIES, LoadError, UniformGenerator, _ewkt
+
+# Gotowe skale: (użytkownicy, lokalizacje, punkty emocji)
+SCALES = {
+    '10k': (1_000, 300, 10_000),
+    '100k': (8_000, 2_000, 100_000),
+    '1m': (50_000, 10_000, 1_000_000),
+    '10m': (300_000, 50_000, 10_000_000),
+}
+
+POINT_BLOCK = 10_000
+
+# Stały koniec okna czasu zbiorów benchmarku — wyniki z różnych dni są porównywalne
+BENCHMARK_UNTIL = '2025-01-01'
+
+# Udział ocen w kolejnych godzinach doby (0–23) i dniach tygodnia (pon.–niedz.)
+HOUR_WEIGHTS = [
+    1, 0.6, 0.4, 0.3, 0.3, 0.6, 1.5, 3.5, 5, 4, 3.5, 4,
+    5, 5.5, 4.5, 4.5, 5, 6, 7, 7, 6, 4.5, 3, 1.8,
+]
+WEEKDAY_WEIGHTS = [1.0, 0.95, 0.95, 1.0, 1.1, 1.35, 1.25]
+
+
+def parse_until(value):
+    """Data ``YYYY-MM-DD`` (opcja ``--until``) jako północ tego dnia w strefie projektu."""
+    return timezone.make_aware(datetime.combine(date.fromisoformat(value), time.min))
+
+
+def _cumulative(weights):
+    return list(itertools.accumulate(weights))
+
+
+class WorkloadGenerator(UniformGenerator):
+    """
+    Parametry: ``location_skew`` (wykładnik Zipfa), ``user_skew`` (wykładnik aktywności),
+    ``repeat_share`` (udział ocen ulubionych miejsc), ``private_share`` (udział
+    użytkowników oceniających głównie prywatnie), ``days`` i ``until`` (okno czasu;
+    domyślnie rok do dzisiejszej północy).
+    """
+
+    def __init__(self, seed=0, password=DEFAULT_PASSWORD, until=None, days=365,
+                 location_skew=1.1, user_skew=1.0, repeat_share=0.35, private_share=0.1):
+        if until is None:
+            until = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        super().__init__(seed=seed, password=password, now=until)
+        self.days = days
+        self.location_skew = location_skew
+        self.user_skew = user_skew
+        self.repeat_share = repeat_share
+        self.private_share = private_share
+
+        first_day = until - timedelta(days=days)
+        self.day_starts = [first_day + timedelta(days=d) for d in range(days)]
+        self.day_weights = _cumulative(
+            WEEKDAY_WEIGHTS[day.weekday()] for day in self.day_starts
+        )
+        self.hour_weights = _cumulative(HOUR_WEIGHTS)
+
+    # --- Lokalizacje ---
+
+    @cached_property
+    def districts(self):
+        """Poligony dzielnic: ``(nazwa, id w bazie lub None, przygotowana geometria, obwiednia)``."""
+        path = find_geojson_path()
+        if path is None:
+            raise LoadError("Nie znaleziono export.geojson z granicami dzielnic.")
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        ids = get_index().ids_by_name
+        return [
+            (name, ids.get(name), geometry.prepared, geometry.extent)
+            for name, geometry in iter_district_features(data)
+        ]
+
+    @cached_property
+    def district_weights(self):
+        # Pierwiastek z powierzchni obwiedni: małe dzielnice śródmiejskie są gęściej zabudowane
+        return _cumulative(
+            math.sqrt((xmax - xmin) * (ymax - ymin)) for _, _, _, (xmin, ymin, xmax, ymax) in self.districts
+        )
+
+    def location_rows(self, first_number, count):
+        for n in range(first_number, first_number + count):
+            rng = self.rng('location', n)
+            name, district_id, prepared, (xmin, ymin, xmax, ymax) = rng.choices(
+                self.districts, cum_weights=self.district_weights
+            )[0]
+            while True:
+                lon, lat = rng.uniform(xmin, xmax), rng.uniform(ymin, ymax)
+                if prepared.covers(Point(lon, lat, srid=4326)):
+                    break
+            yield f"{rng.choice(LOCATION_CATEGORIES)} {name} #{n}", _ewkt(lon, lat), district_id
+
+    # --- Punkty emocji ---
+
+    def prepare_points(self, user_ids, location_ids):
+        super().prepare_points(user_ids, location_ids)
+        rng = self.rng('setup', 0)
+
+        # Ranga popularności/aktywności nie zależy od id — tasujemy kolejność
+        location_ranks = list(range(len(location_ids)))
+        rng.shuffle(location_ranks)
+        self.location_weights = _cumulative(
+            (rank + 1) ** -self.location_skew for rank in location_ranks
+        )
+        user_ranks = list(range(len(user_ids)))
+        rng.shuffle(user_ranks)
+        self.user_weights = _cumulative((rank + 1) ** -self.user_skew for rank in user_ranks)
+
+        self.location_mood = [min(4.6, max(1.6, rng.gauss(3.4, 0.7))) for _ in location_ids]
+        self.user_bias = [rng.gauss(0, 0.5) for _ in user_ids]
+        self.user_private = [0.6 if rng.random() < self.private_share else 0.03 for _ in user_ids]
+        self._favourites = {}
+
+    def favourites(self, user):
+        """Ulubione miejsca użytkownika (indeksy lokalizacji) — stałe dla ziarna i użytkownika."""
+        if user not in self._favourites:
+            rng = self.rng('favourites', user)
+            size = min(8, int(rng.paretovariate(1.5)))
+            self._favourites[user] = [
+                rng.choices(range(len(self.location_ids)), cum_weights=self.location_weights)[0]
+                for _ in range(size)
+            ]
+        return self._favourites[user]
+
+    def point_rows(self, start, count):
+        end = start + count
+        for block in range(start // POINT_BLOCK, math.ceil(end / POINT_BLOCK)):
+            rows = self._point_block(block)
+            first = block * POINT_BLOCK
+            yield from itertools.islice(rows, max(start - first, 0), min(end - first, POINT_BLOCK))
+
+    def _point_block(self, block):
+        rng = self.rng('point', block)
+        users = range(len(self.user_ids))
+        locations = range(len(self.location_ids))
+        while True:
+            user = rng.choices(users, cum_weights=self.user_weights)[0]
+            if rng.random() < self.repeat_share:
+                location = rng.choice(self.favourites(user))
+            else:
+                location = rng.choices(locations, cum_weights=self.location_weights)[0]
+
+            mood = self.location_mood[location] + self.user_bias[user] + rng.gauss(0, 0.8)
+            value = min(5, max(1, round(mood)))
+            privacy = 'private' if rng.random() < self.user_private[user] else 'public'
+
+            day = rng.choices(self.day_starts, cum_weights=self.day_weights)[0]
+            hour = rng.choices(range(24), cum_weights=self.hour_weights)[0]
+            created_at = day + timedelta(hours=hour, seconds=rng.randrange(3600))
+            yield (
+                self.user_ids[user], self.location_ids[location], value, privacy,
+                created_at, created_at, False, False,
+            )
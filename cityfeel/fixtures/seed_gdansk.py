@@ -15,27 +15,14 @@ django.setup()
 from django.contrib.auth import get_user_model
 from django.contrib.gis.geos import Point
 from django.utils import timezone
-from django.db import connection
+from django.core.management import call_command
 from map.models import Location
+from map.district_index import get_index
 from emotions.models import EmotionPoint
 
 User = get_user_model()
 
 
-def fix_database_sync():
-    """
-    Automatyczny naprawiacz bazy danych. Jeśli w Postgresie ostała się
-    tabela z wymaganą kolumną is_hidden (a w kodzie jej nie ma),
-    to wymuszamy usunięcie restrykcji NOT NULL.
-    """
-    try:
-        with connection.cursor() as cursor:
-            cursor.execute('ALTER TABLE emotions_emotion_point ALTER COLUMN is_hidden DROP NOT NULL;')
-    except Exception:
-        # Jeśli kolumna nie istnieje, ignorujemy błąd
-        pass
-
-
 def generate_unique_names(count):
     categories = ['Szkoła', 'Park', 'Siłownia', 'Plaża', 'Kawiarnia', 'Restauracja', 'Przystanek', 'Sklep', 'Galeria',
                   'Kino', 'Biblioteka', 'Plac zabaw', 'Boisko', 'Przychodnia', 'Zabytek', 'Pomnik']
@@ -71,9 +58,14 @@ def get_random_land_coordinates_in_gdansk():
         {'lat_min': 54.35, 'lat_max': 54.38, 'lon_min': 18.65, 'lon_max': 18.72},
         {'lat_min': 54.32, 'lat_max': 54.35, 'lon_min': 18.72, 'lon_max': 18.85},
     ]
-    zone = random.choice(zones)
-    lat = random.uniform(zone['lat_min'], zone['lat_max'])
-    lon = random.uniform(zone['lon_min'], zone['lon_max'])
+    # Jeśli granice dzielnic są wczytane, odrzucamy punkty poza nimi (zatoka, sąsiednie gminy)
+    index = get_index()
+    for _ in range(100):
+        zone = random.choice(zones)
+        lat = random.uniform(zone['lat_min'], zone['lat_max'])
+        lon = random.uniform(zone['lon_min'], zone['lon_max'])
+        if not index.names or index.district_of((lon, lat)) is not None:
+            break
     return lat, lon
 
 
@@ -82,9 +74,6 @@ def main():
     print("🏙️  GENERATOR DANYCH DLA GDAŃSKA (CITYFEEL)")
     print("=" * 50)
 
-    # Odpalamy naprawiacz bazy w tle
-    fix_database_sync()
-
     try:
         users_input = input("1. Ile UŻYTKOWNIKÓW wygenerować? (np. 10, wciśnij Enter by pominąć): ")
         users_count = int(users_input) if users_input.strip() else 0
@@ -190,6 +179,9 @@ def main():
 
             print(f"✅ Utworzono {created_emotions} unikalnych opinii/emocji.")
 
+    # Daty opinii cofamy przez QuerySet.update (bez sygnałów) — odświeżamy statystyki
+    call_command('rebuild_aggregates')
+
     print("\n🎉 ZAKOŃCZONO DZIAŁANIE SKRYPTU!\n")
 
 
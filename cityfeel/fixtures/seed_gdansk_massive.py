@@ -17,22 +17,15 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.hashers import make_password
 from django.contrib.gis.geos import Point
 from django.utils import timezone
-from django.db import connection
+from django.core.management import call_command
 from map.models import Location
+from map.district_index import districts_of, get_index
 from emotions.models import EmotionPoint
 
 User = get_user_model()
 BATCH_SIZE = 10000  # Optymalna paczka dla PostgreSQL
 
 
-def fix_database_sync():
-    try:
-        with connection.cursor() as cursor:
-            cursor.execute('ALTER TABLE emotions_emotion_point ALTER COLUMN is_hidden DROP NOT NULL;')
-    except Exception:
-        pass
-
-
 def get_random_land_coordinates_in_gdansk():
     zones = [
         {'lat_min': 54.33, 'lat_max': 54.42, 'lon_min': 18.55, 'lon_max': 18.65},
@@ -41,20 +34,29 @@ def get_random_land_coordinates_in_gdansk():
         {'lat_min': 54.35, 'lat_max': 54.38, 'lon_min': 18.65, 'lon_max': 18.72},
         {'lat_min': 54.32, 'lat_max': 54.35, 'lon_min': 18.72, 'lon_max': 18.85},
     ]
-    zone = random.choice(zones)
-    lat = random.uniform(zone['lat_min'], zone['lat_max'])
-    lon = random.uniform(zone['lon_min'], zone['lon_max'])
+    # Jeśli granice dzielnic są wczytane, odrzucamy punkty poza nimi (zatoka, sąsiednie gminy)
+    index = get_index()
+    for _ in range(100):
+        zone = random.choice(zones)
+        lat = random.uniform(zone['lat_min'], zone['lat_max'])
+        lon = random.uniform(zone['lon_min'], zone['lon_max'])
+        if not index.names or index.district_of((lon, lat)) is not None:
+            break
     return lat, lon
 
 
+def assign_batch_districts(locations):
+    """bulk_create omija Location.save() — dzielnice przypisujemy z indeksu w pamięci."""
+    for location, district_id in zip(locations, districts_of(loc.coordinates for loc in locations)):
+        location.district_id = district_id
+
+
 def main():
     print("\n" + "🔥" * 25)
     print("🚀  GENERATOR MASOWY BIG DATA (CITYFEEL)  🚀")
     print("🔥" * 25)
     print("\nUWAGA: Ten skrypt nadpisuje ograniczenia sprzętowe poprzez techniki Bulk Insert.")
 
-    fix_database_sync()
-
     try:
         users_count = int(input("1. Ile UŻYTKOWNIKÓW wygenerować? (np. 100000): ") or 0)
         locs_count = int(input("2. Ile LOKALIZACJI wygenerować? (np. 1000000): ") or 0)
@@ -119,12 +121,14 @@ def main():
             locs_batch.append(Location(name=name, coordinates=Point(lon, lat, srid=4326)))
 
             if len(locs_batch) >= BATCH_SIZE:
+                assign_batch_districts(locs_batch)
                 Location.objects.bulk_create(locs_batch)
                 total_created_locs += len(locs_batch)
                 locs_batch = []
                 print(f"  -> Zapisano {total_created_locs} / {locs_count} lokalizacji...")
 
         if locs_batch:
+            assign_batch_districts(locs_batch)
             Location.objects.bulk_create(locs_batch)
             total_created_locs += len(locs_batch)
             print(f"  -> Zapisano {total_created_locs} / {locs_count} lokalizacji...")
@@ -192,6 +196,10 @@ def main():
         # Przywracamy normalne działanie pola w Django
         created_at_field.auto_now_add = True
 
+    # bulk_create omija sygnały — przeliczamy zdenormalizowane statystyki jednym zapytaniem
+    print("\n[+] Przeliczanie statystyk lokalizacji...")
+    call_command('rebuild_aggregates')
+
     end_time = time.time()
     elapsed_time = round(end_time - start_time, 2)
     print("\n" + "🎉" * 15)
@@ -1,18 +1,31 @@
 from django.contrib.gis import admin
-from django.db.models import Avg
-from .models import Location
+from emotions.changelist import EstimatedCountPaginator
+
+from .models import District, Location
+
+
+@admin.register(District)
+class DistrictAdmin(admin.GISModelAdmin):
+    """Admin interface for District boundaries (loaded by load_districts)."""
+    list_display = ['name']
+    search_fields = ['name']
 
 
 @admin.register(Location)
 class LocationAdmin(admin.GISModelAdmin):
     """Admin interface for Location with GIS support and statistics."""
-    list_display = ['name', 'get_coordinates_display', 'emotion_count', 'average_emotion']
+    list_display = ['name', 'district', 'get_coordinates_display', 'emotion_count', 'average_emotion']
+    list_filter = ['district']
+    # Liczniki z LocationStats (emotions.stats) zamiast historii punktów każdej lokalizacji ze strony
+    list_select_related = ['district', 'stats']
     search_fields = ['name']
     readonly_fields = ['emotion_count', 'average_emotion', 'coordinates_info']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     fieldsets = (
         ('Lokalizacja', {
-            'fields': ('name', 'coordinates')
+            'fields': ('name', 'coordinates', 'district')
         }),
         ('Informacje', {
             'fields': ('coordinates_info',),
@@ -30,20 +43,20 @@ class LocationAdmin(admin.GISModelAdmin):
 
     coordinates_info.short_description = 'Współrzędne'
 
+    def _stats(self, obj):
+        return getattr(obj, 'stats', None)
+
     def emotion_count(self, obj):
         """Zwraca liczbę punktów emocji dla lokalizacji."""
-        return obj.emotion_points.count()
+        stats = self._stats(obj)
+        return stats.emotion_points_count if stats else 0
 
     emotion_count.short_description = 'Liczba punktów emocji'
 
     def average_emotion(self, obj):
-        """Zwraca średnią ocenę emocjonalną dla lokalizacji."""
-        avg = obj.emotion_points.aggregate(Avg('emotional_value'))['emotional_value__avg']
+        """Zwraca średnią ocenę emocjonalną dla lokalizacji (najnowszy głos każdego usera)."""
+        stats = self._stats(obj)
+        avg = stats.avg_emotional_value if stats else None
         return round(avg, 2) if avg else 'Brak danych'
 
     average_emotion.short_description = 'Średnia ocena'
-
-    def get_queryset(self, request):
-        """Optimize queries with prefetch_related."""
-        qs = super().get_queryset(request)
-        return qs.prefetch_related('emotion_points')
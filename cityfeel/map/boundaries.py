@@ -0,0 +1,359 @@
+"""
+Uproszczone granice dzielnic jako statyczne, cache'owalne pliki GeoJSON.
+
+Zamiast wklejać 1,2 MB export.geojson do każdej odpowiedzi HTML, komenda
+``build_district_boundaries`` generuje (raz, przy buildzie) po jednym pliku na poziom
+szczegółowości (``ZOOM_LEVELS``):
+
+1. Topologia — pierścienie dzielimy na łuki w węzłach (punktach, w których zmienia się
+   zbiór sąsiadujących dzielnic). Wspólna granica dwóch dzielnic to jeden łuk.
+2. Douglas–Peucker na każdym łuku osobno, z zachowaniem końców. Wspólny łuk jest
+   upraszczany raz i tak samo dla obu dzielnic — nie powstają szczeliny ani zakładki.
+3. Kwantyzacja — współrzędne łuków zaokrąglamy do siatki dobranej do zoomu (mniej
+   cyfr w JSON); końce łuków trafiają w te same punkty siatki u obu sąsiadów.
+
+Pliki mają w nazwie skrót treści (``districts.z12.<hash>.geojson``), warianty
+``.gz``/``.br`` i ``manifest.json``; serwuje je ``DistrictBoundariesView`` z nagłówkiem
+``Cache-Control: immutable``.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import math
+import os
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.gis.geos import GEOSGeometry
+
+try:
+    import brotli
+except ImportError:  # brotli jest opcjonalny — bez niego generujemy tylko .gz
+    brotli = None
+
+
+DEFAULT_OUTPUT_DIR = Path(__file__).resolve().parent / 'static' / 'map' / 'boundaries'
+MANIFEST_NAME = 'manifest.json'
+ZOOM_LEVELS = (10, 12, 14)
+
+
+def get_output_dir():
+    return Path(getattr(settings, 'CITYFEEL_DISTRICT_BOUNDARIES_DIR', DEFAULT_OUTPUT_DIR))
+
+
+def tolerance_for_zoom(zoom):
+    """Tolerancja uproszczenia w stopniach: pół piksela kafla 256 px na danym zoomie."""
+    return 360.0 / (256 * 2 ** zoom) / 2
+
+
+def precision_for_zoom(zoom):
+    """Liczba cyfr po przecinku — krok siatki nie większy niż 1/4 tolerancji."""
+    return max(0, math.ceil(-math.log10(tolerance_for_zoom(zoom) / 4)))
+
+
+# --- Wejście -------------------------------------------------------------------------
+
+def extract_districts(data):
+    """
+    Zwraca listę ``(nazwa, polygons)`` z GeoJSON, gdzie ``polygons`` to lista
+    poligonów, a poligon to lista pierścieni ``[(x, y), ...]`` (zamkniętych).
+    Punkty i obiekty bez nazwy pomijamy.
+    """
+    result = []
+    for feature in data.get('features', []):
+        name = (feature.get('properties') or {}).get('name')
+        geom = feature.get('geometry') or {}
+        if not name:
+            continue
+        if geom.get('type') == 'Polygon':
+            polygons = [geom['coordinates']]
+        elif geom.get('type') == 'MultiPolygon':
+            polygons = geom['coordinates']
+        else:
+            continue
+        result.append((
+            name,
+            [[[tuple(point[:2]) for point in ring] for ring in polygon] for polygon in polygons],
+        ))
+    return result
+
+
+def _open_ring(ring):
+    """Pierścień jako lista otwarta (bez punktu zamykającego i powtórzeń) lub None."""
+    points = []
+    for point in ring:
+        if not points or points[-1] != point:
+            points.append(point)
+    if len(points) > 1 and points[0] == points[-1]:
+        points.pop()
+    return points if len(points) >= 3 else None
+
+
+# --- Topologia -----------------------------------------------------------------------
+
+def _find_junctions(rings):
+    """
+    Węzły topologii: punkty, które w różnych wystąpieniach mają różnych sąsiadów
+    (koniec wspólnej granicy, styk trzech dzielnic). Wewnątrz wspólnego odcinka
+    sąsiedzi są ci sami, tylko w odwrotnej kolejności.
+    """
+    neighbours = defaultdict(set)
+    for ring in rings:
+        n = len(ring)
+        for i, point in enumerate(ring):
+            neighbours[point].add(frozenset((ring[i - 1], ring[(i + 1) % n])))
+    return {point for point, pairs in neighbours.items() if len(pairs) > 1}
+
+
+def _canonical_closed(ring):
+    """Pierścień bez węzłów jako łuk zamknięty: start w najmniejszym punkcie, kierunek min."""
+    start = ring.index(min(ring))
+    forward = ring[start:] + ring[:start]
+    backward = [forward[0]] + forward[:0:-1]
+    arc = min(forward, backward)
+    return tuple(arc + [arc[0]]), arc is backward
+
+
+def _split_ring(ring, junctions):
+    """Dzieli otwarty pierścień na łuki (krotki punktów) zaczynające i kończące się w węzłach."""
+    cuts = [i for i, point in enumerate(ring) if point in junctions]
+    if not cuts:
+        return None
+    rotated = ring[cuts[0]:] + ring[:cuts[0]]
+    rotated.append(rotated[0])
+
+    arcs, current = [], [rotated[0]]
+    for point in rotated[1:]:
+        current.append(point)
+        if point in junctions:
+            arcs.append(tuple(current))
+            current = [point]
+    return arcs
+
+
+class Topology:
+    """Zbiór unikalnych łuków i pierścieni zapisanych jako odwołania do łuków."""
+
+    def __init__(self):
+        self.arcs = []
+        self._index = {}
+        self.arc_min_points = []
+
+    def _add_arc(self, arc, reversed_=False):
+        key = min(arc, arc[::-1])
+        if key not in self._index:
+            self._index[key] = len(self.arcs)
+            self.arcs.append(key)
+            self.arc_min_points.append(2)
+        return self._index[key], reversed_ or key != arc
+
+    def add_ring(self, ring, junctions):
+        arcs = _split_ring(ring, junctions)
+        if arcs is None:
+            arc, reversed_ = _canonical_closed(ring)
+            refs = [self._add_arc(arc, reversed_)]
+        else:
+            refs = [self._add_arc(arc) for arc in arcs]
+
+        return refs
+
+    def require_points(self, refs):
+        """Pierścień musi mieć ≥ 3 różne punkty: k łuków po m punktów daje k·(m-1)."""
+        needed = 1 + math.ceil(3 / len(refs))
+        for index, _ in refs:
+            self.arc_min_points[index] = max(self.arc_min_points[index], needed)
+
+    def ring_coordinates(self, refs, simplified):
+        coords = []
+        for index, reversed_ in refs:
+            arc = simplified[index]
+            if reversed_:
+                arc = arc[::-1]
+            coords.extend(arc if not coords else arc[1:])
+        return coords
+
+
+# --- Upraszczanie --------------------------------------------------------------------
+
+def _segment_distance(point, start, end):
+    (px, py), (ax, ay), (bx, by) = point, start, end
+    dx, dy = bx - ax, by - ay
+    length2 = dx * dx + dy * dy
+    if length2 == 0:
+        return math.hypot(px - ax, py - ay)
+    t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length2))
+    return math.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+
+def _farthest(points, i, j):
+    best, best_distance = None, -1.0
+    for k in range(i + 1, j):
+        distance = _segment_distance(points[k], points[i], points[j])
+        if distance > best_distance:
+            best, best_distance = k, distance
+    return best, best_distance
+
+
+def simplify_arc(points, tolerance, min_points=2):
+    """Douglas–Peucker z zachowanymi końcami; zostawia co najmniej ``min_points`` punktów."""
+    n = len(points)
+    if n <= max(2, min_points):
+        return list(points)
+
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        i, j = stack.pop()
+        k, distance = _farthest(points, i, j)
+        if k is not None and distance > tolerance:
+            keep[k] = True
+            stack.extend(((i, k), (k, j)))
+
+    while sum(keep) < min_points:
+        kept = [i for i, flag in enumerate(keep) if flag]
+        candidates = [_farthest(points, i, j) for i, j in zip(kept, kept[1:])]
+        k, _ = max((c for c in candidates if c[0] is not None), key=lambda c: c[1])
+        keep[k] = True
+
+    return [point for point, flag in zip(points, keep) if flag]
+
+
+def _quantize_arc(arc, digits):
+    points = []
+    for x, y in arc:
+        point = (round(x, digits), round(y, digits))
+        if not points or points[-1] != point:
+            points.append(point)
+    return points
+
+
+def _is_valid(geometry):
+    # GEOS loguje każdy problem jako GEOS_NOTICE — tu to oczekiwana informacja, nie błąd.
+    gis_logger = logging.getLogger('django.contrib.gis')
+    level = gis_logger.level
+    gis_logger.setLevel(logging.ERROR)
+    try:
+        return GEOSGeometry(json.dumps(geometry)).valid
+    finally:
+        gis_logger.setLevel(level)
+
+
+def simplify_districts(districts, zoom, max_refinements=6):
+    """
+    Zwraca FeatureCollection z granicami uproszczonymi dla danego zoomu.
+
+    Douglas–Peucker i kwantyzacja mogą „złożyć” wąskie fragmenty w samoprzecięcie —
+    łukom niepoprawnych dzielnic zmniejszamy wtedy tolerancję o połowę (a w ostatnim
+    kroku nie upraszczamy ich wcale). Łuki są wspólne, więc sąsiad dostaje tę samą zmianę.
+    """
+    digits = precision_for_zoom(zoom)
+
+    opened = []
+    for name, polygons in districts:
+        shapes = []
+        for polygon in polygons:
+            rings = [_open_ring(ring) for ring in polygon]
+            if rings[0] is None:
+                continue
+            shapes.append([ring for ring in rings if ring is not None])
+        if shapes:
+            opened.append((name, shapes))
+
+    junctions = _find_junctions(ring for _, shapes in opened for shape in shapes for ring in shape)
+    topology = Topology()
+    refs = [
+        (name, [[topology.add_ring(ring, junctions) for ring in shape] for shape in shapes])
+        for name, shapes in opened
+    ]
+    tolerances = [tolerance_for_zoom(zoom)] * len(topology.arcs)
+
+    for attempt in range(max_refinements + 1):
+        simplified = [
+            _quantize_arc(simplify_arc(arc, tolerance, min_points), digits)
+            for arc, tolerance, min_points in zip(topology.arcs, tolerances, topology.arc_min_points)
+        ]
+        features, invalid_arcs = [], set()
+        for name, shapes in refs:
+            coordinates, valid = [], True
+            for shape in shapes:
+                polygon = []
+                for ring in shape:
+                    coords = topology.ring_coordinates(ring, simplified)
+                    if len(coords) < 4:
+                        # Zdegenerowany pierścień: wymuszamy więcej punktów na jego łukach
+                        topology.require_points(ring)
+                        valid = False
+                    polygon.append([list(point) for point in coords])
+                coordinates.append(polygon)
+
+            geometry = {'type': 'MultiPolygon', 'coordinates': coordinates}
+            if not valid or not _is_valid(geometry):
+                invalid_arcs.update(index for shape in shapes for ring in shape for index, _ in ring)
+            features.append({'type': 'Feature', 'properties': {'name': name}, 'geometry': geometry})
+
+        if not invalid_arcs:
+            break
+        for index in invalid_arcs:
+            tolerances[index] = tolerances[index] / 2 if attempt < max_refinements - 1 else 0
+
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+# --- Pliki ---------------------------------------------------------------------------
+
+def _write(path, content):
+    with open(path, 'wb') as f:
+        f.write(content)
+
+
+def build_assets(data, output_dir=None, zoom_levels=ZOOM_LEVELS):
+    """
+    Generuje pliki LOD z odciskiem treści w nazwie (+ .gz, + .br jeśli jest brotli)
+    i ``manifest.json`` ``{zoom: nazwa_pliku}``. Stare pliki są usuwane. Zwraca manifest.
+    """
+    output_dir = Path(output_dir or get_output_dir())
+    output_dir.mkdir(parents=True, exist_ok=True)
+    districts = extract_districts(data)
+
+    manifest = {}
+    for zoom in zoom_levels:
+        collection = simplify_districts(districts, zoom)
+        content = json.dumps(collection, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        digest = hashlib.sha256(content).hexdigest()[:12]
+        filename = f'districts.z{zoom}.{digest}.geojson'
+
+        _write(output_dir / filename, content)
+        # mtime=0 — ten sam plik wejściowy daje bajt w bajt te same artefakty
+        _write(output_dir / f'{filename}.gz', gzip.compress(content, compresslevel=9, mtime=0))
+        if brotli is not None:
+            _write(output_dir / f'{filename}.br', brotli.compress(content, quality=11))
+        manifest[str(zoom)] = filename
+
+    _write(output_dir / MANIFEST_NAME, json.dumps(manifest, indent=2).encode('utf-8') + b'\n')
+
+    current = set(manifest.values())
+    for path in output_dir.glob('districts.z*.geojson*'):
+        if path.name.split('.geojson')[0] + '.geojson' not in current:
+            os.remove(path)
+
+    _load_manifest.cache_clear()
+    return manifest
+
+
+def get_manifest():
+    """Manifest ``{zoom: plik}`` (pusty, jeśli granice nie zostały jeszcze zbudowane)."""
+    return _load_manifest(str(get_output_dir()))
+
+
+@lru_cache(maxsize=4)
+def _load_manifest(output_dir):
+    path = Path(output_dir) / MANIFEST_NAME
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
@@ -0,0 +1,154 @@
+"""
+Indeks dzielnic w pamięci procesu: przygotowane geometrie + STR-tree po obwiedniach.
+
+Budowany raz (leniwie, przy pierwszym użyciu) z tabeli ``map_district`` i trzymany do
+końca życia procesu — bez ``cache.get`` i rozpakowywania poligonów przy każdym żądaniu.
+Zapytanie o punkt to przejście po drzewie obwiedni (kilka porównań liczb) i test
+``covers`` na przygotowanej geometrii tylko dla kandydatów.
+
+- ``district_of(point)`` — id dzielnicy zawierającej punkt (lub None),
+- ``districts_of(points)`` — to samo dla wielu punktów (np. paczka ``bulk_create``),
+- ``get_index().ids_by_name`` / ``.names`` — nazwy dzielnic dla generatorów danych.
+
+Indeks jest unieważniany sygnałami zapisu/usunięcia ``District`` (``map.signals``) oraz
+przez ``load_districts``. Inne procesy zobaczą nowe granice po restarcie — dlatego
+``Location.save`` i filtr dzielnic listy lokalizacji (długo żyjące procesy) pytają bazę,
+a indeks służy zapytaniom o punkty i jednorazowym importom.
+"""
+import math
+import threading
+
+from django.contrib.gis.geos import Point
+
+
+class STRtree:
+    """
+    Statyczne R-drzewo pakowane metodą Sort-Tile-Recursive.
+    ``items`` to pary ``((xmin, ymin, xmax, ymax), wartość)``.
+    """
+
+    def __init__(self, items, node_capacity=8):
+        self.node_capacity = node_capacity
+        # Węzeł: (obwiednia, dzieci, czy_liść); w liściu dzieci to pary (obwiednia, wartość)
+        level = [(envelope, value, True) for envelope, value in items]
+        self.root = None
+        if not level:
+            return
+        while True:
+            level = self._pack(level)
+            if len(level) == 1:
+                self.root = level[0]
+                return
+
+    def _pack(self, entries):
+        capacity = self.node_capacity
+        node_count = math.ceil(len(entries) / capacity)
+        slice_size = math.ceil(math.sqrt(node_count)) * capacity
+
+        by_x = sorted(entries, key=lambda e: e[0][0] + e[0][2])
+        nodes = []
+        for start in range(0, len(by_x), slice_size):
+            vertical_slice = sorted(by_x[start:start + slice_size], key=lambda e: e[0][1] + e[0][3])
+            for offset in range(0, len(vertical_slice), capacity):
+                children = vertical_slice[offset:offset + capacity]
+                envelope = (
+                    min(c[0][0] for c in children),
+                    min(c[0][1] for c in children),
+                    max(c[0][2] for c in children),
+                    max(c[0][3] for c in children),
+                )
+                nodes.append((envelope, children, False))
+        return nodes
+
+    def query_point(self, x, y):
+        """Wartości, których obwiednia zawiera punkt (x, y)."""
+        if self.root is None:
+            return []
+        result, stack = [], [self.root]
+        while stack:
+            (xmin, ymin, xmax, ymax), payload, is_leaf = stack.pop()
+            if not (xmin <= x <= xmax and ymin <= y <= ymax):
+                continue
+            if is_leaf:
+                result.append(payload)
+            else:
+                stack.extend(payload)
+        return result
+
+
+class DistrictIndex:
+    """Dzielnice w pamięci: geometrie, nazwy i STR-tree po obwiedniach."""
+
+    def __init__(self, districts):
+        # districts: iterowalne (id, nazwa, geometria), kolejność wg nazwy
+        self.geometries = {}
+        self.names = []
+        self.ids_by_name = {}
+        items = []
+        for order, (pk, name, geometry) in enumerate(districts):
+            self.geometries[pk] = geometry
+            self.names.append(name)
+            self.ids_by_name[name] = pk
+            items.append((geometry.extent, (order, pk)))
+        self.tree = STRtree(items)
+        # Przygotowane geometrie GEOS budują wewnętrzne indeksy leniwie i nie są bezpieczne
+        # wątkowo — każdy wątek dostaje własny komplet.
+        self._local = threading.local()
+
+    @classmethod
+    def from_database(cls):
+        from map.models import District
+
+        return cls(District.objects.order_by('name').values_list('id', 'name', 'geometry'))
+
+    def _prepared(self):
+        prepared = getattr(self._local, 'prepared', None)
+        if prepared is None:
+            prepared = {pk: geometry.prepared for pk, geometry in self.geometries.items()}
+            self._local.prepared = prepared
+        return prepared
+
+    def district_of(self, point):
+        """Id dzielnicy zawierającej punkt (przy styku granic — pierwsza wg nazwy) lub None."""
+        if not isinstance(point, Point):
+            point = Point(*point, srid=4326)
+        candidates = self.tree.query_point(point.x, point.y)
+        if not candidates:
+            return None
+        prepared = self._prepared()
+        for _, pk in sorted(candidates):
+            if prepared[pk].covers(point):
+                return pk
+        return None
+
+    def districts_of(self, points):
+        """Lista id dzielnic (lub None) dla punktów — ``Point`` albo par ``(lon, lat)``."""
+        return [self.district_of(point) for point in points]
+
+
+_index = None
+_lock = threading.Lock()
+
+
+def get_index():
+    global _index
+    if _index is None:
+        with _lock:
+            if _index is None:
+                _index = DistrictIndex.from_database()
+    return _index
+
+
+def reset_index():
+    """Unieważnia indeks — zostanie zbudowany od nowa przy następnym użyciu."""
+    global _index
+    with _lock:
+        _index = None
+
+
+def district_of(point):
+    return get_index().district_of(point)
+
+
+def districts_of(points):
+    return get_index().districts_of(points)
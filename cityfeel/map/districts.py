@@ -0,0 +1,60 @@
+"""
+Dzielnice Gdańska: wczytywanie granic z export.geojson i przypisywanie lokalizacji.
+
+Granice trzymamy w tabeli ``map_district`` (MultiPolygon z indeksem GIST), a każda
+lokalizacja ma ``district_id`` ustawione raz — przy wstawieniu (``Location.save``) albo
+zbiorczo przez ``assign_districts()`` po ``bulk_create`` / przeładowaniu granic.
+"""
+import json
+import os
+
+from django.conf import settings
+from django.contrib.gis.geos import GEOSGeometry, MultiPolygon
+from django.db.models import OuterRef, Subquery
+
+from map.models import District, Location
+
+
+def find_geojson_path():
+    """Zwraca ścieżkę do export.geojson (lokalnie lub w kontenerze) albo None."""
+    possible_paths = [
+        os.path.join(settings.BASE_DIR, 'export.geojson'),
+        os.path.join(settings.BASE_DIR, '..', 'export.geojson'),
+        '/app/export.geojson',
+        '/app/cityfeel/export.geojson',
+    ]
+    for path in possible_paths:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def iter_district_features(data):
+    """Zwraca pary (nazwa, MultiPolygon) — tylko poligony z nazwą, punkty pomijamy."""
+    for feature in data.get('features', []):
+        name = (feature.get('properties') or {}).get('name')
+        geom = feature.get('geometry')
+        if not name or not geom or geom.get('type') not in ('Polygon', 'MultiPolygon'):
+            continue
+
+        geometry = GEOSGeometry(json.dumps(geom), srid=4326)
+        if geometry.geom_type == 'Polygon':
+            geometry = MultiPolygon(geometry, srid=4326)
+        yield name, geometry
+
+
+def assign_districts(only_missing=True):
+    """
+    Przypisuje dzielnice lokalizacjom jednym UPDATE z JOIN-em przestrzennym.
+
+    Domyślnie tylko lokalizacjom bez dzielnicy (po ``bulk_create``); z
+    ``only_missing=False`` — wszystkim (po przeładowaniu granic). Zwraca liczbę wierszy.
+    """
+    qs = Location.objects.all()
+    if only_missing:
+        qs = qs.filter(district__isnull=True)
+
+    matching = District.objects.filter(
+        geometry__intersects=OuterRef('coordinates')
+    ).order_by('name').values('id')[:1]
+    return qs.update(district=Subquery(matching))
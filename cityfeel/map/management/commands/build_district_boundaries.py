@@ -0,0 +1,39 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from map import boundaries, districts
+
+
+class Command(BaseCommand):
+    help = "Generuje uproszczone granice dzielnic (LOD per zoom, .gz/.br) do serwowania jako pliki statyczne"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            nargs="?",
+            help="Ścieżka do pliku GeoJSON (domyślnie export.geojson obok manage.py lub w katalogu wyżej)",
+        )
+        parser.add_argument(
+            "--output",
+            help="Katalog docelowy (domyślnie map/static/map/boundaries)",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"] or districts.find_geojson_path()
+        if not path:
+            raise CommandError("Nie znaleziono export.geojson — podaj ścieżkę do pliku.")
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Nie udało się wczytać {path}: {e}")
+
+        if boundaries.brotli is None:
+            self.stdout.write(self.style.WARNING("Brak pakietu brotli — generuję tylko warianty .gz."))
+
+        manifest = boundaries.build_assets(data, options["output"])
+        for zoom, filename in manifest.items():
+            self.stdout.write(f"  z{zoom}: {filename}")
+        self.stdout.write(self.style.SUCCESS(f"Gotowe. Poziomy szczegółowości: {len(manifest)}."))
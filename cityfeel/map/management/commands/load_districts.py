@@ -0,0 +1,47 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from map import district_index, districts
+from map.models import District
+
+
+class Command(BaseCommand):
+    help = "Wczytuje granice dzielnic z export.geojson i przypisuje dzielnice lokalizacjom"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            nargs="?",
+            help="Ścieżka do pliku GeoJSON (domyślnie export.geojson obok manage.py lub w katalogu wyżej)",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"] or districts.find_geojson_path()
+        if not path:
+            raise CommandError("Nie znaleziono export.geojson — podaj ścieżkę do pliku.")
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Nie udało się wczytać {path}: {e}")
+
+        features = list(districts.iter_district_features(data))
+        if not features:
+            raise CommandError(f"Plik {path} nie zawiera poligonów dzielnic.")
+
+        with transaction.atomic():
+            for name, geometry in features:
+                District.objects.update_or_create(name=name, defaults={"geometry": geometry})
+            # Dzielnice, których nie ma już w pliku, znikają (lokalizacje dostaną SET NULL,
+            # a poniżej nowe przypisanie).
+            removed, _ = District.objects.exclude(name__in=[name for name, _ in features]).delete()
+            assigned = districts.assign_districts(only_missing=False)
+        district_index.reset_index()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Gotowe. Wczytano {len(features)} dzielnic (usunięto {removed}), "
+            f"przypisano dzielnice {assigned} lokalizacjom."
+        ))
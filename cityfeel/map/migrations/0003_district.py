@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:12
+
+import django.contrib.gis.db.models.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('map', '0002_alter_location_options_alter_location_coordinates_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='District',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Nazwa dzielnicy', max_length=100, unique=True)),
+                ('geometry', django.contrib.gis.db.models.fields.MultiPolygonField(help_text='Granica dzielnicy', srid=4326)),
+            ],
+            options={
+                'verbose_name': 'Dzielnica',
+                'verbose_name_plural': 'Dzielnice',
+                'db_table': 'map_district',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='location',
+            name='district',
+            field=models.ForeignKey(blank=True, help_text='Dzielnica, w której leży lokalizacja (przypisywana przy zapisie)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='locations', to='map.district'),
+        ),
+    ]
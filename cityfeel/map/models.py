@@ -1,4 +1,34 @@
 from django.contrib.gis.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db.models.functions import Upper
+
+
+class District(models.Model):
+    """
+    Dzielnica Gdańska (granica administracyjna z export.geojson).
+    Ładowana komendą ``manage.py load_districts``; lokalizacje dostają ``district``
+    przy zapisie, więc filtr dzielnic to zwykłe ``district_id IN (...)``.
+    """
+    name = models.CharField(
+        max_length=100,
+        unique=True,
+        help_text="Nazwa dzielnicy"
+    )
+
+    # spatial_index=True (domyślnie) — indeks GIST pod przypisywanie lokalizacji
+    geometry = models.MultiPolygonField(
+        srid=4326,
+        help_text="Granica dzielnicy"
+    )
+
+    class Meta:
+        verbose_name = "Dzielnica"
+        verbose_name_plural = "Dzielnice"
+        db_table = "map_district"
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
 
 
 class Location(models.Model):
@@ -16,16 +46,40 @@ class Location(models.Model):
         help_text="Współrzędne geograficzne (długość, szerokość)"
     )
 
+    district = models.ForeignKey(
+        District,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='locations',
+        help_text="Dzielnica, w której leży lokalizacja (przypisywana przy zapisie)"
+    )
+
     class Meta:
         verbose_name = "Lokalizacja"
         verbose_name_plural = "Lokalizacje"
         db_table = "map_location"
         indexes = [
             models.Index(fields=['name'], name='location_name_idx'),
+            # Trigramy na UPPER(name): obsługują icontains (UPPER(...) LIKE UPPER('%q%'))
+            # i wyszukiwanie z tolerancją literówek w api.search
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='location_name_trgm_idx'),
         ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # Dzielnicę przypisujemy raz, przy wstawieniu (JOIN przestrzenny po indeksie GIST).
+        # Zapis idzie do bazy, nie do indeksu w pamięci procesu: inne procesy mogą trzymać
+        # granice sprzed ``load_districts`` (nieistniejące już id). bulk_create omija save()
+        # — tam: districts.assign_districts().
+        if self._state.adding and self.district_id is None and self.coordinates is not None:
+            self.district_id = (
+                District.objects.filter(geometry__intersects=self.coordinates)
+                .order_by('name').values_list('id', flat=True).first()
+            )
+        super().save(*args, **kwargs)
+
     def get_coordinates_display(self):
         return f"Lat: {self.coordinates.y}, Lon: {self.coordinates.x}"
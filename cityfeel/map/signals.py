@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import District
+from . import district_index
+
+
+@receiver(post_save, sender=District)
+@receiver(post_delete, sender=District)
+def reset_district_index(sender, **kwargs):
+    # Granice się zmieniły — indeks w pamięci zbuduje się od nowa przy następnym użyciu.
+    district_index.reset_index()
@@ -0,0 +1,131 @@
+"""
+Testy uproszczonych granic dzielnic: topologia wspólnych krawędzi, kwantyzacja,
+pliki z odciskiem treści i widok serwujący je z nagłówkami cache.
+"""
+import gzip
+import json
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from map import boundaries
+
+User = get_user_model()
+
+
+def _zigzag(n=40, amplitude=1e-6):
+    """Postrzępiona (poniżej tolerancji) pionowa krawędź x≈18.5 od y=54.0 do y=54.4."""
+    return [(18.5 + (amplitude if i % 2 else 0), 54.0 + 0.4 * i / n) for i in range(n + 1)]
+
+
+def _two_districts():
+    edge = _zigzag()
+    west = [(18.0, 54.0)] + edge + [(18.0, 54.4), (18.0, 54.0)]
+    east = [edge[-1]] + edge[-2::-1] + [(19.0, 54.0), (19.0, 54.4), edge[-1]]
+    return {
+        'type': 'FeatureCollection',
+        'features': [
+            {'type': 'Feature', 'properties': {'name': 'Zachód'},
+             'geometry': {'type': 'Polygon', 'coordinates': [[list(p) for p in west]]}},
+            {'type': 'Feature', 'properties': {'name': 'Wschód'},
+             'geometry': {'type': 'Polygon', 'coordinates': [[list(p) for p in east]]}},
+            {'type': 'Feature', 'properties': {'name': 'Punkt'},
+             'geometry': {'type': 'Point', 'coordinates': [18.2, 54.2]}},
+        ],
+    }
+
+
+class SimplifyDistrictsTestCase(SimpleTestCase):
+    """Upraszczanie z zachowaniem topologii."""
+
+    def setUp(self):
+        self.districts = boundaries.extract_districts(_two_districts())
+        self.collection = boundaries.simplify_districts(self.districts, 12)
+        self.rings = {
+            f['properties']['name']: f['geometry']['coordinates'][0][0]
+            for f in self.collection['features']
+        }
+
+    def test_points_are_skipped(self):
+        self.assertEqual(sorted(self.rings), ['Wschód', 'Zachód'])
+
+    def test_shared_edge_is_simplified_identically(self):
+        west = {tuple(p) for p in self.rings['Zachód']}
+        east = {tuple(p) for p in self.rings['Wschód']}
+        shared = west & east
+        # Zygzak znika, zostają tylko końce wspólnej krawędzi — u obu sąsiadów te same
+        self.assertEqual(shared, {(18.5, 54.0), (18.5, 54.4)})
+        self.assertEqual(len(self.rings['Zachód']), 5)
+        self.assertEqual(len(self.rings['Wschód']), 5)
+
+    def test_coordinates_are_quantized(self):
+        digits = boundaries.precision_for_zoom(12)
+        for ring in self.rings.values():
+            for x, y in ring:
+                self.assertEqual(x, round(x, digits))
+                self.assertEqual(y, round(y, digits))
+
+    def test_rings_stay_closed(self):
+        for ring in self.rings.values():
+            self.assertEqual(ring[0], ring[-1])
+
+    def test_simplify_arc_keeps_min_points(self):
+        arc = [(0.0, 0.0), (1.0, 0.001), (2.0, 0.0), (1.0, -0.001), (0.0, 0.0)]
+        self.assertEqual(len(boundaries.simplify_arc(arc, tolerance=1.0, min_points=4)), 4)
+
+
+class DistrictBoundariesAssetsTestCase(TestCase):
+    """Pliki z odciskiem treści, manifest i widok serwujący."""
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.override = override_settings(CITYFEEL_DISTRICT_BOUNDARIES_DIR=self.output_dir)
+        self.override.enable()
+        self.manifest = boundaries.build_assets(_two_districts(), zoom_levels=(10, 14))
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.output_dir)
+
+    def test_manifest_lists_fingerprinted_files(self):
+        self.assertEqual(sorted(self.manifest), ['10', '14'])
+        self.assertEqual(boundaries.get_manifest(), self.manifest)
+        self.assertRegex(self.manifest['10'], r'^districts\.z10\.[0-9a-f]{12}\.geojson$')
+
+    def test_build_is_deterministic(self):
+        self.assertEqual(boundaries.build_assets(_two_districts(), zoom_levels=(10, 14)), self.manifest)
+
+    def test_view_serves_gzip_with_immutable_cache(self):
+        url = reverse('map:district_boundaries', args=[self.manifest['10']])
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'application/geo+json')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+        data = json.loads(gzip.decompress(b''.join(response.streaming_content)))
+        self.assertEqual(len(data['features']), 2)
+
+    def test_view_serves_identity_without_accept_encoding(self):
+        url = reverse('map:district_boundaries', args=[self.manifest['14']])
+        response = self.client.get(url)
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(json.loads(b''.join(response.streaming_content))['type'], 'FeatureCollection')
+
+    def test_unknown_file_returns_404(self):
+        url = reverse('map:district_boundaries', args=['manifest.json'])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_location_list_references_files_instead_of_inlining(self):
+        User.objects.create_user(username='u', password='testpass123')
+        self.client.login(username='u', password='testpass123')
+        response = self.client.get(reverse('map:location_list'))
+
+        urls = json.loads(response.context['district_boundaries_json'])
+        self.assertEqual(urls['10'], reverse('map:district_boundaries', args=[self.manifest['10']]))
+        self.assertNotIn('geojson_data', response.context)
@@ -0,0 +1,106 @@
+"""
+Testy indeksu dzielnic w pamięci (STR-tree + przygotowane geometrie).
+"""
+import random
+
+from django.contrib.gis.geos import MultiPolygon, Point, Polygon
+from django.test import SimpleTestCase, TestCase
+
+from map import district_index
+from map.district_index import DistrictIndex, STRtree
+from map.models import District, Location
+
+
+def _square(x0, y0, x1, y1):
+    return MultiPolygon(Polygon(((x0, y0), (x1, y0), (x1, y1), (x0, y1), (x0, y0))), srid=4326)
+
+
+class STRtreeTestCase(SimpleTestCase):
+    """Wynik drzewa zgadza się z przeszukaniem wszystkich obwiedni."""
+
+    def test_query_matches_brute_force(self):
+        rng = random.Random(7)
+        boxes = []
+        for i in range(200):
+            x, y = rng.uniform(0, 100), rng.uniform(0, 100)
+            boxes.append(((x, y, x + rng.uniform(0, 10), y + rng.uniform(0, 10)), i))
+        tree = STRtree(boxes, node_capacity=4)
+
+        for _ in range(100):
+            px, py = rng.uniform(0, 110), rng.uniform(0, 110)
+            expected = {i for (x0, y0, x1, y1), i in boxes if x0 <= px <= x1 and y0 <= py <= y1}
+            self.assertEqual(set(tree.query_point(px, py)), expected)
+
+    def test_empty_tree(self):
+        self.assertEqual(STRtree([]).query_point(0, 0), [])
+
+
+class DistrictIndexTestCase(SimpleTestCase):
+    """district_of / districts_of na przygotowanych geometriach."""
+
+    def setUp(self):
+        # Kształt L: obwiednia „Zachodu” obejmuje też fragment „Wschodu”
+        west = MultiPolygon(Polygon((
+            (18.0, 54.0), (18.6, 54.0), (18.6, 54.2), (18.4, 54.2), (18.4, 54.5), (18.0, 54.5), (18.0, 54.0),
+        )), srid=4326)
+        east = MultiPolygon(Polygon((
+            (18.6, 54.0), (19.0, 54.0), (19.0, 54.5), (18.4, 54.5), (18.4, 54.2), (18.6, 54.2), (18.6, 54.0),
+        )), srid=4326)
+        self.index = DistrictIndex([(2, 'Wschód', east), (1, 'Zachód', west)])
+
+    def test_point_inside(self):
+        self.assertEqual(self.index.district_of(Point(18.1, 54.1, srid=4326)), 1)
+        self.assertEqual(self.index.district_of(Point(18.9, 54.4, srid=4326)), 2)
+
+    def test_point_in_envelope_but_outside_polygon(self):
+        # (18.5, 54.3) leży w obwiedni „Zachodu”, ale w poligonie „Wschodu”
+        self.assertEqual(self.index.district_of(Point(18.5, 54.3, srid=4326)), 2)
+
+    def test_point_outside_all(self):
+        self.assertIsNone(self.index.district_of(Point(20.0, 55.0, srid=4326)))
+
+    def test_point_on_shared_border_picks_first_by_name(self):
+        self.assertEqual(self.index.district_of(Point(18.6, 54.1, srid=4326)), 2)
+
+    def test_districts_of_accepts_tuples(self):
+        self.assertEqual(
+            self.index.districts_of([(18.1, 54.1), (18.9, 54.4), (20.0, 55.0)]),
+            [1, 2, None],
+        )
+
+    def test_names(self):
+        self.assertEqual(self.index.names, ['Wschód', 'Zachód'])
+        self.assertEqual(self.index.ids_by_name, {'Wschód': 2, 'Zachód': 1})
+
+
+class DistrictIndexSingletonTestCase(TestCase):
+    """Indeks procesu budowany z bazy i unieważniany przy zmianie dzielnic."""
+
+    def setUp(self):
+        self.addCleanup(district_index.reset_index)
+        district_index.reset_index()
+
+    def test_built_once_and_reset_on_district_change(self):
+        west = District.objects.create(name='Zachód', geometry=_square(18.0, 54.0, 18.5, 54.5))
+        index = district_index.get_index()
+        self.assertIs(district_index.get_index(), index)
+        self.assertEqual(district_index.district_of(Point(18.2, 54.2, srid=4326)), west.pk)
+
+        with self.assertNumQueries(0):
+            district_index.districts_of([(18.2, 54.2), (18.3, 54.3)])
+
+        east = District.objects.create(name='Wschód', geometry=_square(18.5, 54.0, 19.0, 54.5))
+        self.assertIsNot(district_index.get_index(), index)
+        self.assertEqual(district_index.district_of(Point(18.8, 54.2, srid=4326)), east.pk)
+
+        east.delete()
+        self.assertIsNone(district_index.district_of(Point(18.8, 54.2, srid=4326)))
+
+    def test_location_save_ignores_stale_index(self):
+        # Inny proces zmienił granice (bez sygnałów w tym procesie) — zapis idzie po bazie
+        west = District.objects.create(name='Zachód', geometry=_square(18.0, 54.0, 18.5, 54.5))
+        district_index.get_index()
+        District.objects.filter(pk=west.pk).update(geometry=_square(18.5, 54.0, 19.0, 54.5))
+
+        location = Location.objects.create(name='Port', coordinates=Point(18.8, 54.2, srid=4326))
+        self.assertEqual(location.district_id, west.pk)
@@ -0,0 +1,162 @@
+"""
+Testy dzielnic: komenda load_districts, przypisywanie dzielnicy przy zapisie
+lokalizacji oraz filtr dzielnic na liście lokalizacji (district_id IN).
+"""
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import MultiPolygon, Point, Polygon
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from map import district_index
+from map.districts import assign_districts
+from map.models import District, Location
+
+User = get_user_model()
+
+
+def _square(x0, y0, x1, y1):
+    return MultiPolygon(Polygon(((x0, y0), (x1, y0), (x1, y1), (x0, y1), (x0, y0))), srid=4326)
+
+
+class LoadDistrictsCommandTestCase(TestCase):
+    """Komenda load_districts wczytuje poligony z GeoJSON i przypisuje lokalizacje."""
+
+    def setUp(self):
+        self.addCleanup(district_index.reset_index)
+        geojson = {
+            "type": "FeatureCollection",
+            "features": [
+                {
+                    "type": "Feature",
+                    "properties": {"name": "Zachód"},
+                    "geometry": {
+                        "type": "Polygon",
+                        "coordinates": [[[18.0, 54.0], [18.5, 54.0], [18.5, 54.5], [18.0, 54.5], [18.0, 54.0]]],
+                    },
+                },
+                {
+                    "type": "Feature",
+                    "properties": {"name": "Wschód"},
+                    "geometry": {
+                        "type": "Polygon",
+                        "coordinates": [[[18.5, 54.0], [19.0, 54.0], [19.0, 54.5], [18.5, 54.5], [18.5, 54.0]]],
+                    },
+                },
+                {
+                    "type": "Feature",
+                    "properties": {"name": "Punkt"},
+                    "geometry": {"type": "Point", "coordinates": [18.2, 54.2]},
+                },
+            ],
+        }
+        handle, self.path = tempfile.mkstemp(suffix='.geojson')
+        with os.fdopen(handle, 'w', encoding='utf-8') as f:
+            json.dump(geojson, f)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_loads_polygons_and_skips_points(self):
+        call_command('load_districts', self.path, stdout=StringIO())
+
+        self.assertEqual(list(District.objects.values_list('name', flat=True)), ['Wschód', 'Zachód'])
+        self.assertEqual(District.objects.get(name='Zachód').geometry.geom_type, 'MultiPolygon')
+
+    def test_assigns_existing_locations(self):
+        location = Location.objects.create(name='Przed', coordinates=Point(18.7, 54.2, srid=4326))
+        self.assertIsNone(location.district)
+
+        call_command('load_districts', self.path, stdout=StringIO())
+
+        location.refresh_from_db()
+        self.assertEqual(location.district.name, 'Wschód')
+
+    def test_reload_removes_missing_districts(self):
+        District.objects.create(name='Stara', geometry=_square(10, 10, 11, 11))
+        call_command('load_districts', self.path, stdout=StringIO())
+        self.assertFalse(District.objects.filter(name='Stara').exists())
+
+
+class LocationDistrictAssignmentTestCase(TestCase):
+    """Dzielnica lokalizacji jest ustalana raz — przy wstawieniu."""
+
+    def setUp(self):
+        # Rollback testu nie wysyła sygnałów — indeks w pamięci czyścimy sami
+        self.addCleanup(district_index.reset_index)
+        self.west = District.objects.create(name='Zachód', geometry=_square(18.0, 54.0, 18.5, 54.5))
+        self.east = District.objects.create(name='Wschód', geometry=_square(18.5, 54.0, 19.0, 54.5))
+
+    def test_district_assigned_on_create(self):
+        location = Location.objects.create(name='A', coordinates=Point(18.2, 54.2, srid=4326))
+        self.assertEqual(location.district, self.west)
+
+    def test_location_outside_districts(self):
+        location = Location.objects.create(name='Morze', coordinates=Point(20.0, 55.0, srid=4326))
+        self.assertIsNone(location.district)
+
+    def test_explicit_district_is_kept(self):
+        location = Location.objects.create(
+            name='B', coordinates=Point(18.2, 54.2, srid=4326), district=self.east
+        )
+        self.assertEqual(location.district, self.east)
+
+    def test_assign_districts_after_bulk_create(self):
+        Location.objects.bulk_create([
+            Location(name='C', coordinates=Point(18.2, 54.2, srid=4326)),
+            Location(name='D', coordinates=Point(18.8, 54.2, srid=4326)),
+        ])
+        self.assertEqual(assign_districts(), 2)
+        self.assertEqual(
+            dict(Location.objects.values_list('name', 'district__name')),
+            {'C': 'Zachód', 'D': 'Wschód'},
+        )
+
+
+class LocationListDistrictFilterTestCase(TestCase):
+    """Filtr dzielnic na liście lokalizacji."""
+
+    def setUp(self):
+        self.addCleanup(district_index.reset_index)
+        District.objects.create(name='Zachód', geometry=_square(18.0, 54.0, 18.5, 54.5))
+        District.objects.create(name='Wschód', geometry=_square(18.5, 54.0, 19.0, 54.5))
+        Location.objects.create(name='W1', coordinates=Point(18.2, 54.2, srid=4326))
+        Location.objects.create(name='E1', coordinates=Point(18.8, 54.2, srid=4326))
+        Location.objects.create(name='Poza', coordinates=Point(20.0, 55.0, srid=4326))
+
+        User.objects.create_user(username='u', password='testpass123')
+        self.client.login(username='u', password='testpass123')
+        self.url = reverse('map:location_list')
+
+    def _names(self, query=''):
+        response = self.client.get(self.url + query)
+        self.assertEqual(response.status_code, 200)
+        return sorted(loc.name for loc in response.context['locations'])
+
+    def test_single_district(self):
+        self.assertEqual(self._names('?district=Zachód'), ['W1'])
+
+    def test_multiple_districts(self):
+        self.assertEqual(self._names('?district=Zachód&district=Wschód'), ['E1', 'W1'])
+
+    def test_unknown_district_is_ignored(self):
+        self.assertEqual(self._names('?district=Nieznana'), ['E1', 'Poza', 'W1'])
+
+    def test_available_districts_from_table(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['available_districts'], ['Wschód', 'Zachód'])
+
+    def test_districts_added_behind_the_index(self):
+        district_index.get_index()
+        # bulk_create nie wysyła sygnałów — indeks procesu nie wie o nowej dzielnicy (jak inny worker)
+        District.objects.bulk_create([District(name='Nowa', geometry=_square(19.5, 54.5, 20.5, 55.5))])
+        Location.objects.filter(name='Poza').update(district=District.objects.get(name='Nowa'))
+
+        self.assertEqual(self._names('?district=Nowa'), ['Poza'])
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['available_districts'], ['Nowa', 'Wschód', 'Zachód'])
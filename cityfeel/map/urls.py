@@ -8,4 +8,5 @@ urlpatterns = [
     path('', views.EmotionMapView.as_view(), name='emotion_map'),
     path('lista/', views.LocationListView.as_view(), name='location_list'),
     path('location/<int:pk>/', views.LocationDetailView.as_view(), name='location_detail'),
+    path('granice/<str:filename>', views.DistrictBoundariesView.as_view(), name='district_boundaries'),
 ]
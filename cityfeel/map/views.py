@@ -1,69 +1,21 @@
-import os
 import json
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.views import View
 from django.views.generic import TemplateView, DetailView, ListView
-from django.db.models import Avg, Count, Max, F, Q
-from django.urls import reverse_lazy
+from django.db.models import F
+from django.urls import reverse, reverse_lazy
+from django.http import FileResponse, Http404
+from django.utils.cache import patch_vary_headers
 from django.shortcuts import redirect
 from django.contrib import messages
-from django.core.cache import cache
-from django.contrib.gis.geos import GEOSGeometry
 
-from emotions.models import EmotionPoint, Photo, Comment
+from emotions.models import EmotionPoint, Comment
 from emotions.forms import PhotoForm
 from emotions import sentiment as sentiment_service
-from map.models import Location
-
-
-def get_raw_geojson_data():
-    """Wyszukuje i ładuje surowy plik GeoJSON (do rysowania mapy i wyliczania granic)."""
-    possible_paths = [
-        os.path.join(settings.BASE_DIR, 'export.geojson'),
-        os.path.join(settings.BASE_DIR, '..', 'export.geojson'),
-        '/app/export.geojson',
-        '/app/cityfeel/export.geojson',
-        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'export.geojson')
-    ]
-    for path in possible_paths:
-        if os.path.exists(path):
-            try:
-                with open(path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception:
-                pass
-    return None
-
-
-def get_all_districts():
-    """Wczytuje dzielnice i zamienia je na matematyczne obrysy GEOSGeometry."""
-    districts = cache.get('gdansk_districts_geometries')
-    if districts:
-        return districts
-
-    data = get_raw_geojson_data()
-    if not data:
-        return {"❌ BŁĄD: Skopiuj plik export.geojson do folderu z manage.py!": None}
-
-    districts = {}
-    try:
-        for feature in data.get('features', []):
-            props = feature.get('properties', {})
-            name = props.get('name')
-            geom = feature.get('geometry')
-
-            # Bierzemy tylko poligony (twarde granice), ignorując punkty
-            if name and geom and geom.get('type') in ['Polygon', 'MultiPolygon']:
-                districts[name] = GEOSGeometry(json.dumps(geom))
-
-        if not districts:
-            return {"❌ BŁĄD: Plik znaleziony, ale brak poprawnych poligonów!": None}
-
-        cache.set('gdansk_districts_geometries', districts, 60 * 60 * 24)
-    except Exception as e:
-        return {f"❌ BŁĄD PARSOWANIA: {str(e)[:30]}...": None}
-
-    return districts
+from emotions.summary import get_location_summary
+from map import boundaries
+from map.models import District, Location
 
 
 class EmotionMapView(LoginRequiredMixin, TemplateView):
@@ -94,69 +46,79 @@ class LocationListView(LoginRequiredMixin, ListView):
         has_comments = self.request.GET.get('has_comments')
         sort_by = self.request.GET.get('sort_by', '-last_activity')
 
-        qs = Location.objects.all()
+        # Statystyki czytamy z prekomputowanej tabeli LocationStats (emotions.stats),
+        # zamiast agregować JOIN punkty × komentarze × zdjęcia dla całej tabeli przy każdym
+        # żądaniu. Każda lokalizacja ma swój wiersz, więc INNER JOIN niczego nie gubi, a
+        # sortowanie idzie po indeksach locstats_* (Index Scan + LIMIT strony).
+        qs = Location.objects.filter(stats__isnull=False).annotate(
+            avg_emotional_value=F('stats__avg_emotional_value'),
+            emotion_points_count=F('stats__emotion_points_count'),
+            comments_count=F('stats__comments_count'),
+            photos_count=F('stats__photos_count'),
+            last_activity=F('stats__last_activity'),
+        )
 
-        # 1. Geofencing dla WIELU dzielnic
+        # 1. Filtr WIELU dzielnic — dzielnica jest przypisana przy zapisie lokalizacji,
+        # więc zamiast ST_Intersects z poligonami wystarczy district_id IN (...) po indeksie FK.
+        # Nazwy rozwiązujemy w bazie (unikalny indeks), nie w indeksie procesu — ten w innych
+        # workerach nie widzi dzielnic wczytanych po ich starcie.
         if selected_districts:
-            districts_data = get_all_districts()
-            district_query = Q()
-            for d in selected_districts:
-                if d in districts_data and districts_data[d]:
-                    # Dodajemy warunek "LUB" dla każdej zaznaczonej dzielnicy
-                    district_query |= Q(coordinates__intersects=districts_data[d])
-
-            if district_query:
-                qs = qs.filter(district_query)
+            district_ids = list(
+                District.objects.filter(name__in=selected_districts).values_list('id', flat=True)
+            )
+            if district_ids:
+                qs = qs.filter(district_id__in=district_ids)
 
-        # 2. Szybka filtracja
+        # 2. Szybka filtracja (liczniki zamiast JOIN + DISTINCT)
         if has_photos == '1':
-            qs = qs.filter(photos__isnull=False).distinct()
+            qs = qs.filter(stats__photos_count__gt=0)
         if has_comments == '1':
-            qs = qs.filter(comments__isnull=False).distinct()
-
-        # 3. Adnotacje
-        qs = qs.annotate(
-            avg_emotional_value=Avg('emotion_points__emotional_value'),
-            emotion_points_count=Count('emotion_points', distinct=True),
-            comments_count=Count('comments', distinct=True),
-            photos_count=Count('photos', distinct=True),
-            last_activity=Max('emotion_points__created_at')
-        )
+            qs = qs.filter(stats__comments_count__gt=0)
 
-        # 4. Filtracja Oceny Użytkownika
+        # 3. Filtracja Oceny Użytkownika
         if min_rating:
             try:
-                qs = qs.filter(avg_emotional_value__gte=float(min_rating))
+                qs = qs.filter(stats__avg_emotional_value__gte=float(min_rating))
             except ValueError:
                 pass
 
         if max_rating:
             try:
-                qs = qs.filter(avg_emotional_value__lte=float(max_rating))
+                qs = qs.filter(stats__avg_emotional_value__lte=float(max_rating))
             except ValueError:
                 pass
 
-        # 5. Ostateczne sortowanie
+        # 4. Ostateczne sortowanie — klucze odpowiadają indeksom locstats_* ('name' rozstrzyga
+        # remisy przez Incremental Sort w obrębie strony).
         if sort_by == '-avg_emotional_value':
-            qs = qs.order_by(F('avg_emotional_value').desc(nulls_last=True), '-emotion_points_count', 'name')
+            qs = qs.order_by(
+                F('stats__avg_emotional_value').desc(nulls_last=True),
+                F('stats__emotion_points_count').desc(),
+                'name',
+            )
         elif sort_by == 'avg_emotional_value':
-            qs = qs.order_by(F('avg_emotional_value').asc(nulls_last=True), '-emotion_points_count', 'name')
-        elif sort_by == '-last_activity':
-            qs = qs.order_by(F('last_activity').desc(nulls_last=True), 'name')
+            qs = qs.order_by(
+                F('stats__avg_emotional_value').asc(nulls_last=True),
+                F('stats__emotion_points_count').desc(),
+                'name',
+            )
         elif sort_by == 'last_activity':
-            qs = qs.order_by(F('last_activity').asc(nulls_last=True), 'name')
+            qs = qs.order_by(F('stats__last_activity').asc(nulls_last=True), 'name')
+        else:
+            qs = qs.order_by(F('stats__last_activity').desc(nulls_last=True), 'name')
 
         return qs
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        # Przygotowanie danych mapy dla JS
-        raw_geojson = get_raw_geojson_data()
-        context['geojson_data'] = json.dumps(raw_geojson) if raw_geojson else "null"
+        # Granice dzielnic JS pobiera z osobnych, cache'owalnych plików (po jednym na zoom)
+        context['district_boundaries_json'] = json.dumps({
+            zoom: reverse('map:district_boundaries', args=[filename])
+            for zoom, filename in boundaries.get_manifest().items()
+        })
 
-        districts_data = get_all_districts()
-        context['available_districts'] = sorted(districts_data.keys()) if districts_data else []
+        context['available_districts'] = list(District.objects.order_by('name').values_list('name', flat=True))
 
         # Bezpieczne przekazanie zaznaczonych dzielnic do JS
         context['current_districts_json'] = json.dumps(self.request.GET.getlist('district'))
@@ -181,60 +143,43 @@ class LocationDetailView(LoginRequiredMixin, DetailView):
     context_object_name = 'location'
     login_url = reverse_lazy('cf_auth:login')
 
-    def get_queryset(self):
-        return Location.objects.annotate(
-            avg_emotional_value=Avg('emotion_points__emotional_value'),
-            emotion_points_count=Count('emotion_points')
-        )
-
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         location = self.object
 
-        latest_per_user_ids = list(
-            EmotionPoint.objects
-            .filter(location=location)
-            .order_by('user_id', '-created_at')
-            .distinct('user_id')
-            .values_list('id', flat=True)[:50]
-        )
-        ratings = (
-            EmotionPoint.objects
-            .filter(id__in=latest_per_user_ids)
-            .select_related('user')
-            .prefetch_related('related_comments')
-            .order_by('-created_at')
-        )
-
-        comments = (
-            Comment.objects
-            .filter(location=location, emotion_point__isnull=True)
-            .select_related('user')
-            .order_by('-created_at')
-        )
+        # Średnia (latest per user), rozkład, liczniki, oceny, komentarze i zdjęcia — z cache,
+        # unieważnianego sygnałami przy każdym zapisie dotyczącym tej lokalizacji.
+        summary = get_location_summary(location.pk)
+        location.avg_emotional_value = summary['avg_emotional_value']
+        location.voters_count = summary['voters_count']
+        location.emotion_points_count = summary['emotion_points_count']
 
+        ratings = summary['ratings']
+        comments = summary['comments']
         ratings_by_user = {r.user_id: r for r in ratings}
         for c in comments:
-            c.related_rating = ratings_by_user.get(c.user.id)
-
-        photos = location.photos.all().select_related('user').order_by('-created_at')
-
-        emotion_distribution = (
-            EmotionPoint.objects
-            .filter(location=location)
-            .values('emotional_value')
-            .annotate(count=Count('id'))
-            .order_by('emotional_value')
-        )
+            c.related_rating = ratings_by_user.get(c.user_id)
 
         user_emotion_point = ratings_by_user.get(self.request.user.id)
+        if user_emotion_point is None and summary['voters_count'] > len(ratings):
+            # Użytkownik spoza listy najnowszych ocen — dociągamy tylko jego głos
+            user_emotion_point = (
+                EmotionPoint.objects
+                .filter(location=location, user=self.request.user, is_hidden=False)
+                .order_by('-created_at')
+                .first()
+            )
+            if user_emotion_point is not None:
+                user_emotion_point.existing_comment = (
+                    user_emotion_point.related_comments.filter(is_hidden=False).order_by('pk').first()
+                )
 
         context.update({
             'ratings_list': ratings,
             'comments_list': comments,
-            'photos': photos,
+            'photos': summary['photos'],
             'photo_form': PhotoForm(),
-            'emotion_distribution': emotion_distribution,
+            'emotion_distribution': summary['distribution'],
             'user_emotion_point': user_emotion_point,
         })
 
@@ -298,4 +243,40 @@ class LocationDetailView(LoginRequiredMixin, DetailView):
             )
             messages.success(request, 'Twój komentarz został dodany!')
 
-        return redirect('map:location_detail', pk=self.object.pk)
\ No newline at end of file
+        return redirect('map:location_detail', pk=self.object.pk)
+
+
+class DistrictBoundariesView(View):
+    """
+    Serwuje uproszczone granice dzielnic (``manage.py build_district_boundaries``).
+    Nazwy plików zawierają skrót treści, więc odpowiedź może być cache'owana „na zawsze”;
+    wariant .br/.gz wybieramy wg Accept-Encoding.
+    """
+    CACHE_CONTROL = 'public, max-age=31536000, immutable'
+    ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+    def get(self, request, filename):
+        # Tylko pliki z manifestu — nazwa z URL nigdy nie trafia wprost do ścieżki
+        if filename not in boundaries.get_manifest().values():
+            raise Http404
+
+        output_dir = boundaries.get_output_dir()
+        accepted = {
+            value.split(';')[0].strip()
+            for value in request.headers.get('Accept-Encoding', '').split(',')
+        }
+        path, encoding = output_dir / filename, None
+        for name, suffix in self.ENCODINGS:
+            if name in accepted and (output_dir / f'{filename}{suffix}').exists():
+                path, encoding = output_dir / f'{filename}{suffix}', name
+                break
+
+        try:
+            response = FileResponse(open(path, 'rb'), content_type='application/geo+json', filename=filename)
+        except FileNotFoundError:
+            raise Http404
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['Cache-Control'] = self.CACHE_CONTROL
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return response